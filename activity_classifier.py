@@ -0,0 +1,79 @@
+"""
+Temporal Activity Classifier for Assistive HAR System
+Turns noisy per-frame Walking/Sitting/Standing/Unknown labels into stable
+activity states with confidence accumulation, hysteresis and minimum dwell
+"""
+
+import json
+import time
+
+DEFAULT_CLASSIFIER_CONFIG = {
+    'alpha': 0.15,      # weight of each new frame in the running confidence
+    'enter': 0.7,       # confidence a new activity needs to take over
+    'exit': 0.4,        # current activity must have dropped below this
+    'min_dwell': 2.0    # seconds an activity is held before it can change
+}
+
+
+def load_classifier_config(config_file='config.json'):
+    """Load the activity_classifier section of config.json merged over defaults"""
+    config = dict(DEFAULT_CLASSIFIER_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('activity_classifier', {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+class ActivityStateMachine:
+    """
+    Each label's confidence is an exponential moving average of how often
+    the per-frame classifier reported it. The state only changes when a new
+    label's confidence rises above `enter`, the current one's has fallen
+    below `exit`, and the current state has been held for `min_dwell`
+    seconds, so a label flickering at a threshold boundary never produces a
+    transition.
+    """
+
+    __slots__ = ('alpha', 'enter', 'exit', 'min_dwell', 'state', 'since', 'confidence', 'transitions')
+
+    def __init__(self, alpha=0.15, enter=0.7, exit=0.4, min_dwell=2.0):
+        self.alpha = alpha
+        self.enter = enter
+        self.exit = exit
+        self.min_dwell = min_dwell
+        self.state = None
+        self.since = None
+        self.confidence = {}
+        self.transitions = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config['alpha'], config['enter'], config['exit'], config['min_dwell'])
+
+    def update(self, label, now=None):
+        """Feed one frame's label; returns (stable state, True if it just changed)"""
+        now = now if now is not None else time.time()
+        for key in self.confidence:
+            self.confidence[key] *= 1.0 - self.alpha
+        self.confidence[label] = self.confidence.get(label, 0.0) + self.alpha
+
+        if self.state is None:
+            # First frame: nothing to be stable against yet
+            self.state, self.since = label, now
+            self.confidence[label] = 1.0
+            self.transitions += 1
+            return self.state, True
+
+        if label != self.state and self.confidence[label] >= self.enter:
+            if self.confidence.get(self.state, 0.0) <= self.exit and now - self.since >= self.min_dwell:
+                self.state, self.since = label, now
+                self.transitions += 1
+                return self.state, True
+        return self.state, False
+
+    def reset(self):
+        self.state = None
+        self.since = None
+        self.confidence = {}
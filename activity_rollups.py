@@ -0,0 +1,208 @@
+"""
+Activity Time-Series Rollups for Assistive HAR System
+Per-minute and per-hour time spent in each activity, maintained as activity
+updates arrive and persisted to SQLite with downsampled retention
+"""
+
+import json
+import logging
+import time
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMESERIES_CONFIG = {
+    'db_path': 'activity_rollups.db',
+    'minute_retention_days': 7,
+    'hour_retention_days': 365,
+    'flush_interval': 30,
+    'max_gap': 30           # longest silence still credited to the last activity
+}
+
+ACTIVITIES = ('Sitting', 'Standing', 'Walking')
+
+# Labels that end the running activity without starting a new one; anything
+# else (gesture and fall/help banners) leaves the running activity open
+INTERRUPTIONS = ('Unknown', 'Monitoring...', 'MONITORING DOWN')
+
+# Sent by the capture watchdog once frames have stopped for a while: the
+# silence before it wasn't observed, so none of it is credited
+OUTAGES = ('MONITORING DOWN',)
+
+RESOLUTIONS = {'minute': 60, 'hour': 3600}
+
+
+def load_timeseries_config(config_file='config.json'):
+    """Load the timeseries section of config.json merged over defaults"""
+    config = dict(DEFAULT_TIMESERIES_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('timeseries', {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+class ActivityRollups:
+    """
+    Each activity update closes the interval since the previous one and
+    credits it to the activity that was running, split across minute
+    boundaries and added to both the minute and the hour bucket. Buckets are
+    dicts keyed by bucket number, so a range query touches exactly the
+    buckets in the range.
+
+    Rollups are kept per series (resident id, or 'default' for the
+    single-person dashboard). When several cameras feed one series, the
+    camera that reported the running activity owns it: another camera
+    losing sight of the person ('Unknown') doesn't end it. Memory-only until `attach` opens the database;
+    after that changed buckets are written every `flush_interval` seconds and
+    buckets past their retention are dropped.
+    """
+
+    def __init__(self, config=None):
+        self.config = dict(DEFAULT_TIMESERIES_CONFIG)
+        self.config.update(config or {})
+        self._buckets = {}      # (series, resolution) -> {bucket: {activity: seconds}}
+        self._open = {}         # series -> (activity, since, camera_id)
+        self._dirty = set()     # (series, resolution, bucket)
+        self._lock = threading.Lock()
+        self._db = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def record(self, activity, now=None, series='default', camera_id=None):
+        """Account for an activity update from `camera_id` received at `now`"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            running = self._open.get(series)
+            if running is not None and activity in INTERRUPTIONS and camera_id != running[2]:
+                # Another camera can't see the person; the owner still can
+                return
+            if running is not None and now > running[1] and activity not in OUTAGES:
+                elapsed = min(now - running[1], self.config['max_gap'])
+                self._add(series, running[0], running[1], running[1] + elapsed)
+            if activity in ACTIVITIES:
+                self._open[series] = (activity, now, camera_id)
+            elif activity in INTERRUPTIONS:
+                self._open.pop(series, None)
+            elif running is not None:
+                self._open[series] = (running[0], now, running[2])
+
+    def _add(self, series, activity, t0, t1):
+        while t0 < t1:
+            edge = (int(t0 // 60) + 1) * 60
+            seconds = min(t1, edge) - t0
+            for resolution, size in RESOLUTIONS.items():
+                bucket = int(t0 // size)
+                buckets = self._buckets.setdefault((series, resolution), {})
+                counts = buckets.setdefault(bucket, {})
+                counts[activity] = counts.get(activity, 0.0) + seconds
+                self._dirty.add((series, resolution, bucket))
+            t0 += seconds
+
+    def query(self, start, end, resolution='hour', series='default'):
+        """
+        Seconds per activity for every bucket overlapping [start, end):
+        {'resolution', 'bucket_seconds', 'buckets': [bucket start times],
+         'Sitting': [...], 'Standing': [...], 'Walking': [...]}
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS)}")
+        size = RESOLUTIONS[resolution]
+        first, last = int(start // size), int((end - 1) // size)
+        result = {'resolution': resolution, 'bucket_seconds': size, 'buckets': []}
+        for activity in ACTIVITIES:
+            result[activity] = []
+        with self._lock:
+            buckets = self._buckets.get((series, resolution), {})
+            for bucket in range(first, last + 1):
+                counts = buckets.get(bucket, {})
+                result['buckets'].append(bucket * size)
+                for activity in ACTIVITIES:
+                    result[activity].append(round(counts.get(activity, 0.0), 1))
+        return result
+
+    def series_names(self):
+        with self._lock:
+            return sorted({series for series, _ in self._buckets})
+
+    # ---------- Persistence ----------
+
+    def attach(self, db_path=None):
+        """Load persisted rollups and start writing changes in the background"""
+        db_path = db_path or self.config['db_path']
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS rollups (
+                series TEXT NOT NULL,
+                resolution TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                activity TEXT NOT NULL,
+                seconds REAL NOT NULL,
+                PRIMARY KEY (series, resolution, bucket, activity)
+            )"""
+        )
+        self._prune(time.time())
+        rows = self._db.execute('SELECT series, resolution, bucket, activity, seconds FROM rollups').fetchall()
+        with self._lock:
+            for series, resolution, bucket, activity, seconds in rows:
+                # Updates received before attach are added on top; their
+                # buckets are already dirty, so the merged totals get written
+                counts = self._buckets.setdefault((series, resolution), {}).setdefault(bucket, {})
+                counts[activity] = counts.get(activity, 0.0) + seconds
+        self.flush()
+        self._thread = threading.Thread(target=self._run, name='rollup-writer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        last_prune = time.time()
+        while not self._stop.wait(self.config['flush_interval']):
+            try:
+                self.flush()
+                if time.time() - last_prune > 3600:
+                    self._prune(time.time())
+                    last_prune = time.time()
+            except Exception as e:
+                logger.error("Rollup write failed: %s", e)
+
+    def flush(self):
+        """Write buckets changed since the last flush"""
+        if self._db is None:
+            return
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            rows = []
+            for series, resolution, bucket in dirty:
+                counts = self._buckets.get((series, resolution), {}).get(bucket)
+                if counts:
+                    rows.extend((series, resolution, bucket, activity, seconds)
+                                for activity, seconds in counts.items())
+        if rows:
+            self._db.execute('BEGIN')
+            self._db.executemany('INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?)', rows)
+            self._db.execute('COMMIT')
+
+    def _prune(self, now):
+        """Drop minute buckets older than a week and hour buckets older than a year"""
+        retention = {'minute': self.config['minute_retention_days'],
+                     'hour': self.config['hour_retention_days']}
+        for resolution, days in retention.items():
+            oldest = int((now - days * 86400) // RESOLUTIONS[resolution])
+            with self._lock:
+                for (series, res), buckets in self._buckets.items():
+                    if res == resolution:
+                        for bucket in [b for b in buckets if b < oldest]:
+                            del buckets[bucket]
+            if self._db is not None:
+                self._db.execute('DELETE FROM rollups WHERE resolution = ? AND bucket < ?', (resolution, oldest))
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
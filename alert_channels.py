@@ -0,0 +1,204 @@
+"""
+Alert Channel Dispatcher for Assistive HAR System
+Fans each alert out to independently pooled delivery channels
+(TTS, sound, dashboard, SMS, IoT, log)
+"""
+
+import time
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class AlertChannel:
+    """
+    One delivery channel with its own bounded worker pool.
+
+    A slow or failing channel only fills its own pool; alerts beyond
+    `max_pending` queued deliveries are dropped for that channel and counted.
+    A handler still running `timeout` seconds after it started is abandoned:
+    its slot is freed, it is counted as timed out and a fresh worker takes
+    its place, so one hung call (a stuck SMTP socket, a dead IoT hub) can't
+    block the channel for good. The abandoned thread exits whenever the
+    handler finally returns.
+    """
+
+    def __init__(self, name, handler, workers=1, timeout=5.0, max_pending=20, accepts=None):
+        self.name = name
+        self.handler = handler
+        self.timeout = timeout
+        self.accepts = accepts
+        self._queue = queue.Queue()
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self._running = {}      # worker thread -> start of its current delivery
+        self._workers = []
+        self._spawned = 0
+        self._stopped = threading.Event()
+        self._latency_total = 0.0
+        self.stats = {
+            'delivered': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'dropped': 0,
+            'avg_latency_ms': 0.0,
+            'max_latency_ms': 0.0,
+            'last_error': None
+        }
+        for _ in range(workers):
+            self._spawn()
+        self._watchdog = threading.Thread(target=self._watch, name=f"alert-{name}-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def _spawn(self):
+        with self._lock:
+            self._spawned += 1
+            worker = threading.Thread(target=self._work, name=f"alert-{self.name}_{self._spawned}", daemon=True)
+            self._workers.append(worker)
+        worker.start()
+
+    def wants(self, alert):
+        return self.accepts is None or self.accepts(alert)
+
+    def submit(self, alert):
+        """Queue delivery of an alert; returns False if the channel is saturated"""
+        if self._stopped.is_set():
+            return False
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats['dropped'] += 1
+            logger.warning("Alert channel '%s' saturated, dropped %s alert", self.name, alert.get('type'))
+            return False
+        self._queue.put((alert, time.time()))
+        return True
+
+    def _work(self):
+        me = threading.current_thread()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            alert, queued_at = item
+            with self._lock:
+                self._running[me] = time.time()
+            error = None
+            try:
+                self.handler(alert)
+            except Exception as e:
+                error = e
+            with self._lock:
+                abandoned = self._running.pop(me, None) is None
+            if abandoned:
+                # The watchdog already freed the slot and replaced this worker
+                logger.info("Alert channel '%s': abandoned delivery finished after all", self.name)
+                return
+            self._slots.release()
+            self._record(error, time.time() - queued_at)
+
+    def _record(self, error, latency):
+        with self._lock:
+            if error is not None:
+                self.stats['failed'] += 1
+                self.stats['last_error'] = str(error)
+            else:
+                self.stats['delivered'] += 1
+            self._latency_total += latency
+            completed = self.stats['delivered'] + self.stats['failed']
+            self.stats['avg_latency_ms'] = round(1000 * self._latency_total / completed, 1)
+            self.stats['max_latency_ms'] = round(max(self.stats['max_latency_ms'], 1000 * latency), 1)
+
+        if error is not None:
+            logger.error("Alert channel '%s' error: %s", self.name, error)
+
+    def _watch(self):
+        """Abandon deliveries running past the deadline and replace their workers"""
+        while not self._stopped.wait(min(self.timeout / 4, 0.5)):
+            now = time.time()
+            with self._lock:
+                hung = [worker for worker, started in self._running.items() if now - started > self.timeout]
+                for worker in hung:
+                    del self._running[worker]
+                    self._workers.remove(worker)
+                    self.stats['timed_out'] += 1
+            for worker in hung:
+                logger.warning("Alert channel '%s' handler exceeded %ss, abandoning %s",
+                               self.name, self.timeout, worker.name)
+                self._slots.release()
+                self._spawn()
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def shutdown(self, wait=False):
+        self._stopped.set()
+        with self._lock:
+            workers = list(self._workers)
+        for _ in workers:
+            self._queue.put(None)
+        if wait:
+            for worker in workers:
+                worker.join(self.timeout)
+
+
+class AlertDispatcher:
+    """Registry of alert channels; `dispatch` fans an alert out to all of them concurrently"""
+
+    def __init__(self):
+        self.channels = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, handler, workers=1, timeout=5.0, max_pending=20, accepts=None):
+        """
+        Register a delivery channel.
+
+        Args:
+            name: Channel name (tts, sound, dashboard, sms, iot, log, ...)
+            handler: Callable taking the alert dict
+            workers: Size of the channel's worker pool
+            timeout: Seconds a handler may run before it is abandoned and its worker replaced
+            max_pending: Deliveries that may queue behind busy workers
+            accepts: Optional filter, callable(alert) -> bool
+        """
+        channel = AlertChannel(name, handler, workers, timeout, max_pending, accepts)
+        with self._lock:
+            old = self.channels.get(name)
+            self.channels[name] = channel
+        if old:
+            old.shutdown()
+        return channel
+
+    def unregister(self, name):
+        with self._lock:
+            channel = self.channels.pop(name, None)
+        if channel:
+            channel.shutdown()
+
+    def dispatch(self, alert, only=None):
+        """
+        Hand the alert to every interested channel (or just the channels named
+        in `only`) without waiting for delivery
+        """
+        with self._lock:
+            channels = [channel for name, channel in self.channels.items() if only is None or name in only]
+        for channel in channels:
+            try:
+                if channel.wants(alert):
+                    channel.submit(alert)
+            except Exception as e:
+                logger.error("Alert channel '%s' dispatch error: %s", channel.name, e)
+
+    def get_stats(self):
+        """Per-channel delivery counters and latency"""
+        with self._lock:
+            channels = list(self.channels.values())
+        return {channel.name: channel.get_stats() for channel in channels}
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            channels = list(self.channels.values())
+            self.channels = {}
+        for channel in channels:
+            channel.shutdown(wait=wait)
@@ -0,0 +1,117 @@
+"""
+Priority Alert Queue for Assistive HAR System
+Blocking, priority-ordered alert queue shared by AlertManager and AlertSystem
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+# Lower rank is served first
+PRIORITY_RANKS = {
+    'critical': 0,
+    'high': 1,
+    'normal': 2,
+    'low': 3
+}
+
+# Seconds an alert may wait in the queue before it is dropped as stale.
+# Critical alerts never expire.
+DEFAULT_MAX_AGE = {
+    'critical': None,
+    'high': 120,
+    'normal': 10,
+    'low': 10
+}
+
+
+def priority_rank(priority):
+    """Numeric rank for a priority name (unknown priorities rank as normal)"""
+    return PRIORITY_RANKS.get(priority, PRIORITY_RANKS['normal'])
+
+
+class PriorityAlertQueue:
+    """
+    Thread-safe alert queue ordered by priority (critical > high > normal > low),
+    FIFO within the same priority.
+
+    `get` blocks on a condition variable, so a waiting dispatcher wakes as soon
+    as an alert is put instead of polling. When `maxsize` alerts are waiting,
+    the least urgent, newest alert is dropped to make room.
+    """
+
+    def __init__(self, max_age=None, maxsize=100):
+        self.max_age = dict(DEFAULT_MAX_AGE)
+        if max_age:
+            self.max_age.update(max_age)
+        self.maxsize = maxsize
+        self.expired_count = 0
+        self.dropped_count = 0
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, alert):
+        """
+        Queue an alert dict; its 'priority' key decides the order.
+        Returns False if the queue is full of more urgent alerts.
+        """
+        priority = alert.get('priority', 'normal')
+        entry = (priority_rank(priority), next(self._counter), time.time(), alert)
+        with self._cond:
+            if self.maxsize and len(self._heap) >= self.maxsize:
+                worst = max(self._heap)
+                if entry > worst:
+                    self.dropped_count += 1
+                    return False
+                self._heap.remove(worst)
+                heapq.heapify(self._heap)
+                self.dropped_count += 1
+            heapq.heappush(self._heap, entry)
+            self._cond.notify()
+        return True
+
+    def get(self, timeout=None):
+        """
+        Return the most urgent non-stale alert, waiting up to `timeout` seconds.
+        Returns None on timeout or once the queue is closed.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                while self._heap:
+                    _, _, enqueued_at, alert = heapq.heappop(self._heap)
+                    if self._is_stale(alert, enqueued_at):
+                        self.expired_count += 1
+                        continue
+                    return alert
+
+                if self._closed:
+                    return None
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+
+    def close(self):
+        """Wake all waiting consumers; subsequent gets return None once drained"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def empty(self):
+        with self._cond:
+            return not self._heap
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap)
+
+    def _is_stale(self, alert, enqueued_at):
+        max_age = self.max_age.get(alert.get('priority', 'normal'), self.max_age['normal'])
+        return max_age is not None and time.time() - enqueued_at > max_age
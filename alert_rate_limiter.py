@@ -0,0 +1,160 @@
+"""
+Alert Rate Limiter for Assistive HAR System
+Per (type, source, priority) token buckets checked at enqueue time, with
+suppressed bursts coalesced into a single summary alert
+"""
+
+import time
+import threading
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled at `rate` tokens per second"""
+
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated')
+
+    def __init__(self, capacity, rate, now=None):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = now if now is not None else time.time()
+
+    def consume(self, now=None):
+        now = now if now is not None else time.time()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class AlertRateLimiter:
+    """
+    Central admission control for alerts.
+
+    Each (type, source, priority, room, resident) key gets its own token bucket, so a left-hand
+    STOP gesture no longer suppresses an unrelated health warning. Alerts that
+    are rejected are counted per key, and `aggregation_window` seconds after
+    the first rejection the burst is reported by `collect_summaries` as one
+    "N similar events in the last 30 s" alert.
+    """
+
+    def __init__(self, burst=1, aggregation_window=30, idle_ttl=3600):
+        self.burst = burst
+        self.aggregation_window = aggregation_window
+        self.idle_ttl = idle_ttl
+        self._buckets = {}
+        self._bursts = {}  # key -> {'count', 'first', 'last', 'alert'}
+        self._lock = threading.Lock()
+        self.stats = {
+            'allowed': 0,
+            'suppressed': 0,
+            'summaries': 0,
+            'suppressed_by_type': {}
+        }
+
+    @staticmethod
+    def make_key(alert):
+        # Room and resident keep one resident's alerts from throttling another's
+        return (alert.get('type'), alert.get('source'), alert.get('priority', 'normal'),
+                alert.get('room'), alert.get('resident_id'))
+
+    def allow(self, alert, cooldown, now=None):
+        """
+        Admit or reject an alert. `cooldown` is the minimum spacing between
+        alerts of the same key once the burst allowance is used up; a falsy
+        cooldown admits every alert.
+        """
+        now = now if now is not None else time.time()
+        key = self.make_key(alert)
+        with self._lock:
+            if not cooldown or cooldown <= 0:
+                self.stats['allowed'] += 1
+                return True
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.burst, 1.0 / cooldown, now)
+            else:
+                bucket.rate = 1.0 / cooldown
+
+            if bucket.consume(now):
+                self.stats['allowed'] += 1
+                return True
+
+            self.stats['suppressed'] += 1
+            by_type = self.stats['suppressed_by_type']
+            by_type[key[0]] = by_type.get(key[0], 0) + 1
+            burst = self._bursts.get(key)
+            if burst is None:
+                self._bursts[key] = {'count': 1, 'first': now, 'last': now, 'alert': alert}
+            else:
+                burst['count'] += 1
+                burst['last'] = now
+            return False
+
+    def next_deadline(self):
+        """Time at which the earliest pending burst summary is due, or None"""
+        with self._lock:
+            if not self._bursts:
+                return None
+            return min(b['first'] for b in self._bursts.values()) + self.aggregation_window
+
+    def collect_summaries(self, now=None):
+        """Return summary alerts for bursts whose aggregation window has closed"""
+        now = now if now is not None else time.time()
+        summaries = []
+        with self._lock:
+            for key, burst in list(self._bursts.items()):
+                if now - burst['first'] < self.aggregation_window:
+                    continue
+                del self._bursts[key]
+                alert = burst['alert']
+                window = int(self.aggregation_window)
+                # Informational only: the original alert has already been delivered
+                summaries.append({
+                    'type': 'alert_summary',
+                    'summarized_type': alert.get('type'),
+                    'source': alert.get('source'),
+                    'room': alert.get('room'),
+                    'resident_id': alert.get('resident_id'),
+                    'message': f"{burst['count']} similar events in the last {window} s: {alert.get('message')}",
+                    'priority': 'normal',
+                    'suppressed_count': burst['count'],
+                    'speak': False
+                })
+                self.stats['summaries'] += 1
+
+            # Forget idle buckets so the key space stays bounded
+            for key, bucket in list(self._buckets.items()):
+                if now - bucket.updated > self.idle_ttl and key not in self._bursts:
+                    del self._buckets[key]
+        return summaries
+
+    def get_state(self):
+        """Bucket levels for checkpointing, so cooldowns survive a restart"""
+        with self._lock:
+            return [
+                {'key': list(key), 'capacity': b.capacity, 'rate': b.rate,
+                 'tokens': b.tokens, 'updated': b.updated}
+                for key, b in self._buckets.items()
+            ]
+
+    def load_state(self, state, now=None):
+        """Restore buckets saved by `get_state`, dropping ones already idle too long"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            for entry in state or []:
+                if now - entry['updated'] > self.idle_ttl:
+                    continue
+                bucket = TokenBucket(entry['capacity'], entry['rate'], entry['updated'])
+                bucket.tokens = entry['tokens']
+                self._buckets[tuple(entry['key'])] = bucket
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['suppressed_by_type'] = dict(self.stats['suppressed_by_type'])
+            stats['pending_bursts'] = len(self._bursts)
+            return stats
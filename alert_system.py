@@ -1,32 +1,65 @@
-import pyttsx3
 import threading
 import time
 import json
+import logging
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from collections import deque
-import winsound
-import queue
+from alert_queue import PriorityAlertQueue
+from tts_worker import TTSWorker
+from alert_channels import AlertDispatcher
+from alert_rate_limiter import AlertRateLimiter
+from startup import LazyModule
+
+winsound = LazyModule('winsound')
+
+logger = logging.getLogger(__name__)
 
 class AlertSystem:
-    def __init__(self, config):
+    def __init__(self, config, iot_controller=None):
         self.config = config
-        self.tts_engine = None
-        self.alert_queue = queue.Queue()
+        self.tts = None
+        self.alert_queue = PriorityAlertQueue(maxsize=100)
+        self.rate_limiter = AlertRateLimiter(aggregation_window=30)
         self.alert_history = deque(maxlen=100)
-        self.last_alert_times = {}
         self.alert_thread = None
         self.running = False
         
-        # Initialize TTS if enabled
+        # IoT devices from the config's "iot" section unless a controller is passed in
+        alerts_config = config['alerts']
+        self.iot = iot_controller
+        self._owns_iot = False
+        if self.iot is None and alerts_config.get('iot_enabled'):
+            self.iot = IoTController(config)
+            self._owns_iot = True
+        
+        # Initialize TTS if enabled; the worker thread owns the engine
         if config['alerts']['tts_enabled']:
-            try:
-                self.tts_engine = pyttsx3.init()
-                self.tts_engine.setProperty('rate', 150)
-                self.tts_engine.setProperty('volume', 0.9)
-            except Exception as e:
-                print(f"TTS initialization failed: {e}")
-                self.tts_engine = None
+            self.tts = TTSWorker(rate=150, volume=0.9)
+        
+        # Delivery channels run concurrently, each with its own worker pool
+        self.dispatcher = AlertDispatcher()
+        if config['logging']['enabled']:
+            self.dispatcher.register('log', self._write_log, timeout=1.0, max_pending=100)
+        if alerts_config['tts_enabled'] and self.tts:
+            self.dispatcher.register('tts', self._speak, timeout=0.5,
+                                     accepts=lambda alert: alert.get('speak', True))
+        self.dispatcher.register('sound', self._play_alarm, timeout=3.0, max_pending=5,
+                                 accepts=lambda alert: alert.get('priority') == 'high')
+        if alerts_config['sms_enabled']:
+            self.dispatcher.register('sms', self._send_sms, workers=2, timeout=30.0,
+                                     accepts=lambda alert: alert.get('priority') == 'critical')
+        if alerts_config.get('iot_enabled') and self.iot:
+            self.dispatcher.register('iot', lambda alert: self.iot.emergency_mode(),
+                                     timeout=5.0, max_pending=2,
+                                     accepts=lambda alert: alert.get('priority') == 'critical')
+            self.iot.start_health_probe(
+                f"http://{config['dashboard']['host']}:{config['dashboard']['port']}"
+            )
+        if alerts_config['dashboard_enabled']:
+            self.dispatcher.register('dashboard', self._send_to_dashboard, workers=2, timeout=1.0)
         
         # Start alert processing thread
         self.start()
@@ -34,61 +67,61 @@ class AlertSystem:
     def start(self):
         """Start the alert processing thread"""
         self.running = True
-        self.alert_thread = threading.Thread(target=self._process_alerts, daemon=True)
+        self.alert_thread = threading.Thread(target=self._process_alerts, name='alert-dispatch', daemon=True)
         self.alert_thread.start()
     
     def stop(self):
         """Stop the alert processing thread"""
         self.running = False
+        self.alert_queue.close()
+        self.dispatcher.shutdown()
+        if self.tts:
+            self.tts.stop()
+        if self._owns_iot:
+            self.iot.stop()
         if self.alert_thread:
             self.alert_thread.join(timeout=2)
     
     def _process_alerts(self):
         """Process alerts from the queue"""
+        window = self.rate_limiter.aggregation_window
         while self.running:
             try:
-                if not self.alert_queue.empty():
-                    alert = self.alert_queue.get(timeout=0.1)
+                # Blocks until an alert arrives, a suppressed-burst summary is due,
+                # or the queue is closed on stop
+                deadline = self.rate_limiter.next_deadline()
+                timeout = window if deadline is None else min(window, max(0, deadline - time.time()))
+                alert = self.alert_queue.get(timeout=timeout)
+                if alert is not None:
                     self._handle_alert(alert)
-                else:
-                    time.sleep(0.1)
-            except queue.Empty:
-                continue
+                for summary in self.rate_limiter.collect_summaries():
+                    self._handle_alert(summary)
             except Exception as e:
-                print(f"Alert processing error: {e}")
+                logger.error("Alert processing error: %s", e)
     
     def _handle_alert(self, alert):
-        """Handle individual alert based on type"""
-        alert_type = alert['type']
-        message = alert['message']
-        priority = alert.get('priority', 'normal')
-        
-        # Log the alert
+        """Log the alert and fan it out to every registered channel"""
         self._log_alert(alert)
-        
-        # Handle different alert channels
-        if self.config['alerts']['tts_enabled'] and self.tts_engine:
-            self._speak(message)
-        
-        if priority == 'high':
-            self._play_alarm()
-        
-        if self.config['alerts']['sms_enabled'] and priority == 'critical':
-            self._send_sms(message)
-        
-        if self.config['alerts']['dashboard_enabled']:
-            self._send_to_dashboard(alert)
+        self.dispatcher.dispatch(alert)
+    
+    def register_channel(self, name, handler, **options):
+        """Add an extra delivery channel; see AlertDispatcher.register"""
+        return self.dispatcher.register(name, handler, **options)
     
-    def _speak(self, text):
-        """Text-to-speech announcement"""
+    def get_channel_stats(self):
+        """Per-channel delivery counters and latency"""
+        return self.dispatcher.get_stats()
+    
+    def _speak(self, alert):
+        """Text-to-speech announcement (queued on the TTS worker, non-blocking)"""
         try:
-            if self.tts_engine:
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
+            if self.tts:
+                self.tts.speak(alert['message'], priority=alert.get('priority', 'normal'),
+                               key=(alert['type'], alert.get('source')))
         except Exception as e:
-            print(f"TTS error: {e}")
+            logger.error("TTS error: %s", e)
     
-    def _play_alarm(self):
+    def _play_alarm(self, alert):
         """Play alarm sound for high priority alerts"""
         try:
             # Windows beep
@@ -96,23 +129,24 @@ class AlertSystem:
             time.sleep(0.2)
             winsound.Beep(1500, 500)  # 1500Hz for 500ms
         except Exception as e:
-            print(f"Alarm sound error: {e}")
+            logger.error("Alarm sound error: %s", e)
     
-    def _send_sms(self, message):
+    def _send_sms(self, alert):
         """Send SMS alert (requires Twilio configuration)"""
+        message = alert['message']
         try:
             if not all([self.config['sms'].get('twilio_account_sid'),
                        self.config['sms'].get('twilio_auth_token'),
                        self.config['sms'].get('twilio_phone_number')]):
-                print("SMS not configured. Please add Twilio credentials to config.json")
+                logger.warning("SMS not configured. Please add Twilio credentials to config.json")
                 return
             
             # Twilio SMS implementation would go here
             # For now, we'll just log it
-            print(f"SMS Alert (simulated): {message}")
+            logger.info("SMS Alert (simulated): %s", message)
             
         except Exception as e:
-            print(f"SMS error: {e}")
+            logger.error("SMS error: %s", e)
     
     def _send_to_dashboard(self, alert):
         """Send alert to dashboard via HTTP"""
@@ -131,15 +165,15 @@ class AlertSystem:
         """Log alert to history"""
         alert['timestamp'] = datetime.now().isoformat()
         self.alert_history.append(alert)
-        
-        # Save to file if logging enabled
-        if self.config['logging']['enabled']:
-            try:
-                with open(self.config['logging']['log_file'], 'a') as f:
-                    json.dump(alert, f)
-                    f.write('\n')
-            except Exception as e:
-                print(f"Logging error: {e}")
+    
+    def _write_log(self, alert):
+        """Append alert to the log file (runs on the 'log' channel)"""
+        try:
+            with open(self.config['logging']['log_file'], 'a') as f:
+                json.dump(alert, f)
+                f.write('\n')
+        except Exception as e:
+            logger.error("Logging error: %s", e)
     
     def trigger_alert(self, alert_type, message, priority='normal', cooldown_key=None):
         """
@@ -149,26 +183,27 @@ class AlertSystem:
             alert_type: Type of alert (fall, help, gesture, etc.)
             message: Alert message
             priority: Alert priority (normal, high, critical)
-            cooldown_key: Key for cooldown checking
+            cooldown_key: Key for cooldown checking (rate limited per
+                type, cooldown_key and priority; None disables the cooldown)
         """
-        # Check cooldown
-        if cooldown_key:
-            cooldown_time = self._get_cooldown_time(alert_type)
-            if cooldown_key in self.last_alert_times:
-                time_since_last = time.time() - self.last_alert_times[cooldown_key]
-                if time_since_last < cooldown_time:
-                    return False
-            self.last_alert_times[cooldown_key] = time.time()
-        
-        # Queue the alert
         alert = {
             'type': alert_type,
             'message': message,
             'priority': priority,
+            'source': cooldown_key,
             'timestamp': time.time()
         }
-        self.alert_queue.put(alert)
-        return True
+        
+        # Rate limit before the alert costs any queue work
+        cooldown_time = self._get_cooldown_time(alert_type) if cooldown_key else 0
+        if not self.rate_limiter.allow(alert, cooldown_time):
+            return False
+        
+        # Queue the alert
+        # A critical alert cuts into any lower-priority announcement in progress
+        if priority == 'critical' and self.tts:
+            self.tts.preempt('critical')
+        return self.alert_queue.put(alert)
     
     def _get_cooldown_time(self, alert_type):
         """Get cooldown time for specific alert type"""
@@ -179,6 +214,13 @@ class AlertSystem:
         else:
             return 5  # Default cooldown
     
+    def get_rate_limit_stats(self):
+        """Counters for admitted, suppressed and summarized alerts"""
+        stats = self.rate_limiter.get_stats()
+        stats['queue_dropped'] = self.alert_queue.dropped_count
+        stats['queue_expired'] = self.alert_queue.expired_count
+        return stats
+    
     def get_alert_history(self, limit=50):
         """Get recent alert history"""
         return list(self.alert_history)[-limit:]
@@ -190,35 +232,183 @@ class IoTController:
     def __init__(self, config):
         self.config = config
         self.devices = {}
+        iot_config = config.get('iot', {})
+        self.timeout = iot_config.get('timeout', 2)
+        self.probe_interval = iot_config.get('probe_interval', 30)
+        self.failure_threshold = iot_config.get('failure_threshold', 3)
+        self.circuit_reset = iot_config.get('circuit_reset', 60)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._probe_thread = None
+        
+        # Pooled HTTP session, and separate worker pools for the emergency
+        # fan-out and the health probes so a round of slow probes never
+        # delays activating the alarms
+        max_workers = iot_config.get('max_workers', 8)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=2 * max_workers)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='iot')
+        self._probe_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='iot-probe')
+        
+        for device in iot_config.get('devices', []):
+            self.register_device(device['id'], device['type'], device['endpoint'],
+                                 device.get('health_endpoint'))
     
-    def register_device(self, device_id, device_type, endpoint):
+    def register_device(self, device_id, device_type, endpoint, health_endpoint=None):
         """Register an IoT device"""
-        self.devices[device_id] = {
-            'type': device_type,
-            'endpoint': endpoint,
-            'status': 'offline'
-        }
+        with self._lock:
+            self.devices[device_id] = {
+                'type': device_type,
+                'endpoint': endpoint,
+                'health_endpoint': health_endpoint,
+                'status': 'unknown',
+                'latency_ms': None,
+                'last_seen': None,
+                'consecutive_failures': 0,
+                'circuit': 'closed',
+                'circuit_opened_at': None
+            }
     
     def trigger_device(self, device_id, action):
         """Trigger an IoT device action"""
-        if device_id not in self.devices:
-            return False
+        with self._lock:
+            device = self.devices.get(device_id)
+            if device is None:
+                return False
+            if not self._allow_request(device):
+                # Known-dead endpoint: skip instead of waiting for a timeout
+                return False
+            endpoint = device['endpoint']
         
-        device = self.devices[device_id]
+        started = time.time()
         try:
             # Send command to IoT device
-            response = requests.post(
-                device['endpoint'],
+            response = self._session.post(
+                endpoint,
                 json={'action': action},
-                timeout=2
+                timeout=self.timeout
             )
+            self._record_result(device_id, True, time.time() - started)
             return response.status_code == 200
         except Exception as e:
-            print(f"IoT device error: {e}")
+            logger.error("IoT device error: %s", e)
+            self._record_result(device_id, False, time.time() - started)
             return False
     
     def emergency_mode(self):
-        """Activate all emergency devices"""
-        for device_id, device in self.devices.items():
-            if device['type'] in ['alarm', 'light', 'siren']:
-                self.trigger_device(device_id, 'activate')
+        """
+        Activate all emergency devices concurrently.
+        Returns {device_id: success}; total time is bounded by the slowest
+        healthy device, since open-circuit devices are skipped.
+        """
+        with self._lock:
+            targets = [
+                device_id for device_id, device in self.devices.items()
+                if device['type'] in ['alarm', 'light', 'siren']
+            ]
+        futures = {
+            device_id: self._executor.submit(self.trigger_device, device_id, 'activate')
+            for device_id in targets
+        }
+        results = {}
+        for device_id, future in futures.items():
+            try:
+                results[device_id] = future.result(timeout=self.timeout + 1)
+            except Exception:
+                results[device_id] = False
+        return results
+    
+    def start_health_probe(self, dashboard_url=None):
+        """Probe every device in the background and publish status to the dashboard"""
+        if self._probe_thread and self._probe_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._probe_thread = threading.Thread(target=self._probe_loop, args=(dashboard_url,),
+                                              name='iot-health-probe', daemon=True)
+        self._probe_thread.start()
+    
+    def stop(self):
+        self._stop_event.set()
+        self._executor.shutdown(wait=False)
+        self._probe_executor.shutdown(wait=False)
+    
+    def get_device_status(self):
+        """Per-device reachability, latency and circuit state"""
+        with self._lock:
+            return {
+                device_id: {
+                    'type': device['type'],
+                    'status': device['status'],
+                    'latency_ms': device['latency_ms'],
+                    'last_seen': device['last_seen'],
+                    'circuit': device['circuit']
+                }
+                for device_id, device in self.devices.items()
+            }
+    
+    def _probe_loop(self, dashboard_url):
+        while not self._stop_event.is_set():
+            with self._lock:
+                device_ids = list(self.devices)
+            probes = [self._probe_executor.submit(self._probe_device, device_id) for device_id in device_ids]
+            for probe in probes:
+                try:
+                    probe.result(timeout=self.timeout + 1)
+                except Exception:
+                    pass
+            
+            if dashboard_url:
+                try:
+                    self._session.post(f"{dashboard_url}/api/iot_status",
+                                       json=self.get_device_status(), timeout=1)
+                except Exception:
+                    pass  # Dashboard might not be running
+            self._stop_event.wait(self.probe_interval)
+    
+    def _probe_device(self, device_id):
+        """Health check; any HTTP response means the device is reachable"""
+        with self._lock:
+            device = self.devices.get(device_id)
+            if device is None:
+                return
+            url = device['health_endpoint'] or device['endpoint']
+        started = time.time()
+        try:
+            self._session.get(url, timeout=self.timeout)
+            self._record_result(device_id, True, time.time() - started)
+        except Exception:
+            self._record_result(device_id, False, time.time() - started)
+    
+    def _allow_request(self, device):
+        # Called with the lock held. An open circuit lets one trial request
+        # through (half-open) after circuit_reset seconds.
+        if device['circuit'] != 'open':
+            return True
+        if time.time() - device['circuit_opened_at'] >= self.circuit_reset:
+            device['circuit'] = 'half_open'
+            return True
+        return False
+    
+    def _record_result(self, device_id, success, elapsed):
+        with self._lock:
+            device = self.devices.get(device_id)
+            if device is None:
+                return
+            if success:
+                device['status'] = 'online'
+                device['latency_ms'] = round(elapsed * 1000, 1)
+                device['last_seen'] = datetime.now().isoformat()
+                device['consecutive_failures'] = 0
+                device['circuit'] = 'closed'
+                device['circuit_opened_at'] = None
+            else:
+                device['consecutive_failures'] += 1
+                if device['circuit'] == 'half_open' or \
+                        device['consecutive_failures'] >= self.failure_threshold:
+                    if device['circuit'] != 'open':
+                        logger.warning("IoT device %s unreachable, circuit opened", device_id)
+                    device['circuit'] = 'open'
+                    device['circuit_opened_at'] = time.time()
+                    device['status'] = 'offline'
@@ -0,0 +1,339 @@
+"""
+Multi-Camera Supervisor for Assistive HAR System
+Runs one detector process per camera and merges their events into a single
+alert pipeline and dashboard feed
+"""
+
+import os
+import json
+import logging
+import time
+import queue
+import threading
+import multiprocessing
+from incident_clips import clip_name, load_clip_config
+from structured_log import setup_logging
+
+logger = logging.getLogger('camera_supervisor')
+
+DEFAULT_SUPERVISOR_CONFIG = {
+    'restart_delay': 2,
+    'max_restart_delay': 60,
+    'stable_after': 60,
+    'event_queue_size': 1000,
+    'fusion_window': 2.0
+}
+
+# Seconds after which a worker ignores a clip request it hasn't handled yet
+CLIP_REQUEST_MAX_AGE = 2.0
+
+
+def load_camera_config(config_file='config.json'):
+    """Camera list and supervisor settings from config.json"""
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    settings = dict(DEFAULT_SUPERVISOR_CONFIG)
+    settings.update(config.get('supervisor', {}))
+    return config.get('cameras', []), settings
+
+
+def pin_to_core(core):
+    """Pin the current process to one CPU core where the platform allows it"""
+    if core is None:
+        return False
+    try:
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, {core % os.cpu_count()})
+        else:
+            import psutil  # Windows needs psutil for affinity
+            psutil.Process().cpu_affinity([core % os.cpu_count()])
+        return True
+    except Exception as e:
+        logger.warning("Could not pin to core %s: %s", core, e)
+        return False
+
+
+class CameraAlertSink:
+    """
+    Stands in for AlertManager inside a camera worker.
+
+    Alerts and activity updates are tagged with the camera id and room and
+    forwarded to the supervisor, which owns the only TTS engine, rate limiter
+    and dashboard connection. The frames are in this process, so incident
+    clips are recorded here, but only once the supervisor has admitted the
+    alert and sent back the clip's name. Profiling requests the supervisor
+    claims from the dashboard come back the same way and are handed to the
+    detector loop with its next summary.
+    """
+
+    def __init__(self, events, camera_id, room=None, resident_id=None):
+        self.events = events
+        self.camera_id = camera_id
+        self.room = room
+        self.resident_id = resident_id
+        self._clip_recorder = None
+        self._profile_request = None
+
+    @property
+    def clip_recorder(self):
+        return self._clip_recorder
+
+    @clip_recorder.setter
+    def clip_recorder(self, recorder):
+        # Set by the detector loop when incident clips are enabled; the
+        # supervisor only links clips for cameras that can record them
+        self._clip_recorder = recorder
+        if recorder is not None:
+            self._put(('clips', {'camera_id': self.camera_id}), block=True)
+
+    def handle_commands(self, commands, stop_event):
+        """Act on the supervisor's clip and profiling requests (runs on its own thread)"""
+        while not stop_event.is_set():
+            try:
+                kind, payload = commands.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            if kind == 'clip':
+                alert_type, name, requested_at = payload
+                # A request left over from before a restart would record the wrong moment
+                if self._clip_recorder is not None and time.time() - requested_at < CLIP_REQUEST_MAX_AGE:
+                    self._clip_recorder.capture(alert_type, name=name)
+            elif kind == 'profile':
+                self._profile_request = payload
+
+    def _put(self, event, block=False):
+        try:
+            self.events.put(event, block=block, timeout=0.5 if block else None)
+            return True
+        except queue.Full:
+            logger.warning("[%s] Supervisor queue full, dropped %s event", self.camera_id, event[0])
+            return False
+
+    def trigger_alert(self, alert_type, message, priority='normal', cooldown=5, source=None,
+                      camera_id=None, room=None, confidence=None, resident_id=None, clip=None):
+        alert = {
+            'alert_type': alert_type,
+            'message': message,
+            'priority': priority,
+            'cooldown': cooldown,
+            'source': source,
+            'camera_id': camera_id or self.camera_id,
+            'room': room or self.room,
+            'resident_id': resident_id or self.resident_id,
+            'confidence': confidence,
+            'clip': clip
+        }
+        # Never drop a critical alert just because the queue is momentarily full
+        return self._put(('alert', alert), block=priority == 'critical')
+
+    def send_activity_update(self, activity, camera_id=None, room=None, resident_id=None):
+        self._put(('activity', {'activity': activity, 'camera_id': camera_id or self.camera_id,
+                                'room': room or self.room,
+                                'resident_id': resident_id or self.resident_id}))
+
+    def send_activity_summary(self, summary):
+        """Forward the summary; returns a profiling request the supervisor sent back, if any"""
+        self._put(('summary', dict(summary, camera_id=self.camera_id, room=self.room,
+                                   resident_id=self.resident_id)))
+        profile_request, self._profile_request = self._profile_request, None
+        return profile_request
+
+    def send_profile_summary(self, summary):
+        return self._put(('profile_summary', summary), block=True)
+
+    def stop(self):
+        pass
+
+
+def _camera_worker(camera, events, commands, stop_event):
+    """Worker process entry point: one camera, one Holistic instance"""
+    camera_id = camera['id']
+    setup_logging(f'detector_{camera_id}')
+    pin_to_core(camera.get('core'))
+    # Imported after pinning so MediaPipe's threads start on the assigned core
+    import gesture_holistic
+    sink = CameraAlertSink(events, camera_id, camera.get('room'), camera.get('resident_id'))
+    threading.Thread(target=sink.handle_commands, args=(commands, stop_event),
+                     name='supervisor-commands', daemon=True).start()
+    gesture_holistic.main(camera_source=camera.get('source'), camera_id=camera_id,
+                          alert_manager=sink, show_window=camera.get('show_window', False),
+                          stop_event=stop_event, preview_port=camera.get('preview_port'))
+
+
+class CameraSupervisor:
+    """
+    Starts a detector process per configured camera, restarts crashed workers
+    with exponential backoff, and feeds all of their events into one
+    AlertManager.
+    """
+
+    def __init__(self, cameras, settings, alert_manager, clip_config=None):
+        self.cameras = {camera['id']: camera for camera in cameras}
+        self.settings = settings
+        self.alert_manager = alert_manager
+        self.clip_config = clip_config or load_clip_config()
+        # Spawn on every platform: MediaPipe and OpenCV are not fork-safe
+        self._ctx = multiprocessing.get_context('spawn')
+        self.events = self._ctx.Queue(maxsize=settings['event_queue_size'])
+        # Commands back to each worker: clips for alerts the pipeline admitted,
+        # and profiling requests claimed with the worker's summary
+        self.commands = {camera_id: self._ctx.Queue() for camera_id in self.cameras}
+        self.clip_cameras = set()
+        self._clips = {}  # camera_id -> (clip name, end of its post window)
+        self.stop_event = self._ctx.Event()
+        self.workers = {}
+        self.running = False
+        self.status = {
+            camera_id: {'pid': None, 'restarts': 0, 'started': None, 'next_start': 0.0,
+                        'delay': settings['restart_delay'], 'exitcode': None}
+            for camera_id in self.cameras
+        }
+        self._pump = threading.Thread(target=self._pump_events, name='supervisor-events', daemon=True)
+
+    def start(self):
+        self.running = True
+        self._pump.start()
+        for camera_id in self.cameras:
+            self._start_worker(camera_id)
+
+    def _start_worker(self, camera_id):
+        camera = self.cameras[camera_id]
+        process = self._ctx.Process(target=_camera_worker, name=f"detector-{camera_id}",
+                                    args=(camera, self.events, self.commands[camera_id], self.stop_event))
+        process.start()
+        self.workers[camera_id] = process
+        status = self.status[camera_id]
+        status['pid'] = process.pid
+        status['started'] = time.time()
+        logger.info("Started detector for camera '%s' (pid %s)", camera_id, process.pid)
+
+    def check_workers(self):
+        """Restart workers that exited, backing off if they keep crashing"""
+        now = time.time()
+        for camera_id, process in list(self.workers.items()):
+            status = self.status[camera_id]
+            if process.is_alive():
+                # A worker that stayed up long enough resets its backoff
+                if now - status['started'] > self.settings['stable_after']:
+                    status['delay'] = self.settings['restart_delay']
+                continue
+            if status['next_start'] == 0.0:
+                # No clips from this camera until its next worker is recording
+                self.clip_cameras.discard(camera_id)
+                status['exitcode'] = process.exitcode
+                status['next_start'] = now + status['delay']
+                logger.warning("Detector for camera '%s' exited (code %s), restarting in %ss",
+                               camera_id, process.exitcode, status['delay'])
+            elif now >= status['next_start']:
+                process.join(timeout=0)
+                status['next_start'] = 0.0
+                status['restarts'] += 1
+                status['delay'] = min(status['delay'] * 2, self.settings['max_restart_delay'])
+                self._start_worker(camera_id)
+
+    def _pump_events(self):
+        while self.running:
+            try:
+                kind, payload = self.events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            try:
+                if kind == 'alert':
+                    self.admit_alert(payload)
+                elif kind == 'clips':
+                    self.clip_cameras.add(payload['camera_id'])
+                elif kind == 'activity':
+                    self.alert_manager.send_activity_update(**payload)
+                elif kind == 'summary':
+                    # A profiling request claimed with this summary belongs to its camera
+                    profile_request = self.alert_manager.send_activity_summary(payload)
+                    if profile_request:
+                        self.commands[payload['camera_id']].put(('profile', profile_request))
+                elif kind == 'profile_summary':
+                    self.alert_manager.send_profile_summary(payload)
+            except Exception as e:
+                logger.error("Supervisor event error: %s", e)
+
+    def admit_alert(self, payload, now=None):
+        """
+        Run a worker's alert through fusion and rate limiting. Only an admitted
+        fall/help alert asks its camera to record a clip; the clip's name is in
+        the alert before it is queued.
+        """
+        camera_id = payload['camera_id']
+        clip, new_clip = payload.get('clip'), False
+        if clip is None and camera_id in self.clip_cameras and \
+                payload['alert_type'] in self.clip_config['alert_types']:
+            now = now if now is not None else time.time()
+            current = self._clips.get(camera_id)
+            if current is not None and now < current[1]:
+                # The camera is still recording the clip of an earlier alert
+                clip = current[0]
+            else:
+                clip = clip_name(payload['alert_type'], now, self.clip_config['extension'], camera_id)
+                new_clip = True
+            payload = dict(payload, clip=clip)
+        admitted = self.alert_manager.trigger_alert(**payload)
+        if admitted and new_clip:
+            self._clips[camera_id] = (clip, now + self.clip_config['post_seconds'])
+            self.commands[camera_id].put(('clip', (payload['alert_type'], clip, now)))
+        return admitted
+
+    def get_status(self):
+        return {camera_id: dict(status, alive=self.workers[camera_id].is_alive())
+                for camera_id, status in self.status.items()}
+
+    def stop(self, timeout=5):
+        """Ask workers to finish their session cleanly, then terminate stragglers"""
+        self.stop_event.set()
+        deadline = time.time() + timeout
+        for process in self.workers.values():
+            process.join(timeout=max(0, deadline - time.time()))
+        for process in self.workers.values():
+            if process.is_alive():
+                process.terminate()
+        self.running = False
+
+
+def main():
+    cameras, settings = load_camera_config()
+    if not cameras:
+        logger.error("No cameras configured; add a \"cameras\" list to config.json")
+        return
+
+    from gesture_holistic import AlertManager, load_node_tags
+    from local_ipc import LocalPublisher, load_ipc_config
+    ipc = None
+    ipc_config = load_ipc_config()
+    if ipc_config['enabled']:
+        try:
+            ipc = LocalPublisher(ipc_config['name'], ipc_config['slots'],
+                                 ipc_config['slot_size'], ipc_config['state_size'],
+                                 ipc_config['heartbeat_interval'])
+        except Exception as e:
+            logger.warning("Shared memory unavailable (%s), using HTTP", e)
+    alert_manager = AlertManager(ipc=ipc, fusion_window=settings['fusion_window'],
+                                 node=load_node_tags())
+    supervisor = CameraSupervisor(cameras, settings, alert_manager)
+    supervisor.start()
+    logger.info("Supervising %d camera(s). Press Ctrl+C to stop.", len(cameras))
+    try:
+        while True:
+            time.sleep(1)
+            supervisor.check_workers()
+    except KeyboardInterrupt:
+        logger.info("Stopping camera workers...")
+    finally:
+        supervisor.stop()
+        alert_manager.stop()
+        if ipc:
+            ipc.close()
+
+
+if __name__ == '__main__':
+    setup_logging('supervisor')
+    main()
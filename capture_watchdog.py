@@ -0,0 +1,294 @@
+"""
+Capture Watchdog for Assistive HAR System
+Reads the camera on its own thread, reopens a failed or hung capture with
+backoff (the model stays loaded), and reports stalls long enough that the
+resident is no longer being watched
+"""
+
+import json
+import logging
+import time
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WATCHDOG_CONFIG = {
+    'stall_timeout': 3.0,
+    'inference_timeout': 10.0,
+    'backoff_initial': 1.0,
+    'backoff_max': 30.0,
+    'down_alert_after': 60.0,
+    'check_interval': 1.0
+}
+
+
+def load_watchdog_config(config_file='config.json'):
+    """Load the watchdog section of config.json merged over defaults"""
+    config = dict(DEFAULT_WATCHDOG_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('watchdog', {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+class CameraReader:
+    """
+    Camera reads on a background thread, newest frame handed to the detector.
+
+    `read(timeout)` returns the next frame or None, so a camera that stops
+    delivering can't block the detector loop. When `cap.read()` fails the
+    reader releases the capture and calls `open_fn(source)` until it gets a
+    working one, waiting `backoff_initial` seconds after a failed open and
+    doubling up to `backoff_max`. A read that never returns can't be
+    interrupted; `restart()` abandons that thread and its capture and starts
+    a fresh reader.
+
+    Finite sources (video files) hand over every frame and end at EOF
+    instead of reopening.
+    """
+
+    def __init__(self, cap, open_fn, source=None, backoff_initial=1.0, backoff_max=30.0, finite=False):
+        self.open_fn = open_fn
+        self.source = source
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.finite = finite
+        self.state = 'reading'
+        self.ended = False
+        self.frames = 0
+        self.read_failures = 0
+        self.reopen_attempts = 0
+        self.reconnects = 0
+        self.hung_reads = 0
+        self.last_frame_at = time.time()
+        # Last frame or successful reopen: how long the current capture has
+        # gone without doing anything
+        self.last_progress_at = self.last_frame_at
+        self._frame = None
+        self._generation = 0
+        self._running = True
+        self._cond = threading.Condition()
+        self._wakeup = threading.Event()
+        self._start(cap)
+
+    def _start(self, cap):
+        self._generation += 1
+        thread = threading.Thread(target=self._run, args=(self._generation, cap),
+                                  name=f'camera-reader-{self._generation}', daemon=True)
+        thread.start()
+
+    def _current(self, generation):
+        return self._running and generation == self._generation
+
+    def _run(self, generation, cap):
+        delay = self.backoff_initial
+        while self._current(generation):
+            if cap is None:
+                with self._cond:
+                    self.state = 'reopening'
+                    self.reopen_attempts += 1
+                try:
+                    cap = self.open_fn(self.source)
+                except Exception as e:
+                    logger.warning("Camera reopen failed: %s", e)
+                    cap = None
+                if cap is None:
+                    self._wakeup.wait(delay)
+                    delay = min(delay * 2, self.backoff_max)
+                    continue
+                with self._cond:
+                    if not self._current(generation):
+                        break
+                    self.state = 'reading'
+                    self.reconnects += 1
+                    self.last_progress_at = time.time()
+                logger.info("Camera reopened")
+
+            ret, frame = cap.read()
+            if not self._current(generation):
+                break  # Abandoned while blocked in read(); a newer reader owns the camera
+            if ret:
+                delay = self.backoff_initial
+                with self._cond:
+                    while self.finite and self._frame is not None and self._current(generation):
+                        self._cond.wait(0.5)
+                    self._frame = frame
+                    self.frames += 1
+                    self.last_frame_at = self.last_progress_at = time.time()
+                    self._cond.notify_all()
+            elif self.finite:
+                with self._cond:
+                    self.ended = True
+                    self._cond.notify_all()
+                break
+            else:
+                with self._cond:
+                    self.read_failures += 1
+                logger.warning("Camera read failed, reopening capture")
+                cap.release()
+                cap = None
+        if cap is not None:
+            cap.release()
+
+    def read(self, timeout=0.5):
+        """The frame captured since the last call, or None if none arrives within `timeout`"""
+        with self._cond:
+            if self._frame is None and not self.ended:
+                self._cond.wait(timeout)
+            frame, self._frame = self._frame, None
+            self._cond.notify_all()
+            return frame
+
+    def restart(self):
+        """Give up on a capture whose read() hangs and open a new one"""
+        with self._cond:
+            self.hung_reads += 1
+            self.state = 'reopening'
+            self.last_progress_at = time.time()
+            self._start(None)
+            self._cond.notify_all()
+
+    def get_stats(self):
+        with self._cond:
+            return {'state': self.state, 'frames': self.frames, 'read_failures': self.read_failures,
+                    'reopen_attempts': self.reopen_attempts, 'reconnects': self.reconnects,
+                    'hung_reads': self.hung_reads}
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._wakeup.set()
+
+
+class CaptureWatchdog:
+    """
+    Watches frame arrival and inference heartbeats from its own thread.
+
+    A stall starts when no frame has arrived for `stall_timeout` seconds, or
+    when the detector loop hasn't come round (`heartbeat`) for
+    `inference_timeout` seconds, i.e. it is stuck in inference or drawing. If the reader is stuck inside read() the
+    watchdog restarts it, backing off like the reader does. A stall lasting
+    `down_alert_after` seconds calls `on_down(kind, seconds)` once;
+    `on_restored(seconds)` follows when frames flow again. Running on its own
+    thread, it still reports when the detector loop itself is hung.
+    """
+
+    def __init__(self, reader, config, on_down=None, on_restored=None):
+        self.reader = reader
+        self.config = config
+        self.on_down = on_down
+        self.on_restored = on_restored
+        self.started = time.time()
+        self.last_heartbeat = self.started
+        self.stalls = 0
+        self.inference_stalls = 0
+        self.stalled_seconds = 0.0
+        self.longest_stall = 0.0
+        self.stall_since = None
+        self.stall_kind = None
+        self.down = False
+        self._restart_delay = config['backoff_initial']
+        self._next_restart = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='capture-watchdog', daemon=True)
+        self._thread.start()
+
+    def heartbeat(self, now=None):
+        """Called by the detector loop on every pass, with or without a frame"""
+        self.last_heartbeat = now if now is not None else time.time()
+
+    def _run(self):
+        while not self._stop.wait(self.config['check_interval']):
+            self.check()
+
+    def check(self, now=None):
+        now = now if now is not None else time.time()
+        reader = self.reader
+        frame_age = now - reader.last_frame_at
+        inference_age = now - self.last_heartbeat
+        if reader.ended:
+            kind = None
+        elif frame_age > self.config['stall_timeout']:
+            kind = 'capture'
+        elif inference_age > self.config['inference_timeout']:
+            kind = 'inference'
+        else:
+            kind = None
+
+        restored = None
+        with self._lock:
+            if kind and self.stall_since is None:
+                self.stall_since = max(self.started, now - (frame_age if kind == 'capture' else inference_age))
+                self.stall_kind = kind
+                if kind == 'capture':
+                    self.stalls += 1
+                else:
+                    self.inference_stalls += 1
+                logger.warning("Watchdog: %s stalled", kind)
+            if kind is None and self.stall_since is not None:
+                duration = now - self.stall_since
+                self.stalled_seconds += duration
+                self.longest_stall = max(self.longest_stall, duration)
+                was_down = self.down
+                self.stall_since = self.stall_kind = None
+                self.down = False
+                self._restart_delay = self.config['backoff_initial']
+                logger.info("Watchdog: monitoring recovered after %.1fs", duration)
+                if was_down:
+                    restored = duration
+            elif kind:
+                duration = now - self.stall_since
+                fire_down = not self.down and duration >= self.config['down_alert_after']
+                if fire_down:
+                    self.down = True
+
+        if restored is not None and self.on_restored:
+            self.on_restored(restored)
+        if kind is None:
+            return
+
+        if (kind == 'capture' and reader.state == 'reading' and now >= self._next_restart
+                and now - reader.last_progress_at > self.config['stall_timeout']):
+            # read() has been blocked longer than the stall timeout: a hung driver
+            logger.warning("Watchdog: no frame for %.1fs, restarting capture", frame_age)
+            reader.restart()
+            self._next_restart = now + self._restart_delay
+            self._restart_delay = min(self._restart_delay * 2, self.config['backoff_max'])
+        if fire_down and self.on_down:
+            self.on_down(kind, duration)
+
+    def get_stats(self, now=None):
+        now = now if now is not None else time.time()
+        with self._lock:
+            current = now - self.stall_since if self.stall_since is not None else 0.0
+            uptime = now - self.started
+            if self.reader.ended:
+                state = 'ended'
+            elif self.down:
+                state = 'down'
+            elif self.stall_since is not None:
+                state = 'stalled'
+            else:
+                state = 'ok'
+            stats = {
+                'state': state,
+                'stall_kind': self.stall_kind,
+                'uptime': round(uptime, 1),
+                'monitored_seconds': round(uptime - self.stalled_seconds - current, 1),
+                'availability': round(100.0 * (1 - (self.stalled_seconds + current) / uptime), 2) if uptime > 0 else 100.0,
+                'stalls': self.stalls,
+                'inference_stalls': self.inference_stalls,
+                'current_stall': round(current, 1),
+                'longest_stall': round(max(self.longest_stall, current), 1),
+                'last_frame_age': round(now - self.reader.last_frame_at, 1)
+            }
+        stats['capture'] = self.reader.get_stats()
+        return stats
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=2)
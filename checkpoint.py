@@ -0,0 +1,112 @@
+"""
+Detector Checkpointing for Assistive HAR System
+Periodic, atomic snapshots of tracker state, session stats and alert
+cooldowns so a restarted detector resumes where it left off
+"""
+
+import os
+import json
+import logging
+import time
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_CONFIG = {
+    'enabled': True,
+    'path': 'checkpoints/detector_state.json',
+    'interval': 10,
+    'resume_gap': 300
+}
+
+
+def load_checkpoint_config(config_file='config.json'):
+    """Load the checkpoint section of config.json merged over defaults"""
+    config = dict(DEFAULT_CHECKPOINT_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('checkpoint', {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+def write_atomic(path, data):
+    """Write-then-rename so readers only ever see a complete file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    """The last complete checkpoint, or None"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class CheckpointWriter:
+    """
+    Background checkpoint writer.
+
+    The detector hands over a snapshot dict with `submit`; serialization and
+    disk I/O happen on this thread, at most once per `interval` seconds, and
+    only the newest pending snapshot is written.
+    """
+
+    def __init__(self, path, interval=10):
+        self.path = path
+        self.interval = interval
+        self.writes = 0
+        self.last_error = None
+        self._pending = None
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, snapshot):
+        with self._cond:
+            self._pending = snapshot
+            self._cond.notify()
+
+    def _run(self):
+        last_write = 0.0
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running and self._pending is None:
+                    return
+                # Coalesce: newer snapshots replace this one while we wait
+                deadline = last_write + self.interval
+                while self._running and time.time() < deadline:
+                    self._cond.wait(deadline - time.time())
+                snapshot, self._pending = self._pending, None
+            if snapshot is None:
+                continue
+            try:
+                snapshot['saved_at'] = time.time()
+                write_atomic(self.path, snapshot)
+                self.writes += 1
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error("Checkpoint write failed: %s", e)
+            last_write = time.time()
+
+    def stop(self, final_snapshot=None):
+        """Write `final_snapshot` (if given) and stop the writer"""
+        with self._cond:
+            if final_snapshot is not None:
+                self._pending = final_snapshot
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=5)
@@ -1,10 +1,24 @@
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, Response, render_template, jsonify, request, send_from_directory
 from flask_cors import CORS
 import json
 import os
+import logging
+import collections
 from datetime import datetime
 import threading
 import time
+import hmac
+from urllib.parse import urlsplit
+from local_ipc import LocalSubscriber, StaleSegmentError, load_ipc_config
+from resident_state import ResidentRegistry, apply_alert_merge, apply_alert_statistics
+from activity_rollups import ActivityRollups, load_timeseries_config
+from log_export import FORMATS, export, iter_log_records
+from structured_log import setup_logging
+from profiler import load_profiler_config
+from detector_settings import (SettingsError, compile_settings, load_detector_settings, read_detector_section,
+                               settings_to_dict, update_detector_settings)
+
+logger = logging.getLogger('dashboard')
 
 app = Flask(__name__, static_folder='static')
 CORS(app)
@@ -39,12 +53,107 @@ dashboard_data = {
         }
     },
     'system_status': 'Active',
-    'monitoring_started': datetime.now().isoformat()
+    'monitoring_started': datetime.now().isoformat(),
+    'iot_devices': {},
+    # Capture watchdog stats per 'node_id/camera_id' ('default' camera for a standalone detector)
+    'capture_health': {}
+}
+
+# A detector that hasn't reported for this long is considered unresponsive
+HEALTH_REPORT_TIMEOUT = 15
+
+# Profiling sessions requested from the dashboard are handed to the detector
+# with its next activity duration update
+profiling_state = {
+    'status': 'idle',
+    'pending': None,
+    'requested_at': None,
+    'claimed_at': None,
+    'message': None,
+    'summary': None
 }
 
+# A request no detector claims within this many seconds expires, and so does
+# a claimed session whose summary is this late past the profiler's own limit
+PROFILE_CLAIM_TIMEOUT = 30
+
+ADMIN_ADDRESSES = ('127.0.0.1', '::1', 'localhost')
+
+def _trusted_node():
+    """
+    Detectors may claim profiling requests and post summaries from this
+    machine, or from another one presenting dashboard.node_token
+    """
+    if request.remote_addr in ADMIN_ADDRESSES:
+        return True
+    token = request.headers.get('X-Node-Token', '')
+    return bool(NODE_TOKEN) and hmac.compare_digest(token, NODE_TOKEN)
+
 # Lock for thread-safe operations
 data_lock = threading.Lock()
 
+# Events tagged with a resident id go to that resident's own shard instead of
+# the single-person dashboard_data above
+residents = ResidentRegistry()
+
+def _clips_dir(config_file='config.json'):
+    """Where the detector writes incident clips (incident_clips.output_dir)"""
+    try:
+        with open(config_file, 'r') as f:
+            return json.load(f).get('incident_clips', {}).get('output_dir', 'incident_clips')
+    except (OSError, ValueError):
+        return 'incident_clips'
+
+CLIPS_DIR = _clips_dir()
+
+def load_dashboard_config(config_file='config.json'):
+    """Address to serve on (dashboard section); use 0.0.0.0 to accept detectors on other machines"""
+    config = {'host': '127.0.0.1', 'port': 5000, 'debug': False}
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('dashboard', {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+# Lets detectors on other machines claim profiling requests and post summaries
+NODE_TOKEN = load_dashboard_config().get('node_token') or ''
+
+def _preview_urls(config_file='config.json', request_host=None):
+    """
+    MJPEG streams the browser can open: one per supervised camera with a
+    `preview_port`, otherwise the standalone detector's (preview section).
+    A preview bound to all interfaces is reached on the host the browser
+    used for the page (`request_host`).
+    """
+    preview = {'port': 5001}
+    cameras = []
+    try:
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+        preview.update(config.get('preview', {}))
+        cameras = config.get('cameras', [])
+    except (OSError, ValueError):
+        pass
+    if not preview.get('enabled', True):
+        return []
+    host = preview.get('host', '127.0.0.1')
+    if host in ('0.0.0.0', '::', ''):
+        host = urlsplit(f"//{request_host}").hostname if request_host else '127.0.0.1'
+    if ':' in host:
+        host = f"[{host}]"
+    streams = [
+        {'camera_id': camera['id'], 'room': camera.get('room'),
+         'url': f"http://{host}:{camera['preview_port']}/preview.mjpg"}
+        for camera in cameras if camera.get('preview_port')
+    ]
+    return streams or [{'camera_id': None, 'room': None,
+                        'url': f"http://{host}:{preview['port']}/preview.mjpg"}]
+
+# Per-minute/per-hour activity time for the charts, updated as activity
+# updates arrive (persisted once attached in __main__)
+rollups = ActivityRollups(load_timeseries_config())
+
 @app.route('/')
 def index():
     """Serve the enhanced dashboard page"""
@@ -55,34 +164,148 @@ def serve_static(filename):
     """Serve static files"""
     return send_from_directory('static', filename)
 
+@app.route('/clips/<path:filename>')
+def serve_clip(filename):
+    """Serve an incident clip recorded around a fall/help alert"""
+    return send_from_directory(os.path.abspath(CLIPS_DIR), filename)
+
+@app.route('/api/preview')
+def preview_info():
+    """Where the browser can open the live annotated view"""
+    streams = _preview_urls(request_host=request.host)
+    return jsonify({'url': streams[0]['url'] if streams else None, 'cameras': streams})
+
 @app.route('/api/status')
 def get_status():
     """Get current system status"""
     with data_lock:
         return jsonify(dashboard_data)
 
+@app.route('/api/health')
+def get_health():
+    """
+    Capture uptime, stalls and reconnects reported by each detector, and the
+    state of each of its startup components (camera, model, alerts, dashboard)
+    """
+    now = time.time()
+    with data_lock:
+        cameras = {camera: dict(health) for camera, health in dashboard_data['capture_health'].items()}
+    for health in cameras.values():
+        health['report_age'] = round(now - health.pop('reported_at'), 1)
+        if health['report_age'] > HEALTH_REPORT_TIMEOUT and health['state'] != 'ended':
+            health['state'] = 'unresponsive'
+    if not cameras:
+        status = 'unknown'
+    elif all(health['state'] in ('ok', 'ended')
+             and all(c['state'] != 'failed' for c in health.get('startup', {}).values())
+             for health in cameras.values()):
+        status = 'ok'
+    else:
+        status = 'degraded'
+    return jsonify({'status': status, 'cameras': cameras})
+
+def _ingest_alert(alert):
+    """Record an alert from the detector (HTTP or local shared memory)"""
+    if alert.get('merge'):
+        _merge_alert(alert)
+        return
+    alert['received_at'] = datetime.now().isoformat()
+    if alert.get('clip'):
+        alert['clip_url'] = f"/clips/{alert['clip']}"
+    
+    # Resident-tagged alerts also feed the main view: the dashboard page has
+    # no per-resident view, only /api/residents does
+    if alert.get('resident_id'):
+        residents.shard(alert['resident_id']).add_alert(dict(alert))
+    
+    with data_lock:
+        # Add to alerts list (keep last 50)
+        dashboard_data['alerts'].insert(0, alert)
+        dashboard_data['alerts'] = dashboard_data['alerts'][:50]
+        apply_alert_statistics(dashboard_data['statistics'], alert)
+
+def _merge_alert(update):
+    """Another camera saw an alert already received: update its cameras and confidence"""
+    if update.get('resident_id'):
+        residents.shard(update['resident_id']).merge_alert(update)
+    with data_lock:
+        for alert in dashboard_data['alerts']:
+            if alert.get('event_id') == update['event_id']:
+                apply_alert_merge(alert, update)
+                break
+
+def _ingest_activity(activity, camera_id=None, tags=None):
+    # The 'default' series and the main view cover every camera; resident
+    # series and shards are kept alongside for /api/residents
+    rollups.record(activity, camera_id=camera_id)
+    if tags and tags.get('resident_id'):
+        rollups.record(activity, series=tags['resident_id'], camera_id=camera_id)
+        residents.shard(tags['resident_id']).set_activity(activity, dict(tags, camera_id=camera_id))
+    entry = {
+        'activity': activity,
+        'timestamp': datetime.now().isoformat()
+    }
+    if camera_id is not None:
+        entry['camera_id'] = camera_id
+    with data_lock:
+        dashboard_data['current_activity'] = activity
+        dashboard_data['activity_log'].insert(0, entry)
+        dashboard_data['activity_log'] = dashboard_data['activity_log'][:100]
+
+def _ingest_activity_duration(data):
+    if isinstance(data.get('capture'), dict):
+        with data_lock:
+            # Standalone detectors on several nodes all lack a camera id
+            node_id, camera_id = data.get('node_id') or 'local', data.get('camera_id') or 'default'
+            dashboard_data['capture_health'][f"{node_id}/{camera_id}"] = dict(
+                data['capture'], node_id=node_id, camera_id=camera_id,
+                startup=data.get('startup') or {}, reported_at=time.time())
+    if data.get('resident_id'):
+        residents.shard(data['resident_id']).set_activity_duration(data)
+    with data_lock:
+        ad = dashboard_data['activity_duration']
+        ad['current_activity'] = data.get('current_activity', ad['current_activity'])
+        ad['current_duration'] = data.get('current_duration', ad['current_duration'])
+        ad['last_movement'] = data.get('last_movement', ad['last_movement'])
+        # Merge daily stats if provided
+        if 'daily_stats' in data and isinstance(data['daily_stats'], dict):
+            ad['daily_stats'].update(data['daily_stats'])
+
+def _claim_profile_request():
+    """Hand any pending profiling request to the detector"""
+    with data_lock:
+        _expire_profile_request()
+        profile_request = profiling_state['pending']
+        if profile_request:
+            profiling_state['pending'] = None
+            profiling_state['status'] = 'running'
+            profiling_state['claimed_at'] = datetime.now().isoformat()
+    return profile_request
+
+def _expire_profile_request(now=None):
+    """
+    Drop a request no detector picked up, or a session that never reported
+    back (detector stopped), so it doesn't block new requests. Call with
+    data_lock held.
+    """
+    now = now or datetime.now()
+    status = profiling_state['status']
+    def age(key):
+        return (now - datetime.fromisoformat(profiling_state[key])).total_seconds()
+    if status == 'pending' and age('requested_at') > PROFILE_CLAIM_TIMEOUT:
+        message = 'No detector claimed the profiling request'
+    elif status == 'running' and age('claimed_at') > load_profiler_config()['max_seconds'] + PROFILE_CLAIM_TIMEOUT:
+        message = 'The detector never reported a profiling summary'
+    else:
+        return
+    logger.warning("Profiling request expired: %s", message)
+    profiling_state.update(status='idle', pending=None, message=message)
+
 @app.route('/api/alert', methods=['POST'])
 def receive_alert():
     """Receive alert from the main system"""
     try:
-        alert = request.json
-        alert['received_at'] = datetime.now().isoformat()
-        
-        with data_lock:
-            # Add to alerts list (keep last 50)
-            dashboard_data['alerts'].insert(0, alert)
-            dashboard_data['alerts'] = dashboard_data['alerts'][:50]
-            
-            # Update statistics
-            if alert['type'] == 'fall':
-                dashboard_data['statistics']['falls_today'] += 1
-                dashboard_data['statistics']['last_fall_time'] = alert['received_at']
-            elif alert['type'] == 'help':
-                dashboard_data['statistics']['help_requests_today'] += 1
-                dashboard_data['statistics']['last_help_time'] = alert['received_at']
-            elif alert['type'] == 'gesture':
-                dashboard_data['statistics']['total_gestures_today'] += 1
-        
+        _ingest_alert(request.json)
         return jsonify({'status': 'success'}), 200
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -92,16 +315,7 @@ def update_activity():
     """Update current activity"""
     try:
         data = request.json
-        activity = data.get('activity', 'Unknown')
-        
-        with data_lock:
-            dashboard_data['current_activity'] = activity
-            dashboard_data['activity_log'].insert(0, {
-                'activity': activity,
-                'timestamp': datetime.now().isoformat()
-            })
-            dashboard_data['activity_log'] = dashboard_data['activity_log'][:100]
-        
+        _ingest_activity(data.get('activity', 'Unknown'), data.get('camera_id'), data)
         return jsonify({'status': 'success'}), 200
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -111,38 +325,196 @@ def update_activity_duration():
     """Receive activity duration data from main system"""
     try:
         data = request.json or {}
-        print(f"[DEBUG] Received activity duration data: {data}")  # Debug log
+        logger.debug("Received activity duration data: %s", data)
+        _ingest_activity_duration(data)
+        profile_request = _claim_profile_request() if _trusted_node() else None
+        logger.debug("Updated activity duration: %s", dashboard_data['activity_duration'])
+        response = {'status': 'success'}
+        if profile_request:
+            response['profile_request'] = profile_request
+        return jsonify(response), 200
+    except Exception as e:
+        logger.error("Failed to update activity duration: %s", e)
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/residents')
+def residents_overview():
+    """Every resident's current activity and open alerts (optionally ?room=...)"""
+    return jsonify({
+        'residents': residents.overview(room=request.args.get('room')),
+        'count': len(residents)
+    })
+
+@app.route('/api/residents/<resident_id>')
+def resident_detail(resident_id):
+    """Full state for one resident"""
+    shard = residents.get(resident_id)
+    if shard is None:
+        return jsonify({'status': 'error', 'message': 'Unknown resident'}), 404
+    return jsonify(shard.snapshot())
+
+@app.route('/api/residents/<resident_id>/acknowledge', methods=['POST'])
+def acknowledge_resident_alerts(resident_id):
+    """Acknowledge one open alert (alert_id in the body) or all of them"""
+    shard = residents.get(resident_id)
+    if shard is None:
+        return jsonify({'status': 'error', 'message': 'Unknown resident'}), 404
+    data = request.get_json(silent=True) or {}
+    count = shard.acknowledge(data.get('alert_id'))
+    return jsonify({'status': 'success', 'acknowledged': count}), 200
+
+@app.route('/api/iot_status', methods=['POST'])
+def update_iot_status():
+    """Receive per-device IoT health from the detector's health prober"""
+    try:
+        devices = request.json or {}
+        with data_lock:
+            dashboard_data['iot_devices'] = devices
+        return jsonify({'status': 'success'}), 200
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/admin/profile', methods=['GET', 'POST', 'DELETE'])
+def admin_profile():
+    """
+    Request a detector profiling session (POST), cancel one that hasn't
+    finished (DELETE) or view the latest hot-function summary (GET)
+    """
+    if request.method == 'GET':
+        with data_lock:
+            _expire_profile_request()
+            return jsonify(profiling_state)
+
+    if request.remote_addr not in ADMIN_ADDRESSES:
+        return jsonify({'status': 'error', 'message': 'Admin endpoints are local only'}), 403
+
+    if request.method == 'DELETE':
+        with data_lock:
+            cancelled = profiling_state['status'] in ('pending', 'running')
+            profiling_state.update(status='idle', pending=None,
+                                   message='Cancelled' if cancelled else profiling_state['message'])
+        return jsonify({'status': 'success', 'cancelled': cancelled}), 200
+
+    try:
+        data = request.json or {}
+        profile_request = {
+            'frames': int(data['frames']) if data.get('frames') else None,
+            'seconds': float(data['seconds']) if data.get('seconds') else None
+        }
+        with data_lock:
+            _expire_profile_request()
+            if profiling_state['status'] in ('pending', 'running'):
+                return jsonify({'status': 'error', 'message': 'Profiling already in progress'}), 409
+            profiling_state.update(pending=profile_request, status='pending',
+                                   requested_at=datetime.now().isoformat(),
+                                   claimed_at=None, message=None)
+        return jsonify({'status': 'success', 'request': profile_request}), 200
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+@app.route('/api/admin/profile/claim', methods=['POST'])
+def claim_profile_request():
+    """Detectors on the shared-memory transport collect profiling requests here"""
+    if not _trusted_node():
+        return jsonify({'status': 'error', 'message': 'Unknown detector node'}), 403
+    return jsonify({'status': 'success', 'profile_request': _claim_profile_request()}), 200
+
+@app.route('/api/admin/profile/summary', methods=['POST'])
+def receive_profile_summary():
+    """Receive a finished profiling summary from the detector"""
+    if not _trusted_node():
+        return jsonify({'status': 'error', 'message': 'Unknown detector node'}), 403
+    try:
+        summary = request.json or {}
         with data_lock:
-            ad = dashboard_data['activity_duration']
-            ad['current_activity'] = data.get('current_activity', ad['current_activity'])
-            ad['current_duration'] = data.get('current_duration', ad['current_duration'])
-            ad['last_movement'] = data.get('last_movement', ad['last_movement'])
-            # Merge daily stats if provided
-            if 'daily_stats' in data and isinstance(data['daily_stats'], dict):
-                ad['daily_stats'].update(data['daily_stats'])
-        print(f"[DEBUG] Updated dashboard_data['activity_duration']: {dashboard_data['activity_duration']}")  # Debug log
+            profiling_state['summary'] = summary
+            profiling_state['status'] = 'idle'
         return jsonify({'status': 'success'}), 200
     except Exception as e:
-        print(f"[ERROR] Failed to update activity duration: {e}")  # Debug log
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# Serializes read-modify-write of config.json from the settings endpoint
+config_lock = threading.Lock()
+
+@app.route('/api/admin/detector_settings', methods=['GET', 'POST'])
+def admin_detector_settings():
+    """View the detector's thresholds or apply changes; the detector reloads them live"""
+    if request.remote_addr not in ADMIN_ADDRESSES:
+        return jsonify({'status': 'error', 'message': 'Admin endpoints are local only'}), 403
+
+    if request.method == 'GET':
+        try:
+            settings, error = compile_settings(read_detector_section()), None
+        except SettingsError as e:
+            settings, error = load_detector_settings(), e.problems
+        except (OSError, ValueError) as e:
+            settings, error = load_detector_settings(), [str(e)]
+        return jsonify({'settings': settings_to_dict(settings), 'problems': error})
+
+    try:
+        with config_lock:
+            settings = update_detector_settings(request.json or {})
+        return jsonify({'status': 'success', 'settings': settings_to_dict(settings)}), 200
+    except SettingsError as e:
+        return jsonify({'status': 'error', 'message': str(e), 'problems': e.problems}), 400
+    except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @app.route('/api/logs')
 def get_logs():
     """Get activity logs from file"""
-    logs = []
-    try:
-        if os.path.exists('activity_log.json'):
-            with open('activity_log.json', 'r') as f:
-                for line in f:
-                    try:
-                        logs.append(json.loads(line))
-                    except:
-                        continue
+    # Keep only the last 100 logs while reading
+    logs = collections.deque(maxlen=100)
+    try:
+        logs.extend(iter_log_records('activity_log.json'))
     except Exception as e:
-        print(f"Error reading logs: {e}")
+        logger.error("Error reading logs: %s", e)
     
-    # Return last 100 logs
-    return jsonify(logs[-100:])
+    return jsonify(list(logs))
+
+@app.route('/api/export/<dataset>')
+def export_data(dataset):
+    """
+    Stream alert logs ('alerts') or activity segments ('activity') as csv,
+    ndjson or columnar, filtered by ?start=&end= (ISO) and repeated ?type=
+    """
+    fmt = request.args.get('format', 'csv')
+    try:
+        chunks = export(dataset, fmt, request.args.get('start'), request.args.get('end'),
+                        request.args.getlist('type') or None)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    mimetype, extension = FORMATS[fmt]
+    filename = f"har_{dataset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    # No Content-Length, so the response goes out with chunked transfer encoding
+    return Response(chunks, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+def _parse_time(value, default):
+    """Epoch seconds or an ISO timestamp from a query parameter"""
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+@app.route('/api/timeseries')
+def get_timeseries():
+    """Activity seconds per minute or hour bucket (default: last 24 hours, hourly)"""
+    try:
+        end = _parse_time(request.args.get('end'), time.time())
+        start = _parse_time(request.args.get('start'), end - 86400)
+        resolution = request.args.get('resolution', 'hour')
+        series = request.args.get('resident', 'default')
+        if end <= start:
+            return jsonify({'status': 'error', 'message': 'end must be after start'}), 400
+        size = 60 if resolution == 'minute' else 3600
+        if (end - start) / size > 20000:
+            return jsonify({'status': 'error', 'message': 'range too large for this resolution'}), 400
+        return jsonify(rollups.query(start, end, resolution, series))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
 
 @app.route('/api/stats')
 def get_stats():
@@ -153,7 +525,7 @@ def get_stats():
             with open('session_stats.json', 'r') as f:
                 stats = json.load(f)
     except Exception as e:
-        print(f"Error reading stats: {e}")
+        logger.error("Error reading stats: %s", e)
     
     return jsonify(stats)
 
@@ -167,11 +539,70 @@ def cleanup_daily_stats():
                 dashboard_data['statistics']['falls_today'] = 0
                 dashboard_data['statistics']['help_requests_today'] = 0
                 dashboard_data['statistics']['total_gestures_today'] = 0
+            residents.reset_daily()
+
+def ipc_reader_loop(ipc_config):
+    """
+    Follow a detector on this machine through shared memory instead of HTTP.
+    Waits for the detector to create the segment, and re-opens it by name when
+    its heartbeat goes stale (the detector stopped or was restarted).
+    """
+    subscriber = None
+    while True:
+        if subscriber is None:
+            try:
+                subscriber = LocalSubscriber(ipc_config['name'], ipc_config['stale_after'])
+                logger.info("Attached to detector shared memory '%s'", ipc_config['name'])
+            except FileNotFoundError:
+                time.sleep(2)
+                continue
+            except Exception as e:
+                logger.warning("Shared memory attach failed: %s", e)
+                time.sleep(2)
+                continue
+        try:
+            state, events = subscriber.poll()
+            for event in events:
+                if event['kind'] == 'alert':
+                    _ingest_alert(event['payload'])
+                elif event['kind'] == 'activity':
+                    update = event['payload']
+                    _ingest_activity(update.get('activity', 'Unknown'), update.get('camera_id'), update)
+            if state is not None:
+                _ingest_activity_duration(state)
+        except StaleSegmentError as e:
+            logger.info("Detector shared memory went stale (%s), re-attaching", e)
+            subscriber.close()
+            subscriber = None
+            time.sleep(2)
+            continue
+        except Exception as e:
+            logger.error("Shared memory read error: %s", e)
+            subscriber.close()
+            subscriber = None
+        time.sleep(ipc_config.get('poll_interval', 0.02))
 
 if __name__ == '__main__':
+    setup_logging('dashboard')
+    
     # Start cleanup thread
     cleanup_thread = threading.Thread(target=cleanup_daily_stats, daemon=True)
     cleanup_thread.start()
     
-    print("Dashboard running at http://127.0.0.1:5000")
-    app.run(host='127.0.0.1', port=5000, debug=False)
+    # Load persisted activity rollups and keep writing them in the background
+    rollups.attach()
+    
+    # Local detectors can publish through shared memory; HTTP ingest stays on
+    # for remote ones
+    ipc_config = load_ipc_config()
+    if ipc_config['enabled']:
+        ipc_thread = threading.Thread(target=ipc_reader_loop, args=(ipc_config,),
+                                      name='ipc-reader', daemon=True)
+        ipc_thread.start()
+    
+    dashboard_config = load_dashboard_config()
+    logger.info("Dashboard running at http://%s:%s", dashboard_config['host'], dashboard_config['port'])
+    try:
+        app.run(host=dashboard_config['host'], port=dashboard_config['port'], debug=dashboard_config['debug'])
+    finally:
+        rollups.stop()
@@ -0,0 +1,304 @@
+"""
+Detector Settings for Assistive HAR System
+Typed, immutable detector thresholds compiled from the "detector" section of
+config.json, with a file watcher that swaps in validated edits live
+"""
+
+import os
+import json
+import logging
+import time
+import threading
+from dataclasses import dataclass, fields, asdict, replace
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ActivitySettings:
+    """Seconds in one activity before health rules fire (see health_rules)"""
+    sitting_warning: float = 1800
+    sitting_critical: float = 3600
+    standing_warning: float = 1200
+    standing_critical: float = 2400
+    inactivity_warning: float = 600
+    movement_reminder: float = 900
+
+
+@dataclass(frozen=True)
+class PostureSettings:
+    """Hip-to-knee vertical distance (normalized) that counts as sitting"""
+    sitting_leg_min: float = 0.05
+    sitting_leg_max: float = 0.20
+
+
+@dataclass(frozen=True)
+class WalkingSettings:
+    window: int = 15
+    ankle_x_threshold: float = 0.03
+    knee_oscillation: float = 0.02
+    leg_angle_threshold: float = 5.0
+
+
+@dataclass(frozen=True)
+class FallSettings:
+    shoulder_drop: float = 0.05
+    torso_angle: float = 70.0
+
+
+@dataclass(frozen=True)
+class WaveSettings:
+    window: int = 12
+    min_samples: int = 6
+    amplitude: float = 0.12
+    min_direction_changes: int = 2
+    min_interval: float = 1.0
+
+
+@dataclass(frozen=True)
+class HelpSettings:
+    """How far both wrists must be above the nose"""
+    wrist_above_head: float = 0.05
+
+
+@dataclass(frozen=True)
+class CooldownSettings:
+    """Per-alert cooldowns in seconds"""
+    fall: float = 30
+    help: float = 10
+    wave: float = 3
+    thumbs_up: float = 3
+    stop: float = 5
+
+
+@dataclass(frozen=True)
+class DetectorSettings:
+    activity: ActivitySettings = ActivitySettings()
+    posture: PostureSettings = PostureSettings()
+    walking: WalkingSettings = WalkingSettings()
+    fall: FallSettings = FallSettings()
+    wave: WaveSettings = WaveSettings()
+    help: HelpSettings = HelpSettings()
+    cooldowns: CooldownSettings = CooldownSettings()
+
+
+DEFAULT_SETTINGS = DetectorSettings()
+
+
+class SettingsError(ValueError):
+    """A detector section that doesn't compile; `problems` lists every issue"""
+
+    def __init__(self, problems):
+        super().__init__('; '.join(problems))
+        self.problems = problems
+
+
+def compile_settings(section):
+    """
+    Build DetectorSettings from a config dict, e.g. {"fall": {"torso_angle": 60}}.
+    Missing values keep their defaults; unknown keys, wrong types and
+    inconsistent thresholds raise SettingsError.
+    """
+    section = section or {}
+    problems = []
+    if not isinstance(section, dict):
+        raise SettingsError(["detector section must be an object"])
+    groups = {}
+    for group in fields(DetectorSettings):
+        values = section.get(group.name, {})
+        default = getattr(DEFAULT_SETTINGS, group.name)
+        if not isinstance(values, dict):
+            problems.append(f"{group.name} must be an object")
+            groups[group.name] = default
+            continue
+        known = {f.name: f for f in fields(default)}
+        for key in values:
+            if key not in known:
+                problems.append(f"{group.name}.{key} is not a setting")
+        changes = {}
+        for name, field in known.items():
+            if name not in values:
+                continue
+            value = values[name]
+            # bool is an int subclass; "true" as a threshold is always a mistake
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                problems.append(f"{group.name}.{name} must be a number")
+                continue
+            if field.type in (int, 'int'):
+                if value != int(value):
+                    problems.append(f"{group.name}.{name} must be a whole number")
+                    continue
+                value = int(value)
+            if value < 0:
+                problems.append(f"{group.name}.{name} cannot be negative")
+                continue
+            if value == 0 and field.type in (int, 'int'):
+                problems.append(f"{group.name}.{name} must be at least 1")
+                continue
+            changes[name] = value
+        groups[group.name] = replace(default, **changes)
+    for key in section:
+        if key not in groups:
+            problems.append(f"{key} is not a settings group")
+
+    settings = DetectorSettings(**groups)
+    activity, posture, wave = settings.activity, settings.posture, settings.wave
+    if activity.sitting_warning >= activity.sitting_critical:
+        problems.append("activity.sitting_warning must be below sitting_critical")
+    if activity.standing_warning >= activity.standing_critical:
+        problems.append("activity.standing_warning must be below standing_critical")
+    if posture.sitting_leg_min >= posture.sitting_leg_max:
+        problems.append("posture.sitting_leg_min must be below sitting_leg_max")
+    if wave.min_samples > wave.window:
+        problems.append("wave.min_samples cannot exceed wave.window")
+    if problems:
+        raise SettingsError(problems)
+    return settings
+
+
+def settings_to_dict(settings):
+    return asdict(settings)
+
+
+# Older config.json files tune a few thresholds in other sections; they still
+# apply unless the "detector" section sets the same value
+LEGACY_KEYS = {
+    ('gestures', 'wave_threshold'): ('wave', 'amplitude'),
+    ('gestures', 'wave_min_changes'): ('wave', 'min_direction_changes'),
+    ('gestures', 'fall_shoulder_threshold'): ('fall', 'shoulder_drop'),
+    ('gestures', 'fall_angle_threshold'): ('fall', 'torso_angle'),
+    ('gestures', 'walking_ankle_threshold'): ('walking', 'ankle_x_threshold'),
+    ('gestures', 'walking_angle_threshold'): ('walking', 'leg_angle_threshold'),
+    ('alerts', 'fall_alert_cooldown'): ('cooldowns', 'fall'),
+    ('alerts', 'help_alert_cooldown'): ('cooldowns', 'help')
+}
+
+
+def merge_legacy(config):
+    """The "detector" section of a whole config dict, with legacy keys filled in"""
+    detector = config.get('detector', {})
+    if not isinstance(detector, dict):
+        return detector
+    section = {group: dict(values) if isinstance(values, dict) else values
+               for group, values in detector.items()}
+    for (old_section, old_key), (group, name) in LEGACY_KEYS.items():
+        old = config.get(old_section)
+        if not isinstance(old, dict) or old_key not in old:
+            continue
+        values = section.setdefault(group, {})
+        if isinstance(values, dict):
+            values.setdefault(name, old[old_key])
+    return section
+
+
+def read_detector_section(config_file='config.json'):
+    with open(config_file, 'r') as f:
+        return merge_legacy(json.load(f))
+
+
+def update_detector_settings(changes, config_file='config.json'):
+    """
+    Merge `changes` ({"group": {"name": value}}) into the detector section of
+    `config_file` and write it back atomically. Raises SettingsError without
+    touching the file if the result doesn't compile; a running detector's
+    SettingsWatcher picks up the written file.
+    """
+    if not isinstance(changes, dict):
+        raise SettingsError(["settings must be an object"])
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    detector = config.get('detector', {})
+    if not isinstance(detector, dict):
+        detector = {}
+    for group, values in changes.items():
+        if isinstance(values, dict) and isinstance(detector.get(group), dict):
+            detector[group] = dict(detector[group], **values)
+        else:
+            detector[group] = values
+    config['detector'] = detector
+    settings = compile_settings(merge_legacy(config))
+
+    tmp = f"{config_file}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(config, f, indent=2)
+        f.write('\n')
+    os.replace(tmp, config_file)
+    return settings
+
+
+def load_detector_settings(config_file='config.json'):
+    """Compiled settings from config.json; defaults if the file or section is invalid"""
+    try:
+        return compile_settings(read_detector_section(config_file))
+    except OSError:
+        return DEFAULT_SETTINGS
+    except ValueError as e:
+        logger.error("Invalid detector settings in %s, using defaults: %s", config_file, e)
+        return DEFAULT_SETTINGS
+
+
+class SettingsWatcher:
+    """
+    Polls config.json and recompiles the detector section when it changes.
+
+    The detector reads `current()` between frames; a valid edit replaces the
+    settings object in one reference assignment, so a frame never sees half
+    of an update. An invalid edit keeps the previous settings and is reported
+    in `last_error`.
+    """
+
+    def __init__(self, config_file='config.json', interval=1.0):
+        self.config_file = config_file
+        self.interval = interval
+        self.version = 1
+        self.last_error = None
+        self.reloaded_at = None
+        self._settings = load_detector_settings(config_file)
+        self._stamp = self._file_stamp()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='settings-watcher', daemon=True)
+        self._thread.start()
+
+    def current(self):
+        return self._settings
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.config_file)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self):
+        """Reload if the file changed; returns True when new settings were applied"""
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        try:
+            settings = compile_settings(read_detector_section(self.config_file))
+        except (OSError, ValueError) as e:
+            # Also catches a half-written file; the next change retries
+            self.last_error = str(e)
+            logger.error("Detector settings not reloaded: %s", e)
+            return False
+        self.last_error = None
+        if settings == self._settings:
+            return False
+        self._settings = settings
+        self.version += 1
+        self.reloaded_at = time.time()
+        logger.info("Detector settings reloaded (version %d)", self.version)
+        return True
+
+    def get_status(self):
+        return {'version': self.version, 'last_error': self.last_error,
+                'reloaded_at': self.reloaded_at}
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=2)
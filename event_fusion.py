@@ -0,0 +1,121 @@
+"""
+Cross-Camera Event Fusion for Assistive HAR System
+Joins detections of the same event from several cameras in one room into a
+single alert before it reaches the alert pipeline
+"""
+
+import time
+import uuid
+import threading
+import collections
+
+
+class EventFusion:
+    """
+    Time-windowed join of alerts by (room, type, source).
+
+    The first camera to report an event is admitted immediately, so fusion
+    never delays a fall alert; it is tagged with an `event_id` and
+    `camera_ids` before it is queued and never touched again. Reports from
+    other cameras within `window` seconds are not dispatched. Instead
+    `on_merge` gets a fresh merge update for that `event_id` with every
+    contributing camera in `camera_ids`, the highest `confidence` seen and
+    the `duplicates` count. Alerts without a camera id (single-camera runs)
+    pass straight through.
+
+    Open events live in a dict for O(1) lookup plus a deque ordered by expiry,
+    so expiring old events is O(1) per event.
+    """
+
+    def __init__(self, window=2.0, on_merge=None):
+        self.window = window
+        self.on_merge = on_merge
+        self._open = {}  # key -> {'event_id', 'cameras', 'resident_id', 'priority', ...}
+        self._expiry = collections.deque()  # (expires, key), oldest first
+        self._lock = threading.Lock()
+        self.stats = {
+            'events': 0,
+            'fused': 0,
+            'duplicates_suppressed': 0,
+            'suppressed_by_type': {}
+        }
+
+    @staticmethod
+    def make_key(alert):
+        return (alert.get('room'), alert.get('type'), alert.get('source'))
+
+    def admit(self, alert, now=None):
+        """
+        Returns True if the alert should be dispatched, False if it was merged
+        into an alert another camera already raised (and `on_merge` was called).
+        """
+        camera_id = alert.get('camera_id')
+        if camera_id is None:
+            return True
+
+        now = now if now is not None else time.time()
+        key = self.make_key(alert)
+        with self._lock:
+            self._expire(now)
+            self.stats['events'] += 1
+            event = self._open.get(key)
+
+            if event is None:
+                event_id = uuid.uuid4().hex[:12]
+                alert['event_id'] = event_id
+                alert['camera_ids'] = [camera_id]
+                expires = now + self.window
+                self._open[key] = {'event_id': event_id, 'cameras': [camera_id],
+                                   'resident_id': alert.get('resident_id'),
+                                   'priority': alert.get('priority', 'normal'),
+                                   'confidence': alert.get('confidence'), 'duplicates': 0,
+                                   'expires': expires}
+                self._expiry.append((expires, key))
+                return True
+
+            if camera_id in event['cameras']:
+                # Repeat from the same camera: that's the rate limiter's call
+                return True
+
+            event['cameras'].append(camera_id)
+            confidence = alert.get('confidence')
+            if confidence is not None and (event['confidence'] is None or confidence > event['confidence']):
+                event['confidence'] = confidence
+            event['duplicates'] += 1
+            update = {
+                'type': 'alert_update',
+                'merge': True,
+                'event_id': event['event_id'],
+                'alert_type': key[1],
+                'room': key[0],
+                'source': key[2],
+                'resident_id': event['resident_id'],
+                'priority': event['priority'],
+                'camera_ids': list(event['cameras']),
+                'confidence': event['confidence'],
+                'duplicates': event['duplicates']
+            }
+
+            if len(event['cameras']) == 2:
+                self.stats['fused'] += 1
+            self.stats['duplicates_suppressed'] += 1
+            by_type = self.stats['suppressed_by_type']
+            by_type[key[1]] = by_type.get(key[1], 0) + 1
+
+        if self.on_merge:
+            self.on_merge(update)
+        return False
+
+    def _expire(self, now):
+        while self._expiry and self._expiry[0][0] <= now:
+            expires, key = self._expiry.popleft()
+            event = self._open.get(key)
+            if event is not None and event['expires'] == expires:
+                del self._open[key]
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['suppressed_by_type'] = dict(self.stats['suppressed_by_type'])
+            stats['open_events'] = len(self._open)
+            return stats
@@ -1,32 +1,54 @@
-import cv2
-import mediapipe as mp
 import collections
-import numpy as np
 import time
 import math
-import pyttsx3
 import threading
 import json
 from datetime import datetime
-import winsound
-import queue
-import requests
-
-# ---------- MediaPipe Setup ----------
-mp_drawing = mp.solutions.drawing_utils
-mp_holistic = mp.solutions.holistic
-mp_pose = mp.solutions.pose
-
-# Pose landmarks
-LEFT_SHOULDER = mp_pose.PoseLandmark.LEFT_SHOULDER.value
-RIGHT_SHOULDER = mp_pose.PoseLandmark.RIGHT_SHOULDER.value
-LEFT_HIP = mp_pose.PoseLandmark.LEFT_HIP.value
-RIGHT_HIP = mp_pose.PoseLandmark.RIGHT_HIP.value
-LEFT_KNEE = mp_pose.PoseLandmark.LEFT_KNEE.value
-RIGHT_KNEE = mp_pose.PoseLandmark.RIGHT_KNEE.value
-NOSE = mp_pose.PoseLandmark.NOSE.value
-LEFT_ANKLE = mp_pose.PoseLandmark.LEFT_ANKLE.value
-RIGHT_ANKLE = mp_pose.PoseLandmark.RIGHT_ANKLE.value
+import argparse
+import socket
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from startup import LazyModule, StartupOrchestrator
+from profiler import SamplingProfiler, load_profiler_config
+from alert_queue import PriorityAlertQueue
+from tts_worker import TTSWorker
+from alert_channels import AlertDispatcher
+from alert_rate_limiter import AlertRateLimiter
+from event_fusion import EventFusion
+from local_ipc import LocalPublisher, load_ipc_config
+from health_rules import HealthRuleEngine, load_health_rules
+from segment_store import SegmentStore, spill_dir_for
+from checkpoint import CheckpointWriter, load_checkpoint, load_checkpoint_config
+from person_tracker import MultiPersonPipeline, ResidentResults, load_multi_person_config
+from activity_classifier import ActivityStateMachine, load_classifier_config
+from incident_clips import ClipRecorder, load_clip_config
+from preview_stream import PreviewServer, load_preview_config
+from detector_settings import DEFAULT_SETTINGS, SettingsWatcher
+from capture_watchdog import CameraReader, CaptureWatchdog, load_watchdog_config
+from structured_log import setup_logging
+
+# Heavy dependencies are imported on first use (or by the startup workers),
+# so tools that only need the tracker don't pay for them
+cv2 = LazyModule('cv2')
+mp = LazyModule('mediapipe')
+np = LazyModule('numpy')
+winsound = LazyModule('winsound')
+requests = LazyModule('requests')
+
+logger = logging.getLogger('gesture_holistic')
+
+# Pose landmarks (indices into MediaPipe's pose topology, as in mp_pose.PoseLandmark)
+NOSE = 0
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_KNEE = 25
+RIGHT_KNEE = 26
+LEFT_ANKLE = 27
+RIGHT_ANKLE = 28
 
 # Hand landmarks
 THUMB_TIP = 4
@@ -42,30 +64,24 @@ PINKY_MCP = 17
 
 # ---------- Activity Tracker ----------
 class ActivityTracker:
-    def __init__(self):
+    def __init__(self, rules=None, settings=None, segment_dir=None):
         self.current_activity = None
         self.activity_start_time = None
-        self.activity_durations = {
-            'Sitting': [],
-            'Standing': [],
-            'Walking': [],
-            'Unknown': []
-        }
+        # Columnar segment history; earlier days are spilled to `segment_dir`
+        # (default: the 'default' series; False keeps only today, in memory)
+        self.segments = SegmentStore(spill_dir=segment_dir)
+        # Last warning time per health rule group
         self.last_warning_times = {
             'sitting_too_long': 0,
             'standing_too_long': 0,
             'inactivity': 0
         }
+        # Declarative health rules (config.json "health_rules"), checked on
+        # activity transitions and timer deadlines instead of every frame
+        self.health_rules = HealthRuleEngine(rules if rules is not None else load_health_rules())
         
-        # Configurable thresholds (in seconds)
-        self.thresholds = {
-            'sitting_warning': 1800,  # 30 minutes
-            'sitting_critical': 3600,  # 60 minutes
-            'standing_warning': 1200,  # 20 minutes
-            'standing_critical': 2400,  # 40 minutes
-            'inactivity_warning': 600,  # 10 minutes
-            'movement_reminder': 900   # 15 minutes
-        }
+        # Configurable thresholds in seconds (config.json "detector.activity")
+        self.thresholds = asdict(settings.activity if settings else DEFAULT_SETTINGS.activity)
         
         self.last_movement_time = time.time()
         self.daily_stats = {
@@ -86,10 +102,7 @@ class ActivityTracker:
             # Save duration of previous activity
             if self.current_activity and self.activity_start_time:
                 duration = current_time - self.activity_start_time
-                self.activity_durations[self.current_activity].append({
-                    'duration': duration,
-                    'end_time': current_time
-                })
+                self.segments.append(self.current_activity, self.activity_start_time, current_time)
                 
                 # Update daily stats
                 if self.current_activity == 'Sitting':
@@ -109,73 +122,17 @@ class ActivityTracker:
             # Reset movement time if walking
             if new_activity == 'Walking':
                 self.last_movement_time = current_time
+            
+            self.health_rules.on_transition(self, current_time)
         
-        # Check for health warnings
-        if self.current_activity and self.activity_start_time and alert_manager:
-            duration = current_time - self.activity_start_time
-            self._check_health_warnings(duration, alert_manager)
+        # Fire health warnings whose deadline has passed (O(1) on most frames)
+        if alert_manager:
+            self.health_rules.tick(self, alert_manager, current_time)
     
-    def _check_health_warnings(self, duration, alert_manager):
-        """Check and issue health warnings based on activity duration"""
-        current_time = time.time()
-        
-        # Sitting too long warnings
-        if self.current_activity == 'Sitting':
-            if duration > self.thresholds['sitting_critical']:
-                if current_time - self.last_warning_times['sitting_too_long'] > 600:  # 10 min cooldown
-                    alert_manager.trigger_alert(
-                        'health_warning',
-                        f'Critical: You have been sitting for {int(duration/60)} minutes. Please stand up and move around immediately!',
-                        priority='critical',
-                        cooldown=600
-                    )
-                    self.last_warning_times['sitting_too_long'] = current_time
-                    self.daily_stats['warnings_issued'] += 1
-            elif duration > self.thresholds['sitting_warning']:
-                if current_time - self.last_warning_times['sitting_too_long'] > 900:  # 15 min cooldown
-                    alert_manager.trigger_alert(
-                        'health_warning',
-                        f'Health Alert: You have been sitting for {int(duration/60)} minutes. Consider taking a break.',
-                        priority='high',
-                        cooldown=900
-                    )
-                    self.last_warning_times['sitting_too_long'] = current_time
-                    self.daily_stats['warnings_issued'] += 1
-        
-        # Standing too long warnings
-        elif self.current_activity == 'Standing':
-            if duration > self.thresholds['standing_critical']:
-                if current_time - self.last_warning_times['standing_too_long'] > 600:
-                    alert_manager.trigger_alert(
-                        'health_warning',
-                        f'Alert: You have been standing for {int(duration/60)} minutes. Consider sitting down to rest.',
-                        priority='high',
-                        cooldown=600
-                    )
-                    self.last_warning_times['standing_too_long'] = current_time
-                    self.daily_stats['warnings_issued'] += 1
-            elif duration > self.thresholds['standing_warning']:
-                if current_time - self.last_warning_times['standing_too_long'] > 900:
-                    alert_manager.trigger_alert(
-                        'health_warning',
-                        f'Reminder: You have been standing for {int(duration/60)} minutes. Take a short break if needed.',
-                        priority='normal',
-                        cooldown=900
-                    )
-                    self.last_warning_times['standing_too_long'] = current_time
-        
-        # General inactivity warning (no walking for too long)
-        time_since_movement = current_time - self.last_movement_time
-        if time_since_movement > self.thresholds['movement_reminder']:
-            if current_time - self.last_warning_times['inactivity'] > 1200:  # 20 min cooldown
-                alert_manager.trigger_alert(
-                    'health_warning',
-                    f'Movement Reminder: You haven\'t walked for {int(time_since_movement/60)} minutes. A short walk would be beneficial.',
-                    priority='normal',
-                    cooldown=1200
-                )
-                self.last_warning_times['inactivity'] = current_time
-                self.daily_stats['warnings_issued'] += 1
+    def apply_settings(self, activity_settings, now=None):
+        """Swap in reloaded thresholds and reschedule pending health warnings"""
+        self.thresholds = asdict(activity_settings)
+        self.health_rules.on_transition(self, now if now is not None else time.time())
     
     def get_current_duration(self):
         """Get duration of current activity"""
@@ -193,6 +150,35 @@ class ActivityTracker:
         }
         return summary
     
+    def get_state(self):
+        """Snapshot for checkpointing"""
+        return {
+            'day': datetime.now().date().isoformat(),
+            'current_activity': self.current_activity,
+            'activity_start_time': self.activity_start_time,
+            'last_movement_time': self.last_movement_time,
+            'last_warning_times': dict(self.last_warning_times),
+            'daily_stats': dict(self.daily_stats)
+        }
+    
+    def load_state(self, state, resume_gap=300, now=None):
+        """
+        Restore a checkpoint. Today's stats and warning times always carry
+        over; the running activity only resumes if the detector was down for
+        less than `resume_gap` seconds.
+        """
+        now = now if now is not None else time.time()
+        if state.get('day') != datetime.fromtimestamp(now).date().isoformat():
+            return False
+        self.daily_stats.update(state.get('daily_stats', {}))
+        self.last_warning_times.update(state.get('last_warning_times', {}))
+        self.last_movement_time = state.get('last_movement_time') or self.last_movement_time
+        if now - state.get('saved_at', 0) <= resume_gap and state.get('current_activity'):
+            self.current_activity = state['current_activity']
+            self.activity_start_time = state['activity_start_time']
+        self.health_rules.on_transition(self, now)
+        return True
+    
     def reset_daily_stats(self):
         """Reset daily statistics"""
         self.daily_stats = {
@@ -205,98 +191,149 @@ class ActivityTracker:
         }
 
 # ---------- Alert Manager ----------
+# Fixed alert phrases, pre-rendered to audio by the TTS worker at startup
+FIXED_ALERT_PHRASES = [
+    'Voice alerts activated',
+    'Fall detected! Immediate assistance required!',
+    'URGENT! Help requested! Someone needs immediate assistance! Please check on them now!',
+    'Wave gesture detected',
+    'Thumbs up detected',
+    'Stop gesture detected',
+    'Monitoring is down! The camera stopped sending video. Please check on the resident.',
+    'Monitoring is down! The detector stopped responding. Please check on the resident.',
+    'Monitoring restored'
+]
+
+def load_node_tags(config_file='config.json'):
+    """Node, room and resident this detector reports for (config.json "node" section)"""
+    tags = {'node_id': None, 'room': None, 'resident_id': None}
+    try:
+        with open(config_file, 'r') as f:
+            tags.update(json.load(f).get('node', {}))
+    except (OSError, ValueError):
+        pass
+    tags['node_id'] = tags['node_id'] or socket.gethostname()
+    return tags
+
+def load_dashboard_url(config_file='config.json'):
+    """
+    Base URL of the dashboard from its config.json "dashboard" section. A
+    detector on another machine sets host to the dashboard machine's address;
+    a dashboard bound to all interfaces is reached on loopback.
+    """
+    config = {'host': '127.0.0.1', 'port': 5000}
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('dashboard', {}))
+    except (OSError, ValueError):
+        pass
+    host = config['host']
+    if host in ('0.0.0.0', '::', ''):
+        host = '127.0.0.1'
+    elif ':' in host:
+        host = f"[{host}]"
+    return f"http://{host}:{config['port']}"
+
+def load_node_token(config_file='config.json'):
+    """Shared secret a detector on another machine presents for profiling (dashboard.node_token)"""
+    try:
+        with open(config_file, 'r') as f:
+            return json.load(f).get('dashboard', {}).get('node_token') or None
+    except (OSError, ValueError):
+        return None
+
 class AlertManager:
-    def __init__(self):
-        self.tts_engine = None
-        self.alert_queue = queue.Queue()
+    def __init__(self, ipc=None, fusion_window=2.0, node=None, dashboard_url=None):
+        # Optional shared-memory publisher used instead of HTTP for the local dashboard
+        self.ipc = ipc
+        # Default node/room/resident tags so a facility dashboard can shard by resident
+        self.node = node or {}
+        self.dashboard_url = dashboard_url or load_dashboard_url()
+        token = load_node_token()
+        self._node_headers = {'X-Node-Token': token} if token else {}
+        self.alert_queue = PriorityAlertQueue(maxsize=100)
+        # Cameras in the same room seeing the same event raise one alert
+        self.fusion = EventFusion(window=fusion_window, on_merge=self._publish_merge)
+        self.rate_limiter = AlertRateLimiter(aggregation_window=30)
+        # Set by the detector loop when incident clips are enabled
+        self.clip_recorder = None
         self.alert_history = []
-        self.last_alert_times = {}
         self.running = True
         
-        # Initialize TTS
-        try:
-            self.tts_engine = pyttsx3.init()
-            self.tts_engine.setProperty('rate', 130)  # Slower for clarity
-            self.tts_engine.setProperty('volume', 1.0)  # Maximum volume
-            
-            # Test TTS on startup
-            print("Initializing Text-to-Speech engine...")
-            self.tts_engine.say("Voice alerts activated")
-            self.tts_engine.runAndWait()
-            print("TTS initialized successfully!")
-            
-            # Optional: Select a clearer voice if available
-            voices = self.tts_engine.getProperty('voices')
-            if voices:
-                # Use the first available voice (usually clearer)
-                self.tts_engine.setProperty('voice', voices[0].id)
-        except Exception as e:
-            print(f"TTS init failed: {e}")
-            self.tts_engine = None
+        # Initialize TTS: one worker thread owns the engine (slower rate for clarity)
+        logger.info("Initializing Text-to-Speech engine...")
+        self.tts = TTSWorker(rate=130, volume=1.0,
+                             prerender=FIXED_ALERT_PHRASES,
+                             startup_message="Voice alerts activated")
+        
+        # Delivery channels run concurrently, each with its own worker pool
+        self.dispatcher = AlertDispatcher()
+        self.dispatcher.register('log', self._save_to_log, timeout=1.0, max_pending=100)
+        self.dispatcher.register('dashboard', self._send_to_dashboard, workers=2, timeout=1.0)
+        self.dispatcher.register('tts', self._speak, timeout=0.5,
+                                 accepts=lambda alert: alert.get('speak', True))
+        self.dispatcher.register('sound', self._play_alarm, timeout=3.0, max_pending=5,
+                                 accepts=lambda alert: alert.get('priority') == 'critical')
         
         # Start alert thread
-        self.alert_thread = threading.Thread(target=self._process_alerts, daemon=True)
+        self.alert_thread = threading.Thread(target=self._process_alerts, name='alert-dispatch', daemon=True)
         self.alert_thread.start()
     
     def _process_alerts(self):
+        window = self.rate_limiter.aggregation_window
         while self.running:
             try:
-                if not self.alert_queue.empty():
-                    alert = self.alert_queue.get(timeout=0.1)
+                # Blocks until an alert arrives, a suppressed-burst summary is due,
+                # or the queue is closed on stop
+                deadline = self.rate_limiter.next_deadline()
+                timeout = window if deadline is None else min(window, max(0, deadline - time.time()))
+                alert = self.alert_queue.get(timeout=timeout)
+                if alert is not None:
                     self._handle_alert(alert)
-                else:
-                    time.sleep(0.1)
+                for summary in self.rate_limiter.collect_summaries():
+                    self._handle_alert(summary)
             except:
                 continue
     
     def _handle_alert(self, alert):
-        # Check cooldown
-        alert_type = alert['type']
-        cooldown = alert.get('cooldown', 5)
-        
-        if alert_type in self.last_alert_times:
-            if time.time() - self.last_alert_times[alert_type] < cooldown:
-                return
-        
-        self.last_alert_times[alert_type] = time.time()
-        
-        # Log alert
+        # Record alert, then fan it out to log, dashboard, TTS and sound channels
         alert['timestamp'] = datetime.now().isoformat()
+        if alert.get('merge'):
+            # Cross-camera merge update: only the log and dashboard keep alerts
+            self.dispatcher.dispatch(alert, only=('log', 'dashboard'))
+            return
         self.alert_history.append(alert)
-        self._save_to_log(alert)
-        
-        # Send to dashboard
-        self._send_to_dashboard(alert)
-        
-        # Speak alert in a separate thread to avoid blocking
-        if self.tts_engine and alert.get('speak', True):
-            def speak_async():
-                try:
-                    print(f"Speaking: {alert['message']}")
-                    self.tts_engine.say(alert['message'])
-                    self.tts_engine.runAndWait()
-                    print("Speech complete")
-                except Exception as e:
-                    print(f"TTS error: {e}")
-            
-            # Start speech in new thread
-            speech_thread = threading.Thread(target=speak_async, daemon=True)
-            speech_thread.start()
-        
-        # Play sound for critical alerts
-        if alert.get('priority') == 'critical':
-            try:
-                # Play multiple beeps for urgent attention
-                if alert.get('type') == 'help':
-                    # Special pattern for help: 3 quick beeps
-                    for _ in range(3):
-                        winsound.Beep(2000, 300)
-                        time.sleep(0.1)
-                else:
-                    # Single long beep for other critical alerts
-                    winsound.Beep(1500, 500)
-            except:
-                pass
+        self.dispatcher.dispatch(alert)
+    
+    def register_channel(self, name, handler, **options):
+        """Add an extra delivery channel (e.g. SMS); see AlertDispatcher.register"""
+        return self.dispatcher.register(name, handler, **options)
+    
+    def get_channel_stats(self):
+        """Per-channel delivery counters and latency"""
+        return self.dispatcher.get_stats()
+    
+    def _speak(self, alert):
+        # Hand the message to the TTS worker; a newer alert of the same type
+        # and source replaces one still waiting to be spoken, unless that one
+        # is more urgent
+        self.tts.speak(alert['message'], priority=alert.get('priority', 'normal'),
+                       key=(alert['type'], alert.get('source')))
+    
+    def _play_alarm(self, alert):
+        """Play sound for critical alerts"""
+        try:
+            # Play multiple beeps for urgent attention
+            if alert.get('type') == 'help':
+                # Special pattern for help: 3 quick beeps
+                for _ in range(3):
+                    winsound.Beep(2000, 300)
+                    time.sleep(0.1)
+            else:
+                # Single long beep for other critical alerts
+                winsound.Beep(1500, 500)
+        except:
+            pass
     
     def _save_to_log(self, alert):
         try:
@@ -306,58 +343,164 @@ class AlertManager:
         except:
             pass
     
-    def trigger_alert(self, alert_type, message, priority='normal', cooldown=5):
-        alert = {
+    def trigger_alert(self, alert_type, message, priority='normal', cooldown=5, source=None,
+                      camera_id=None, room=None, confidence=None, resident_id=None, clip=None):
+        alert = self._tag({
             'type': alert_type,
             'message': message,
             'priority': priority,
             'cooldown': cooldown,
+            'source': source,
+            'camera_id': camera_id,
+            'room': room,
+            'resident_id': resident_id,
+            'confidence': confidence,
             'speak': True
-        }
-        self.alert_queue.put(alert)
+        })
+        # Merge simultaneous detections from other cameras into the first one
+        if not self.fusion.admit(alert):
+            return False
+        # Rate limit per (type, source, priority, room, resident) before the alert costs any queue work
+        if not self.rate_limiter.allow(alert, cooldown):
+            return False
+        # Falls and help requests get a clip of the seconds around them;
+        # supervised cameras record their own and pass the file name in
+        if clip is None and self.clip_recorder is not None:
+            clip = self.clip_recorder.capture(alert_type)
+        if clip:
+            alert['clip'] = clip
+        # A critical alert cuts into any lower-priority announcement in progress
+        if priority == 'critical':
+            self.tts.preempt('critical')
+        return self.alert_queue.put(alert)
+    
+    def _publish_merge(self, update):
+        # Another camera saw an event that was already queued; the alert itself
+        # may be in flight on the channel threads, so a separate update follows
+        # it through the queue at the same priority
+        self.alert_queue.put(self._tag(update))
+    
+    def get_fusion_stats(self):
+        """Counters for cross-camera duplicates merged into one alert"""
+        return self.fusion.get_stats()
+    
+    def get_rate_limit_stats(self):
+        """Counters for admitted, suppressed and summarized alerts"""
+        stats = self.rate_limiter.get_stats()
+        stats['queue_dropped'] = self.alert_queue.dropped_count
+        stats['queue_expired'] = self.alert_queue.expired_count
+        return stats
     
     def _send_to_dashboard(self, alert):
         """Send alert to dashboard"""
+        if self.ipc:
+            self.ipc.publish_event('alert', alert)
+            return
         try:
             requests.post(
-                'http://127.0.0.1:5000/api/alert',
+                f'{self.dashboard_url}/api/alert',
                 json=alert,
                 timeout=0.5
             )
         except:
             pass  # Dashboard might not be running
     
-    def send_activity_update(self, activity):
+    def _tag(self, payload):
+        for key in ('node_id', 'room', 'resident_id'):
+            if payload.get(key) is None and self.node.get(key) is not None:
+                payload[key] = self.node[key]
+        return payload
+    
+    def send_activity_update(self, activity, camera_id=None, room=None, resident_id=None):
         """Send current activity to dashboard"""
+        update = self._tag({'activity': activity, 'camera_id': camera_id,
+                            'room': room, 'resident_id': resident_id})
+        if self.ipc:
+            self.ipc.publish_event('activity', update)
+            return
         try:
             requests.post(
-                'http://127.0.0.1:5000/api/activity',
-                json={'activity': activity},
+                f'{self.dashboard_url}/api/activity',
+                json=update,
                 timeout=0.5
             )
         except:
             pass
     
+    def send_activity_summary(self, summary):
+        """Send activity duration data to dashboard; returns any pending profiling request"""
+        summary = self._tag(dict(summary))
+        try:
+            if self.ipc:
+                self.ipc.publish_state(summary)
+                # Shared memory is one-way, so ask for profiling requests separately
+                response = requests.post(
+                    f'{self.dashboard_url}/api/admin/profile/claim',
+                    headers=self._node_headers,
+                    timeout=0.5
+                )
+            else:
+                response = requests.post(
+                    f'{self.dashboard_url}/api/activity_duration',
+                    json=summary,
+                    headers=self._node_headers,
+                    timeout=0.5
+                )
+            # The dashboard hands back pending admin profiling requests
+            return response.json().get('profile_request')
+        except:
+            return None  # Dashboard might not be running
+    
+    def send_profile_summary(self, summary):
+        """Post a finished profiling session's hot-function summary; True once delivered"""
+        try:
+            response = requests.post(
+                f'{self.dashboard_url}/api/admin/profile/summary',
+                json=summary,
+                headers=self._node_headers,
+                timeout=0.5
+            )
+            return response.status_code == 200
+        except:
+            return False
+    
     def stop(self):
         self.running = False
+        self.alert_queue.close()
+        self.dispatcher.shutdown()
+        self.tts.stop()
+
+class SilentAlertSink:
+    """Swallows health warnings from visitors' activity trackers"""
+    
+    def trigger_alert(self, *args, **kwargs):
+        return False
 
 # ---------- Wave Detector ----------
 class WaveDetector:
-    def __init__(self, maxlen=12):
-        self.history = collections.deque(maxlen=maxlen)
+    def __init__(self, settings=None):
+        self.settings = settings or DEFAULT_SETTINGS.wave
+        self.history = collections.deque(maxlen=self.settings.window)
         self.last_wave_time = 0
 
+    def apply_settings(self, settings):
+        if settings.window != self.history.maxlen:
+            self.history = collections.deque(self.history, maxlen=settings.window)
+        self.settings = settings
+
     def add_position(self, x):
         self.history.append(x)
 
     def detect_wave(self):
-        if len(self.history) < 6:
+        settings = self.settings
+        if len(self.history) < settings.min_samples:
             return False
         arr = np.array(self.history)
         amplitude = arr.max() - arr.min()
         sign_changes = np.sum(np.abs(np.diff(np.sign(np.diff(arr)))))
         now = time.time()
-        if amplitude > 0.12 and sign_changes >= 2 and (now - self.last_wave_time) > 1.0:
+        if amplitude > settings.amplitude and sign_changes >= settings.min_direction_changes and \
+           (now - self.last_wave_time) > settings.min_interval:
             self.last_wave_time = now
             return True
         return False
@@ -409,7 +552,7 @@ def is_stop_gesture(hand):
     except:
         return False
 
-def is_help_pose(left_hand, right_hand, pose):
+def is_help_pose(left_hand, right_hand, pose, settings=DEFAULT_SETTINGS.help):
     try:
         if not left_hand or not right_hand or not pose:
             return False
@@ -418,34 +561,36 @@ def is_help_pose(left_hand, right_hand, pose):
         right_wrist_y = right_hand.landmark[WRIST_HAND].y
         
         # Check if both hands are above head
-        is_help = (left_wrist_y < head_y - 0.05 and right_wrist_y < head_y - 0.05)
+        margin = settings.wrist_above_head
+        is_help = (left_wrist_y < head_y - margin and right_wrist_y < head_y - margin)
         
         if is_help:
-            print(f"HELP DETECTED! Left wrist: {left_wrist_y:.2f}, Right wrist: {right_wrist_y:.2f}, Head: {head_y:.2f}")
+            logger.debug("Help pose: left wrist %.2f, right wrist %.2f, head %.2f",
+                         left_wrist_y, right_wrist_y, head_y)
         
         return is_help
     except Exception as e:
-        print(f"Help pose detection error: {e}")
+        logger.warning("Help pose detection error: %s", e)
         return False
 
 # ---------- Body Gestures ----------
 def get_landmark(pose, idx):
     return pose.landmark[idx] if pose else None
 
-def detect_posture(pose):
+def detect_posture(pose, settings=DEFAULT_SETTINGS.posture):
     try:
         lh = get_landmark(pose, LEFT_HIP)
         lk = get_landmark(pose, LEFT_KNEE)
         if None in [lh, lk]:
             return "Unknown"
         left_leg = abs(lh.y - lk.y)
-        if 0.05 < left_leg < 0.20:
+        if settings.sitting_leg_min < left_leg < settings.sitting_leg_max:
             return "Sitting"
         return "Standing"
     except:
         return "Unknown"
 
-def detect_walking(pose, history, maxlen=15, x_threshold=0.03, angle_threshold=5):
+def detect_walking(pose, history, settings=DEFAULT_SETTINGS.walking):
     """
     Detect walking based on:
     1. Ankle horizontal movement
@@ -480,7 +625,7 @@ def detect_walking(pose, history, maxlen=15, x_threshold=0.03, angle_threshold=5
             'rla': right_leg_angle
         })
 
-        if len(history) < maxlen:
+        if len(history) < settings.window:
             return False
 
         # Analyze ankle x movement
@@ -498,8 +643,11 @@ def detect_walking(pose, history, maxlen=15, x_threshold=0.03, angle_threshold=5
         right_leg_angle_range = max([f['rla'] for f in history]) - min([f['rla'] for f in history])
 
         # Walking conditions: enough ankle movement OR knee oscillation OR leg angles
+        x_threshold = settings.ankle_x_threshold
+        knee_threshold = settings.knee_oscillation
+        angle_threshold = settings.leg_angle_threshold
         if (left_range > x_threshold or right_range > x_threshold) and \
-           (left_knee_osc > 0.02 or right_knee_osc > 0.02) and \
+           (left_knee_osc > knee_threshold or right_knee_osc > knee_threshold) and \
            (left_leg_angle_range > angle_threshold or right_leg_angle_range > angle_threshold):
             return True
 
@@ -521,7 +669,12 @@ def torso_angle(pose):
     angle = math.degrees(math.atan2(dy, dx))
     return abs(angle)
 
-def detect_falling(pose, prev_shoulder_y, shoulder_threshold=0.05, angle_threshold=70):
+def pose_confidence(pose):
+    """Mean landmark visibility of the torso, used to rank duplicate detections"""
+    torso = [LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP]
+    return round(sum(pose.landmark[idx].visibility for idx in torso) / len(torso), 3)
+
+def detect_falling(pose, prev_shoulder_y, settings=DEFAULT_SETTINGS.fall):
     if not pose or prev_shoulder_y is None:
         return False
     ls = pose.landmark[LEFT_SHOULDER].y
@@ -529,59 +682,244 @@ def detect_falling(pose, prev_shoulder_y, shoulder_threshold=0.05, angle_thresho
     avg_shoulder = (ls + rs)/2
     drop = avg_shoulder - prev_shoulder_y
     angle = torso_angle(pose)
-    if drop > shoulder_threshold and angle < angle_threshold:
+    if drop > settings.shoulder_drop and angle < settings.torso_angle:
+        return True
+    return False
+
+def new_ankle_history(settings):
+    """Ankle history long enough for the walking check (detector.walking.window frames)"""
+    return collections.deque(maxlen=settings.walking.window)
+
+def apply_person_settings(state, settings):
+    """Swap reloaded settings into one tracked person's state"""
+    state['activity_tracker'].apply_settings(settings.activity)
+    if state['ankle_history'].maxlen != settings.walking.window:
+        state['ankle_history'] = collections.deque(state['ankle_history'], maxlen=settings.walking.window)
+
+def analyze_visitor(track, alert_manager, silent_alerts, settings=DEFAULT_SETTINGS):
+    """
+    Fall and activity analysis for someone other than the resident, using
+    their own track state. Returns True if they fell.
+    """
+    state = track.state
+    history = state['shoulder_history']
+    prev_shoulder_y = history[0] if len(history) == history.maxlen else None
+    pose = track.pose
+    history.append((pose.landmark[LEFT_SHOULDER].y + pose.landmark[RIGHT_SHOULDER].y) / 2)
+    
+    if detect_walking(pose, state['ankle_history'], settings.walking):
+        activity = 'Walking'
+    else:
+        activity = detect_posture(pose, settings.posture)
+    activity, _ = state['classifier'].update(activity)
+    # Visitors' durations are tracked but never trigger health warnings
+    state['activity_tracker'].update_activity(activity, silent_alerts)
+    
+    if detect_falling(pose, prev_shoulder_y, settings.fall):
+        alert_manager.trigger_alert(
+            'fall',
+            'Fall detected! Someone else in the room needs assistance!',
+            priority='critical',
+            cooldown=settings.cooldowns.fall,
+            source=f'person_{track.id}',
+            confidence=pose_confidence(pose)
+        )
         return True
     return False
 
 # ---------- Main ----------
-def main():
-    # Try to open camera with different indices
-    cap = None
-    for camera_index in [0, 1, 2]:
-        print(f"Trying camera index {camera_index}...")
-        cap = cv2.VideoCapture(camera_index, cv2.CAP_DSHOW)  # Use DirectShow on Windows
-        if cap.isOpened():
-            # Test if we can actually read from it
-            ret, test_frame = cap.read()
-            if ret:
-                print(f"Camera opened successfully at index {camera_index}!")
-                # Set camera properties for better performance
-                cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                cap.set(cv2.CAP_PROP_FPS, 30)
-                break
-            else:
-                print(f"Camera at index {camera_index} opened but cannot read frames")
-                cap.release()
-                cap = None
+def _probe_camera(camera_source):
+    """Open one camera source; returns the capture if it delivers a frame"""
+    if isinstance(camera_source, int):
+        cap = cv2.VideoCapture(camera_source, cv2.CAP_DSHOW)  # Use DirectShow on Windows
+    else:
+        cap = cv2.VideoCapture(camera_source)
+    if cap.isOpened():
+        # Test if we can actually read from it
+        ret, test_frame = cap.read()
+        if ret:
+            return cap
+        logger.warning("Camera %s opened but cannot read frames", camera_source)
+        cap.release()
+    else:
+        logger.info("No camera at %s", camera_source)
+    return None
+
+def open_camera(source=None):
+    """
+    Open a camera and check it delivers frames. `source` is a device index or a
+    stream URL/file path; by default indices 0-2 are probed at the same time
+    and the lowest working index is used.
+    """
+    sources = [0, 1, 2] if source is None else [source]
+    logger.info("Trying camera(s) %s...", ', '.join(str(s) for s in sources))
+    if len(sources) == 1:
+        caps = [_probe_camera(sources[0])]
+    else:
+        # Failed DirectShow probes take seconds each; don't pay for them in turn
+        with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+            caps = list(pool.map(_probe_camera, sources))
+    chosen = None
+    for camera_source, cap in zip(sources, caps):
+        if cap is None:
+            continue
+        if chosen is None:
+            chosen = cap
+            logger.info("Camera %s opened successfully", camera_source)
         else:
-            print(f"No camera at index {camera_index}")
-    
-    if cap is None or not cap.isOpened():
-        print("\n" + "="*50)
-        print("ERROR: Cannot access camera!")
-        print("="*50)
-        print("\nPossible solutions:")
-        print("1. Close other applications using the camera (Zoom, Teams, etc.)")
-        print("2. Check Windows Camera permissions:")
-        print("   - Go to Settings > Privacy > Camera")
-        print("   - Make sure 'Allow apps to access your camera' is ON")
-        print("3. Try unplugging and reconnecting your webcam")
-        print("4. Restart your computer")
-        print("\nPress Enter to exit...")
-        input()
+            cap.release()
+    if chosen is not None:
+        # Set camera properties for better performance
+        chosen.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        chosen.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        chosen.set(cv2.CAP_PROP_FPS, 30)
+    return chosen
+
+def load_holistic():
+    """Import MediaPipe and load the Holistic model"""
+    return mp.solutions.holistic.Holistic(min_detection_confidence=0.5,
+                                          min_tracking_confidence=0.5)
+
+def probe_dashboard(url=None):
+    """Open the first dashboard connection early so the first alert doesn't pay for it"""
+    requests.get(url or f'{load_dashboard_url()}/api/status', timeout=1.0)
+    return True
+
+def start_alert_manager():
+    """AlertManager for a standalone detector, with the shared-memory transport if enabled"""
+    # Optional zero-copy transport to a dashboard on this machine
+    ipc = None
+    ipc_config = load_ipc_config()
+    if ipc_config['enabled']:
+        try:
+            ipc = LocalPublisher(ipc_config['name'], ipc_config['slots'],
+                                 ipc_config['slot_size'], ipc_config['state_size'],
+                                 ipc_config['heartbeat_interval'])
+            logger.info("Publishing to dashboard through shared memory '%s'", ipc_config['name'])
+        except Exception as e:
+            logger.warning("Shared memory unavailable (%s), using HTTP", e)
+    return AlertManager(ipc=ipc, node=load_node_tags()), ipc
+
+def stop_alert_manager(startup):
+    """Stop the alert pipeline started alongside a camera that failed to open"""
+    try:
+        (alert_manager, ipc), = startup.wait('alerts')
+    except Exception:
+        return  # never started; its failure is already logged
+    alert_manager.stop()
+    if ipc:
+        ipc.close()
+
+def main(profile=False, profile_frames=None, profile_seconds=None, camera_source=None,
+         camera_id=None, alert_manager=None, show_window=True, stop_event=None, preview_port=None):
+    """
+    Run the detector on one camera.
+
+    Standalone runs own their AlertManager. Under the multi-camera supervisor
+    each worker passes its camera id, an alert sink that forwards to the
+    supervisor's shared pipeline, a stop event and its preview port.
+    """
+    # Camera, model, alert pipeline (with its TTS worker) and the dashboard
+    # connection don't depend on each other: start them together and begin
+    # monitoring as soon as the camera and model are ready
+    startup = StartupOrchestrator()
+    owns_alert_manager = alert_manager is None
+    startup.add('camera', open_camera, camera_source)
+    startup.add('model', load_holistic)
+    if owns_alert_manager:
+        startup.add('alerts', start_alert_manager)
+        startup.add('dashboard', probe_dashboard)
+    
+    cap, = startup.wait('camera')
+    if cap is None:
+        # The alert pipeline's threads and shared-memory segment would outlive us
+        if owns_alert_manager:
+            stop_alert_manager(startup)
+        startup.shutdown()
+        if camera_id is not None:
+            # Supervised worker: exit and let the supervisor retry
+            logger.error("[%s] Cannot access camera %s", camera_id, camera_source)
+            return
+        logger.error("Cannot access camera!\n"
+                     "Possible solutions:\n"
+                     "1. Close other applications using the camera (Zoom, Teams, etc.)\n"
+                     "2. Check Windows Camera permissions:\n"
+                     "   - Go to Settings > Privacy > Camera\n"
+                     "   - Make sure 'Allow apps to access your camera' is ON\n"
+                     "3. Try unplugging and reconnecting your webcam\n"
+                     "4. Restart your computer")
+        input("\nPress Enter to exit...")
         return
 
-    # Initialize alert manager and activity tracker
-    alert_manager = AlertManager()
-    activity_tracker = ActivityTracker()
-    print("Alert system initialized. TTS enabled for fall detection and help gestures.")
-    print("Activity tracking enabled with health warnings for prolonged inactivity.")
+    holistic, = startup.wait('model')
+    ipc = None
+    if owns_alert_manager:
+        (alert_manager, ipc), = startup.wait('alerts')
+    logger.info("[startup] camera and model ready, monitoring starts after %.2fs", startup.elapsed())
+    startup.shutdown()
+    
+    # Pre-event frames for fall/help clips, encoded in a separate process
+    clip_recorder = None
+    clip_config = load_clip_config()
+    if clip_config['enabled']:
+        try:
+            clip_recorder = ClipRecorder(clip_config, 'clip_encoder' if camera_id is None
+                                         else f'clip_encoder_{camera_id}', camera_id)
+            alert_manager.clip_recorder = clip_recorder
+            logger.info("Incident clips enabled (%ss before, %ss after fall/help alerts)",
+                        clip_config['pre_seconds'], clip_config['post_seconds'])
+        except Exception as e:
+            logger.warning("Incident clips unavailable: %s", e)
+    
+    # Browser preview of the annotated view; costs nothing until someone watches
+    preview = None
+    preview_config = load_preview_config()
+    if preview_port is not None:
+        preview_config['port'] = preview_port
+    # Supervised cameras only serve a preview on their own configured port
+    if preview_config['enabled'] and (camera_id is None or preview_port is not None):
+        try:
+            preview = PreviewServer(preview_config)
+            logger.info("Live preview at %s", preview.url)
+        except OSError as e:
+            logger.warning("Live preview unavailable: %s", e)
+    # Detector thresholds from config.json "detector"; edits are validated and
+    # picked up between frames without a restart
+    settings_watcher = SettingsWatcher()
+    settings = settings_watcher.current()
+    # Each camera (or the resident of a standalone detector) keeps its own
+    # segment history on disk
+    activity_tracker = ActivityTracker(settings=settings,
+                                       segment_dir=spill_dir_for(camera_id or load_node_tags()['resident_id']))
+    logger.info("Alert system initialized. TTS enabled for fall detection and help gestures.")
+    logger.info("Activity tracking enabled with health warnings for prolonged inactivity.")
     
     shoulder_history = collections.deque(maxlen=3)
-    ankle_history = collections.deque(maxlen=5)
-    left_wave_detector = WaveDetector()
-    right_wave_detector = WaveDetector()
+    ankle_history = new_ankle_history(settings)
+    left_wave_detector = WaveDetector(settings.wave)
+    right_wave_detector = WaveDetector(settings.wave)
+    # Per-frame labels flicker near thresholds; only confirmed changes count
+    classifier_config = load_classifier_config()
+    classifier = ActivityStateMachine.from_config(classifier_config)
+    
+    # Multi-person mode: everyone in view gets a track with their own state;
+    # the resident keeps the state above, visitors get fresh per-track state
+    pipeline = None
+    multi_person_config = load_multi_person_config()
+    if multi_person_config['enabled']:
+        try:
+            pipeline = MultiPersonPipeline(multi_person_config, lambda: {
+                # Visitors' segments are never written to the resident's history
+                'activity_tracker': ActivityTracker(settings=settings_watcher.current(), segment_dir=False),
+                'shoulder_history': collections.deque(maxlen=3),
+                'ankle_history': new_ankle_history(settings_watcher.current()),
+                'classifier': ActivityStateMachine.from_config(classifier_config)
+            })
+            logger.info("Multi-person tracking enabled (up to %s people)", multi_person_config['max_people'])
+        except Exception as e:
+            logger.warning("Multi-person tracking unavailable (%s), tracking a single person", e)
+    resident_track_id = None
+    silent_alerts = SilentAlertSink()
     
     # Statistics tracking
     stats = {
@@ -591,20 +929,128 @@ def main():
         'session_start': datetime.now()
     }
     
+    # Warm restart: resume today's stats, running activity and alert cooldowns
+    checkpoint_config = load_checkpoint_config()
+    checkpointer = None
+    if checkpoint_config['enabled']:
+        checkpoint_path = checkpoint_config['path']
+        if camera_id is not None:
+            root, ext = os.path.splitext(checkpoint_path)
+            checkpoint_path = f"{root}_{camera_id}{ext}"
+        saved = load_checkpoint(checkpoint_path)
+        if saved and activity_tracker.load_state(dict(saved.get('tracker', {}), saved_at=saved.get('saved_at', 0)),
+                                                 resume_gap=checkpoint_config['resume_gap']):
+            if time.time() - saved.get('saved_at', 0) <= checkpoint_config['resume_gap']:
+                stats.update(saved.get('stats', {}))
+            if owns_alert_manager:
+                alert_manager.rate_limiter.load_state(saved.get('rate_limiter'))
+            logger.info("Resumed from checkpoint saved at %s",
+                        datetime.fromtimestamp(saved['saved_at']).strftime('%H:%M:%S'))
+        checkpointer = CheckpointWriter(checkpoint_path, checkpoint_config['interval'])
+    
+    def checkpoint_snapshot():
+        snapshot = {
+            'tracker': activity_tracker.get_state(),
+            'stats': {key: value for key, value in stats.items() if key != 'session_end'}
+        }
+        if owns_alert_manager:
+            snapshot['rate_limiter'] = alert_manager.rate_limiter.get_state()
+        return snapshot
+    
+    # Camera reads run on their own thread so a failed or hung capture can be
+    # reopened (with backoff) while the model stays loaded; the watchdog
+    # raises monitoring_down if the resident goes unwatched for too long
+    watchdog_config = load_watchdog_config()
+    reader = CameraReader(cap, open_camera, camera_source,
+                          watchdog_config['backoff_initial'], watchdog_config['backoff_max'],
+                          finite=isinstance(camera_source, str) and os.path.isfile(camera_source))
+    
+    def monitoring_down(kind, seconds):
+        cause = 'camera stopped sending video' if kind == 'capture' else 'detector stopped responding'
+        alert_manager.trigger_alert(
+            'monitoring_down',
+            f'Monitoring is down! The {cause}. Please check on the resident.',
+            priority='high',
+            cooldown=300,
+            source=kind
+        )
+        alert_manager.send_activity_update("MONITORING DOWN")
+    
+    def monitoring_restored(seconds):
+        alert_manager.trigger_alert('monitoring_restored', 'Monitoring restored', cooldown=60)
+        alert_manager.send_activity_update(classifier.state or "Monitoring...")
+    
+    watchdog = CaptureWatchdog(reader, watchdog_config, monitoring_down, monitoring_restored)
+    
     # Track last dashboard update time
     last_update_time = time.time()
 
-    with mp_holistic.Holistic(min_detection_confidence=0.5,
-                              min_tracking_confidence=0.5) as holistic:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+    # Opt-in sampling profiler (idle unless started by flag, config or dashboard)
+    profiler = SamplingProfiler(load_profiler_config())
+    posted_profile_summary = None
+    if profile or profiler.config['enabled']:
+        profiler.start(frames=profile_frames, seconds=profile_seconds)
+
+    mp_drawing = mp.solutions.drawing_utils
+    mp_holistic = mp.solutions.holistic
+    with holistic:
+        while stop_event is None or not stop_event.is_set():
+            profiler.mark('capture')
+            frame = reader.read()
+            watchdog.heartbeat()
+            if frame is None:
+                if reader.ended:
+                    break
+                # No frame while the capture recovers: keep reporting health
+                current_time = time.time()
+                if current_time - last_update_time > 2:
+                    activity_summary = activity_tracker.get_activity_summary()
+                    activity_summary['capture'] = watchdog.get_stats()
+                    activity_summary['startup'] = startup.status()
+                    alert_manager.send_activity_summary(activity_summary)
+                    last_update_time = current_time
+                if show_window and cv2.waitKey(1) & 0xFF == 27:
+                    break
+                continue
             frame = cv2.flip(frame, 1)
+            if settings_watcher.current() is not settings:
+                # Swap in reloaded settings between frames, never mid-frame
+                settings = settings_watcher.current()
+                activity_tracker.apply_settings(settings.activity)
+                left_wave_detector.apply_settings(settings.wave)
+                right_wave_detector.apply_settings(settings.wave)
+                if ankle_history.maxlen != settings.walking.window:
+                    ankle_history = collections.deque(ankle_history, maxlen=settings.walking.window)
+                if pipeline:
+                    for track in pipeline.tracker.tracks.values():
+                        apply_person_settings(track.state, settings)
+            if clip_recorder:
+                clip_recorder.push(frame)
             image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = holistic.process(image_rgb)
+            profiler.mark('inference')
+            if pipeline:
+                results, tracks, resident = pipeline.process(image_rgb, holistic)
+                if resident is not None and resident.id != resident_track_id:
+                    # Another person became the resident: don't compare their
+                    # landmarks against the previous person's history
+                    resident_track_id = resident.id
+                    shoulder_history.clear()
+                    ankle_history.clear()
+                    classifier.reset()
+                results = results or ResidentResults()
+            else:
+                results = holistic.process(image_rgb)
+            profiler.mark('detection')
             annotated = frame.copy()
 
+            if pipeline:
+                for track in tracks:
+                    if track.pose is None or track.id == resident_track_id:
+                        continue
+                    mp_drawing.draw_landmarks(annotated, track.pose, mp_holistic.POSE_CONNECTIONS)
+                    if analyze_visitor(track, alert_manager, silent_alerts, settings):
+                        stats['falls_detected'] += 1
+
             # Draw landmarks
             if results.pose_landmarks:
                 mp_drawing.draw_landmarks(annotated, results.pose_landmarks, mp_holistic.POSE_CONNECTIONS)
@@ -618,20 +1064,26 @@ def main():
             # Send periodic updates to dashboard (every 2 seconds)
             current_time = time.time()
             if current_time - last_update_time > 2:
-                # Send a heartbeat update with current status
-                if gesture_text == "":
-                    alert_manager.send_activity_update("Monitoring...")
+                # Send a heartbeat update with current status (activity changes
+                # are sent as they happen; this re-syncs after fall/help banners)
+                alert_manager.send_activity_update(classifier.state or "Monitoring...")
                 
-                # Send activity duration data to dashboard
+                # Send activity duration data and capture health to dashboard
                 activity_summary = activity_tracker.get_activity_summary()
-                try:
-                    requests.post(
-                        'http://127.0.0.1:5000/api/activity_duration',
-                        json=activity_summary,
-                        timeout=0.5
-                    )
-                except:
-                    pass  # Dashboard might not be running
+                activity_summary['capture'] = watchdog.get_stats()
+                activity_summary['startup'] = startup.status()
+                profile_request = alert_manager.send_activity_summary(activity_summary)
+                if profile_request:
+                    profiler.start(frames=profile_request.get('frames'),
+                                   seconds=profile_request.get('seconds'))
+
+                # Publish the hot-function summary once a session has finished
+                if profiler.last_summary is not None and profiler.last_summary is not posted_profile_summary:
+                    if alert_manager.send_profile_summary(profiler.last_summary):
+                        posted_profile_summary = profiler.last_summary
+                
+                if checkpointer:
+                    checkpointer.submit(checkpoint_snapshot())
                 
                 last_update_time = current_time
 
@@ -643,19 +1095,14 @@ def main():
                 avg_shoulder = (ls + rs)/2
                 shoulder_history.append(avg_shoulder)
 
-                falling = detect_falling(results.pose_landmarks, prev_shoulder_y)
-                walking = detect_walking(results.pose_landmarks, ankle_history)
-                posture = detect_posture(results.pose_landmarks)
+                falling = detect_falling(results.pose_landmarks, prev_shoulder_y, settings.fall)
+                walking = detect_walking(results.pose_landmarks, ankle_history, settings.walking)
+                posture = detect_posture(results.pose_landmarks, settings.posture)
                 
-                # Update activity tracker
-                if walking:
-                    activity_tracker.update_activity('Walking', alert_manager)
-                elif posture == "Sitting":
-                    activity_tracker.update_activity('Sitting', alert_manager)
-                elif posture == "Standing":
-                    activity_tracker.update_activity('Standing', alert_manager)
-                else:
-                    activity_tracker.update_activity('Unknown', alert_manager)
+                # Update activity tracker with the debounced activity; it only
+                # opens a new segment when the stable state changes
+                activity, activity_changed = classifier.update('Walking' if walking else posture)
+                activity_tracker.update_activity(activity, alert_manager)
 
                 if falling:
                     gesture_text = "FALL DETECTED!"
@@ -663,27 +1110,27 @@ def main():
                         'fall', 
                         'Fall detected! Immediate assistance required!',
                         priority='critical',
-                        cooldown=30
+                        cooldown=settings.cooldowns.fall,
+                        confidence=pose_confidence(results.pose_landmarks)
                     )
                     stats['falls_detected'] += 1
                     alert_manager.send_activity_update("FALL DETECTED")
-                elif is_help_pose(results.left_hand_landmarks, results.right_hand_landmarks, results.pose_landmarks):
+                elif is_help_pose(results.left_hand_landmarks, results.right_hand_landmarks,
+                                  results.pose_landmarks, settings.help):
                     gesture_text = "HELP REQUESTED!"
-                    print(">>> TRIGGERING HELP ALERT <<<")
+                    logger.warning("Help pose detected, triggering help alert")
                     alert_manager.trigger_alert(
                         'help',
                         'URGENT! Help requested! Someone needs immediate assistance! Please check on them now!',
                         priority='critical',  # Changed to critical for louder alert
-                        cooldown=10
+                        cooldown=settings.cooldowns.help
                     )
                     stats['help_requests'] += 1
                     alert_manager.send_activity_update("HELP REQUESTED")
-                elif walking:
-                    gesture_text = "Walking"
-                    alert_manager.send_activity_update("Walking")
                 else:
-                    gesture_text = posture
-                    alert_manager.send_activity_update(posture)
+                    gesture_text = activity
+                    if activity_changed:
+                        alert_manager.send_activity_update(activity)
 
             # ---------- Left Hand ----------
             if gesture_text in ["Standing", "Sitting"]:
@@ -693,17 +1140,17 @@ def main():
                     left_wave_detector.add_position(left_x)
                     if left_wave_detector.detect_wave():
                         gesture_text = "Left Hand: Wave"
-                        alert_manager.trigger_alert('gesture', 'Wave gesture detected', cooldown=3)
+                        alert_manager.trigger_alert('gesture', 'Wave gesture detected', cooldown=settings.cooldowns.wave, source='left_hand')
                         alert_manager.send_activity_update("Wave Gesture (Left)")
                         stats['total_gestures'] += 1
                     elif is_thumbs_up(lh):
                         gesture_text = "Left Hand: Thumbs Up"
-                        alert_manager.trigger_alert('gesture', 'Thumbs up detected', cooldown=3)
+                        alert_manager.trigger_alert('gesture', 'Thumbs up detected', cooldown=settings.cooldowns.thumbs_up, source='left_hand')
                         alert_manager.send_activity_update("Thumbs Up (Left)")
                         stats['total_gestures'] += 1
                     elif is_stop_gesture(lh):
                         gesture_text = "Left Hand: STOP"
-                        alert_manager.trigger_alert('gesture', 'Stop gesture detected', priority='high', cooldown=5)
+                        alert_manager.trigger_alert('gesture', 'Stop gesture detected', priority='high', cooldown=settings.cooldowns.stop, source='left_hand')
                         alert_manager.send_activity_update("STOP Gesture (Left)")
                         stats['total_gestures'] += 1
                     elif is_victory(lh):
@@ -719,17 +1166,17 @@ def main():
                     right_wave_detector.add_position(right_x)
                     if right_wave_detector.detect_wave():
                         gesture_text = "Right Hand: Wave"
-                        alert_manager.trigger_alert('gesture', 'Wave gesture detected', cooldown=3)
+                        alert_manager.trigger_alert('gesture', 'Wave gesture detected', cooldown=settings.cooldowns.wave, source='right_hand')
                         alert_manager.send_activity_update("Wave Gesture (Right)")
                         stats['total_gestures'] += 1
                     elif is_thumbs_up(rh):
                         gesture_text = "Right Hand: Thumbs Up"
-                        alert_manager.trigger_alert('gesture', 'Thumbs up detected', cooldown=3)
+                        alert_manager.trigger_alert('gesture', 'Thumbs up detected', cooldown=settings.cooldowns.thumbs_up, source='right_hand')
                         alert_manager.send_activity_update("Thumbs Up (Right)")
                         stats['total_gestures'] += 1
                     elif is_stop_gesture(rh):
                         gesture_text = "Right Hand: STOP"
-                        alert_manager.trigger_alert('gesture', 'Stop gesture detected', priority='high', cooldown=5)
+                        alert_manager.trigger_alert('gesture', 'Stop gesture detected', priority='high', cooldown=settings.cooldowns.stop, source='right_hand')
                         alert_manager.send_activity_update("STOP Gesture (Right)")
                         stats['total_gestures'] += 1
                     elif is_victory(rh):
@@ -789,13 +1236,34 @@ def main():
                 cv2.putText(annotated, movement_text, (30, 225), 
                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, movement_color, 1)
 
-            cv2.imshow("Assistive HAR System - Real-time Monitoring", annotated)
-            if cv2.waitKey(1) & 0xFF == 27:  # ESC key to exit
+            if show_window:
+                title = "Assistive HAR System - Real-time Monitoring"
+                if camera_id is not None:
+                    title += f" [{camera_id}]"
+                cv2.imshow(title, annotated)
+            if preview:
+                preview.offer(annotated)
+            profiler.on_frame()
+            if show_window and cv2.waitKey(1) & 0xFF == 27:  # ESC key to exit
                 break
 
     # Cleanup
-    alert_manager.stop()
-    cap.release()
+    watchdog.stop()
+    reader.stop()
+    settings_watcher.stop()
+    if checkpointer:
+        checkpointer.stop(checkpoint_snapshot())
+    profiler.stop()
+    if pipeline:
+        pipeline.close()
+    if clip_recorder:
+        clip_recorder.close()
+    if preview:
+        preview.stop()
+    if owns_alert_manager:
+        alert_manager.stop()
+    if ipc:
+        ipc.close()
     cv2.destroyAllWindows()
     
     # Save session stats
@@ -803,6 +1271,7 @@ def main():
     
     # Add activity tracking stats
     activity_summary = activity_tracker.get_activity_summary()
+    activity_tracker.segments.spill()
     stats['activity_durations'] = {
         'total_sitting_minutes': round(activity_summary['daily_stats']['total_sitting'] / 60, 2),
         'total_standing_minutes': round(activity_summary['daily_stats']['total_standing'] / 60, 2),
@@ -812,18 +1281,34 @@ def main():
         'health_warnings_issued': activity_summary['daily_stats']['warnings_issued']
     }
     
-    with open('session_stats.json', 'w') as f:
+    stats_file = 'session_stats.json' if camera_id is None else f'session_stats_{camera_id}.json'
+    with open(stats_file, 'w') as f:
         json.dump(stats, f, default=str, indent=2)
-    print(f"\nSession ended. Stats saved to session_stats.json")
-    print(f"Falls detected: {stats['falls_detected']}")
-    print(f"Help requests: {stats['help_requests']}")
-    print(f"Total gestures: {stats['total_gestures']}")
-    print(f"\nActivity Summary:")
-    print(f"Total sitting: {stats['activity_durations']['total_sitting_minutes']:.1f} minutes")
-    print(f"Total standing: {stats['activity_durations']['total_standing_minutes']:.1f} minutes")
-    print(f"Total walking: {stats['activity_durations']['total_walking_minutes']:.1f} minutes")
-    print(f"Longest sitting period: {stats['activity_durations']['longest_sitting_minutes']:.1f} minutes")
-    print(f"Health warnings issued: {stats['activity_durations']['health_warnings_issued']}")
+    durations = stats['activity_durations']
+    logger.info("Session ended. Stats saved to %s\n"
+                "Falls detected: %s\n"
+                "Help requests: %s\n"
+                "Total gestures: %s\n"
+                "Activity Summary:\n"
+                "Total sitting: %.1f minutes\n"
+                "Total standing: %.1f minutes\n"
+                "Total walking: %.1f minutes\n"
+                "Longest sitting period: %.1f minutes\n"
+                "Health warnings issued: %s",
+                stats_file, stats['falls_detected'], stats['help_requests'], stats['total_gestures'],
+                durations['total_sitting_minutes'], durations['total_standing_minutes'],
+                durations['total_walking_minutes'], durations['longest_sitting_minutes'],
+                durations['health_warnings_issued'])
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Assistive HAR System - Real-time Monitoring")
+    parser.add_argument('--profile', action='store_true',
+                        help='run the sampling profiler at startup')
+    parser.add_argument('--profile-frames', type=int, default=None,
+                        help='number of frames to profile (default from config.json)')
+    parser.add_argument('--profile-seconds', type=float, default=None,
+                        help='number of seconds to profile (default from config.json)')
+    args = parser.parse_args()
+    setup_logging('detector')
+    main(profile=args.profile, profile_frames=args.profile_frames,
+         profile_seconds=args.profile_seconds)
@@ -0,0 +1,215 @@
+"""
+Health Rule Engine for Assistive HAR System
+Declarative "too long in one activity" rules, evaluated only on activity
+transitions and on deadlines scheduled in a timer wheel
+"""
+
+import json
+import math
+
+# Rules are grouped: within a group only the highest threshold crossed applies,
+# and the group shares one cooldown clock (e.g. sitting warning vs critical).
+# `threshold` is seconds or the name of an ActivityTracker.thresholds entry.
+# `since` is 'activity' (time in the current activity) or 'movement' (time
+# since the resident last walked, checked while not walking).
+DEFAULT_HEALTH_RULES = [
+    {
+        'name': 'sitting_critical',
+        'group': 'sitting_too_long',
+        'activity': 'Sitting',
+        'threshold': 'sitting_critical',
+        'priority': 'critical',
+        'cooldown': 600,
+        'message': 'Critical: You have been sitting for {minutes} minutes. Please stand up and move around immediately!'
+    },
+    {
+        'name': 'sitting_warning',
+        'group': 'sitting_too_long',
+        'activity': 'Sitting',
+        'threshold': 'sitting_warning',
+        'priority': 'high',
+        'cooldown': 900,
+        'message': 'Health Alert: You have been sitting for {minutes} minutes. Consider taking a break.'
+    },
+    {
+        'name': 'standing_critical',
+        'group': 'standing_too_long',
+        'activity': 'Standing',
+        'threshold': 'standing_critical',
+        'priority': 'high',
+        'cooldown': 600,
+        'message': 'Alert: You have been standing for {minutes} minutes. Consider sitting down to rest.'
+    },
+    {
+        'name': 'standing_warning',
+        'group': 'standing_too_long',
+        'activity': 'Standing',
+        'threshold': 'standing_warning',
+        'priority': 'normal',
+        'cooldown': 900,
+        'count': False,
+        'message': 'Reminder: You have been standing for {minutes} minutes. Take a short break if needed.'
+    },
+    {
+        'name': 'movement_reminder',
+        'group': 'inactivity',
+        'since': 'movement',
+        'threshold': 'movement_reminder',
+        'priority': 'normal',
+        'cooldown': 1200,
+        'message': 'Movement Reminder: You haven\'t walked for {minutes} minutes. A short walk would be beneficial.'
+    }
+]
+
+
+def load_health_rules(config_file='config.json'):
+    """Rules from the health_rules list in config.json, or the defaults"""
+    try:
+        with open(config_file, 'r') as f:
+            rules = json.load(f).get('health_rules')
+        if rules:
+            return rules
+    except (OSError, ValueError):
+        pass
+    return [dict(rule) for rule in DEFAULT_HEALTH_RULES]
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel with `resolution`-second ticks.
+
+    Scheduling is O(1); `advance` only looks at the slots for ticks that have
+    passed, so calling it every frame costs a comparison most of the time.
+    Deadlines further out than one revolution wait in their slot until their
+    round comes up.
+    """
+
+    def __init__(self, slots=512, resolution=1.0):
+        self.slots = [[] for _ in range(slots)]
+        self.resolution = resolution
+        self._tick = None
+
+    def schedule(self, deadline, item):
+        tick = int(math.ceil(deadline / self.resolution))
+        if self._tick is not None and tick <= self._tick:
+            tick = self._tick + 1
+        self.slots[tick % len(self.slots)].append((tick, item))
+
+    def advance(self, now):
+        """Return the items whose deadline has passed"""
+        tick = int(now // self.resolution)
+        if self._tick is None:
+            self._tick = tick
+            return []
+        if tick <= self._tick:
+            return []
+        due = []
+        # A long stall only needs one pass over the wheel
+        for t in range(self._tick + 1, min(tick, self._tick + len(self.slots)) + 1):
+            slot = self.slots[t % len(self.slots)]
+            if not slot:
+                continue
+            keep = []
+            for entry in slot:
+                (due if entry[0] <= tick else keep).append(entry)
+            slot[:] = keep
+        self._tick = tick
+        return [item for _, item in due]
+
+
+class HealthRuleEngine:
+    """
+    Evaluates health rules for one ActivityTracker.
+
+    `on_transition` (activity change or walking) reschedules the affected
+    rule groups; `tick` fires the groups whose deadline has come. Per-frame
+    cost does not depend on the number of rules.
+    """
+
+    def __init__(self, rules=None):
+        rules = rules if rules is not None else [dict(rule) for rule in DEFAULT_HEALTH_RULES]
+        self.groups = {}
+        for rule in rules:
+            rule.setdefault('group', rule['name'])
+            rule.setdefault('since', 'activity')
+            rule.setdefault('cooldown', 600)
+            rule.setdefault('priority', 'normal')
+            rule.setdefault('count', True)
+            self.groups.setdefault(rule['group'], []).append(rule)
+        self.wheel = TimerWheel()
+        self._generation = {group: 0 for group in self.groups}
+
+    def _threshold(self, rule, tracker):
+        threshold = rule['threshold']
+        if isinstance(threshold, str):
+            return tracker.thresholds[threshold]
+        return threshold
+
+    def _reference_time(self, rule, tracker):
+        """Start of the interval the rule measures, or None if it doesn't apply now"""
+        if rule['since'] == 'movement':
+            if tracker.current_activity == 'Walking':
+                return None
+            return tracker.last_movement_time
+        if tracker.current_activity != rule.get('activity') or tracker.activity_start_time is None:
+            return None
+        return tracker.activity_start_time
+
+    def on_transition(self, tracker, now):
+        """Reschedule every group after an activity change"""
+        for group in self.groups:
+            self._schedule(group, tracker, now)
+
+    def _schedule(self, group, tracker, now):
+        self._generation[group] += 1
+        deadlines = []
+        crossed = None
+        for rule in self.groups[group]:
+            start = self._reference_time(rule, tracker)
+            if start is None:
+                continue
+            threshold = self._threshold(rule, tracker)
+            if start + threshold > now:
+                deadlines.append(start + threshold)
+            elif crossed is None or threshold > self._threshold(crossed, tracker):
+                crossed = rule
+        # The most severe rule already crossed repeats once its cooldown is over
+        if crossed is not None:
+            last = tracker.last_warning_times.get(group, 0)
+            deadlines.append(max(now, last + crossed['cooldown']))
+        if deadlines:
+            self.wheel.schedule(min(deadlines), (group, self._generation[group]))
+
+    def tick(self, tracker, alert_manager, now):
+        for group, generation in self.wheel.advance(now):
+            if generation != self._generation.get(group):
+                continue  # superseded by a later transition
+            self._evaluate(group, tracker, alert_manager, now)
+            self._schedule(group, tracker, now)
+
+    def _evaluate(self, group, tracker, alert_manager, now):
+        last = tracker.last_warning_times.get(group, 0)
+        crossed = []
+        for rule in self.groups[group]:
+            start = self._reference_time(rule, tracker)
+            if start is None:
+                continue
+            elapsed = now - start
+            if elapsed > self._threshold(rule, tracker):
+                crossed.append((self._threshold(rule, tracker), rule, elapsed))
+        if not crossed:
+            return
+        # Only the most severe crossed rule of a group speaks
+        _, rule, elapsed = max(crossed, key=lambda c: c[0])
+        if now - last <= rule['cooldown']:
+            return
+        alert_manager.trigger_alert(
+            'health_warning',
+            rule['message'].format(minutes=int(elapsed / 60), activity=tracker.current_activity),
+            priority=rule['priority'],
+            cooldown=rule['cooldown'],
+            source=group
+        )
+        tracker.last_warning_times[group] = now
+        if rule['count']:
+            tracker.daily_stats['warnings_issued'] += 1
@@ -0,0 +1,235 @@
+"""
+Incident Clips for Assistive HAR System
+Keeps the last few seconds of downscaled frames in a preallocated shared
+memory ring and encodes a short clip around fall/help alerts in a
+background process
+"""
+
+import os
+import json
+import logging
+import time
+import threading
+import multiprocessing
+from datetime import datetime
+from multiprocessing import shared_memory
+from startup import LazyModule
+
+logger = logging.getLogger(__name__)
+
+cv2 = LazyModule('cv2')
+np = LazyModule('numpy')
+
+DEFAULT_CLIP_CONFIG = {
+    'enabled': True,
+    'alert_types': ['fall', 'help'],
+    'pre_seconds': 10,
+    'post_seconds': 5,
+    'fps': 10,
+    'width': 320,
+    'height': 240,
+    'output_dir': 'incident_clips',
+    'codec': 'mp4v',
+    'extension': 'mp4'
+}
+
+# Extra ring capacity so the encoder has this long to read a finished clip
+# before the capture loop overwrites its oldest frames
+SLACK_SECONDS = 10
+
+
+def load_clip_config(config_file='config.json'):
+    """Load the incident_clips section of config.json merged over defaults"""
+    config = dict(DEFAULT_CLIP_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('incident_clips', {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+def clip_name(alert_type, now, extension, camera_id=None):
+    """<type>[_<camera>]_<YYYYmmdd_HHMMSS>.<ext>: cameras sharing output_dir never collide"""
+    stamp = datetime.fromtimestamp(now).strftime('%Y%m%d_%H%M%S')
+    if camera_id is not None:
+        return f"{alert_type}_{camera_id}_{stamp}.{extension}"
+    return f"{alert_type}_{stamp}.{extension}"
+
+
+def _ring_views(buf, capacity, height, width):
+    """numpy views over the shared ring: frames, per-slot sequence numbers, timestamps"""
+    frame_bytes = capacity * height * width * 3
+    frames = np.ndarray((capacity, height, width, 3), dtype=np.uint8, buffer=buf)
+    seqs = np.ndarray((capacity,), dtype=np.int64, buffer=buf, offset=frame_bytes)
+    times = np.ndarray((capacity,), dtype=np.float64, buffer=buf, offset=frame_bytes + capacity * 8)
+    return frames, seqs, times
+
+
+def _ring_size(capacity, height, width):
+    return capacity * (height * width * 3 + 16)
+
+
+class FrameRing:
+    """
+    Fixed ring of downscaled frames in shared memory.
+
+    Frames are resized straight into their slot, so pushing allocates
+    nothing. Each slot carries the sequence number of the frame in it (-1
+    while being written); a reader holding (slot, seq) pairs can tell if a
+    frame was overwritten before or while it read it.
+    """
+
+    def __init__(self, capacity, width, height, name=None):
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=_ring_size(capacity, height, width))
+        self.frames, self.seqs, self.times = _ring_views(self.shm.buf, capacity, height, width)
+        self.seqs[:] = -1
+        self.head = 0
+
+    def push(self, frame, now):
+        slot = self.head % self.capacity
+        self.seqs[slot] = -1
+        cv2.resize(frame, (self.width, self.height), dst=self.frames[slot], interpolation=cv2.INTER_AREA)
+        self.times[slot] = now
+        self.seqs[slot] = self.head
+        self.head += 1
+        return slot, self.head - 1
+
+    def last(self, count):
+        """(slot, seq) for the newest `count` frames, oldest first"""
+        first = max(0, self.head - count)
+        return [(seq % self.capacity, seq) for seq in range(first, self.head)]
+
+    def close(self):
+        self.frames = self.seqs = self.times = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _encoder_process(shm_name, capacity, width, height, jobs, fps, codec, log_name):
+    """Encoder process: turns (slot, seq) lists into clip files"""
+    from structured_log import setup_logging
+    setup_logging(log_name)
+    try:
+        os.nice(10)  # Capture and inference come first
+    except (AttributeError, OSError):
+        pass
+    shm = shared_memory.SharedMemory(name=shm_name)
+    from local_ipc import _untrack
+    _untrack(shm)
+    frames, seqs, _ = _ring_views(shm.buf, capacity, height, width)
+    fourcc = cv2.VideoWriter_fourcc(*codec)
+    for path, snapshot in iter(jobs.get, None):
+        root, ext = os.path.splitext(path)
+        tmp = f"{root}.partial{ext}"
+        writer = cv2.VideoWriter(tmp, fourcc, fps, (width, height))
+        written = lapped = 0
+        for slot, seq in snapshot:
+            if seqs[slot] != seq:
+                lapped += 1
+                continue
+            frame = frames[slot].copy()
+            if seqs[slot] != seq:  # overwritten while we copied it
+                lapped += 1
+                continue
+            writer.write(frame)
+            written += 1
+        writer.release()
+        if written:
+            os.replace(tmp, path)
+            logger.info("Incident clip saved: %s (%d frames, %d lost)", path, written, lapped)
+        else:
+            os.remove(tmp)
+    frames = seqs = None
+    shm.close()
+
+
+class ClipRecorder:
+    """
+    Pre-event recorder for the detector loop.
+
+    `push` is called with every captured frame and stores one at most every
+    1/fps seconds. `capture` is called when a fall/help alert goes out: it
+    takes the (slot, seq) list of the last `pre_seconds` of frames - no pixel
+    copies - and returns the clip's file name right away. Frames for the next
+    `post_seconds` are added as they arrive, then the list goes to the
+    encoder process, which reads the pixels straight from the shared ring.
+    Alerts during a clip's post window share that clip.
+    """
+
+    def __init__(self, config, log_name='clip_encoder', camera_id=None):
+        self.config = config
+        self.camera_id = camera_id
+        self.alert_types = set(config['alert_types'])
+        self.output_dir = config['output_dir']
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.interval = 1.0 / config['fps']
+        capacity = int((config['pre_seconds'] + config['post_seconds'] + SLACK_SECONDS) * config['fps'])
+        self.pre_frames = int(config['pre_seconds'] * config['fps'])
+        self.ring = FrameRing(capacity, config['width'], config['height'])
+        self._lock = threading.Lock()
+        self._pending = None
+        self._next_push = 0.0
+        self.clips_started = 0
+
+        ctx = multiprocessing.get_context('spawn')
+        self._jobs = ctx.Queue()
+        self._encoder = ctx.Process(
+            target=_encoder_process, name='clip-encoder', daemon=True,
+            args=(self.ring.shm.name, capacity, config['width'], config['height'],
+                  self._jobs, config['fps'], config['codec'], log_name)
+        )
+        self._encoder.start()
+
+    def push(self, frame, now=None):
+        now = now if now is not None else time.time()
+        if now < self._next_push:
+            return
+        # Keep the average rate at `fps` even when camera frames don't line up
+        self._next_push = max(self._next_push, now - self.interval) + self.interval
+        with self._lock:
+            entry = self.ring.push(frame, now)
+            if self._pending is not None:
+                self._pending['frames'].append(entry)
+                if now >= self._pending['until']:
+                    self._submit()
+
+    def capture(self, alert_type, now=None, name=None):
+        """
+        Start (or join) a clip for an alert; returns the clip file name or None.
+        `name` is the file name the alert already links (supervised cameras).
+        """
+        if alert_type not in self.alert_types:
+            return None
+        now = now if now is not None else time.time()
+        with self._lock:
+            if self._pending is not None and name is not None and name != self._pending['name']:
+                # The alert links another file: finish this clip early and start that one
+                self._submit()
+            if self._pending is None:
+                name = name or clip_name(alert_type, now, self.config['extension'], self.camera_id)
+                self._pending = {
+                    'name': name,
+                    'frames': self.ring.last(self.pre_frames),
+                    'until': now + self.config['post_seconds']
+                }
+                self.clips_started += 1
+            return self._pending['name']
+
+    def _submit(self):
+        pending, self._pending = self._pending, None
+        self._jobs.put((os.path.join(self.output_dir, pending['name']), pending['frames']))
+
+    def close(self):
+        """Encode any clip in progress with the frames it has, then shut down"""
+        with self._lock:
+            if self._pending is not None:
+                self._submit()
+        self._jobs.put(None)
+        self._encoder.join(timeout=30)
+        if self._encoder.is_alive():
+            self._encoder.terminate()
+        self.ring.close()
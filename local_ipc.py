@@ -0,0 +1,247 @@
+"""
+Local Shared-Memory IPC for Assistive HAR System
+Lets a detector on the same machine publish its latest state and an event
+ring to the dashboard without HTTP, JSON-over-TCP or Flask routing
+"""
+
+import os
+import json
+import time
+import logging
+import struct
+import threading
+from multiprocessing import shared_memory
+
+logger = logging.getLogger(__name__)
+
+# Header: magic, generation, state seq, event head, slot count, slot size,
+# state capacity, state length, publisher heartbeat (unix time)
+HEADER = struct.Struct('<4sIQQIIIId')
+HEADER_SIZE = 64
+SLOT_HEADER = struct.Struct('<QI')  # event seq, payload length
+MAGIC = b'HAR2'
+
+# Segments published from this process
+_published = set()
+
+DEFAULT_IPC_CONFIG = {
+    'enabled': False,
+    'name': 'har_dashboard',
+    'slots': 256,
+    'slot_size': 2048,
+    'state_size': 16384,
+    'poll_interval': 0.02,
+    'heartbeat_interval': 1.0,
+    'stale_after': 5.0
+}
+
+
+def load_ipc_config(config_file='config.json'):
+    """Load the ipc section of config.json merged over defaults"""
+    config = dict(DEFAULT_IPC_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('ipc', {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+class LocalPublisher:
+    """
+    Detector side: owns the shared-memory segment.
+
+    The state region is guarded by a sequence lock (odd while being written),
+    and events go into a fixed ring of slots that readers follow by sequence
+    number. Writes never block on readers. A heartbeat in the header is
+    refreshed every `heartbeat_interval` seconds so readers can tell a live
+    segment from one the detector has abandoned.
+    """
+
+    def __init__(self, name='har_dashboard', slots=256, slot_size=2048, state_size=16384,
+                 heartbeat_interval=1.0):
+        self.slots = slots
+        self.slot_size = slot_size
+        self.state_size = state_size
+        self._ring_offset = HEADER_SIZE + state_size
+        size = self._ring_offset + slots * slot_size
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # A previous detector run (or an attached dashboard) still holds the name
+            self.shm = shared_memory.SharedMemory(name=name)
+            if self.shm.size < size:
+                self.shm.close()
+                raise RuntimeError(f"Shared memory segment '{name}' is too small; restart the dashboard")
+        self.buf = self.shm.buf
+        _published.add(self.shm._name)
+        # New generation tells attached readers to resynchronize
+        self.generation = int.from_bytes(os.urandom(4), 'little')
+        self._state_seq = 0
+        self._state_len = 0
+        self._head = 0
+        # Detector threads (main loop, alert channels) share one writer
+        self._lock = threading.Lock()
+        self._write_header()
+        self.dropped_events = 0
+        self._closed = threading.Event()
+        self._heartbeat_interval = heartbeat_interval
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name='ipc-heartbeat', daemon=True)
+        self._heartbeat_thread.start()
+
+    def _write_header(self):
+        HEADER.pack_into(self.buf, 0, MAGIC, self.generation, self._state_seq, self._head,
+                         self.slots, self.slot_size, self.state_size, self._state_len, time.time())
+
+    def _heartbeat_loop(self):
+        while not self._closed.wait(self._heartbeat_interval):
+            with self._lock:
+                if self.buf is None:
+                    return
+                self._write_header()
+
+    def publish_state(self, state):
+        """Replace the latest-state snapshot"""
+        data = json.dumps(state, default=str).encode('utf-8')
+        if len(data) > self.state_size:
+            logger.warning("IPC state too large (%d bytes), not published", len(data))
+            return False
+        with self._lock:
+            if self.buf is None:
+                return False
+            # Seqlock: odd sequence while the region is being rewritten
+            self._state_seq += 1
+            self._write_header()
+            self.buf[HEADER_SIZE:HEADER_SIZE + len(data)] = data
+            self._state_seq += 1
+            self._state_len = len(data)
+            self._write_header()
+        return True
+
+    def publish_event(self, kind, payload):
+        """Append an event to the ring; the oldest event is overwritten when full"""
+        data = json.dumps({'kind': kind, 'payload': payload}, default=str).encode('utf-8')
+        if len(data) > self.slot_size - SLOT_HEADER.size:
+            self.dropped_events += 1
+            logger.warning("IPC event too large (%d bytes), not published", len(data))
+            return False
+        with self._lock:
+            if self.buf is None:
+                return False
+            seq = self._head
+            offset = self._ring_offset + (seq % self.slots) * self.slot_size
+            start = offset + SLOT_HEADER.size
+            # Invalidate the slot first so a lapping reader can't accept a torn payload
+            SLOT_HEADER.pack_into(self.buf, offset, 2 ** 64 - 1, 0)
+            self.buf[start:start + len(data)] = data
+            SLOT_HEADER.pack_into(self.buf, offset, seq, len(data))
+            self._head = seq + 1
+            self._write_header()
+        return True
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            self.buf = None
+        self.shm.close()
+        _published.discard(self.shm._name)
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class StaleSegmentError(Exception):
+    """The publisher stopped refreshing its heartbeat; re-open the segment by name"""
+
+
+class LocalSubscriber:
+    """
+    Dashboard side: attaches to the detector's segment and follows it.
+
+    A restarted detector unlinks the old segment and creates a new one under
+    the same name, which an attached reader can't see. `poll` raises
+    StaleSegmentError once the heartbeat is `stale_after` seconds old, so
+    the caller can close this subscriber and attach again by name.
+    """
+
+    def __init__(self, name='har_dashboard', stale_after=5.0):
+        self.stale_after = stale_after
+        self.shm = shared_memory.SharedMemory(name=name)
+        _untrack(self.shm)
+        self.buf = self.shm.buf
+        self._generation = None
+        self._next_seq = 0
+        self._state_seq = None
+        self.missed_events = 0
+
+    def poll(self):
+        """
+        Return (state or None if unchanged, [events since last poll]).
+        Events lapped by the writer before they could be read are counted in
+        `missed_events`. Raises StaleSegmentError if the publisher has gone.
+        """
+        magic, generation, _, head, slots, slot_size, state_size, _, heartbeat = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC:
+            return None, []
+        if time.time() - heartbeat > self.stale_after:
+            raise StaleSegmentError(f"no heartbeat for {time.time() - heartbeat:.1f}s")
+        if generation != self._generation or head < self._next_seq:
+            # Detector restarted: skip history, start from the live head
+            self._generation = generation
+            self._next_seq = head
+            self._state_seq = None
+
+        events = []
+        ring_offset = HEADER_SIZE + state_size
+        if head - self._next_seq > slots:
+            self.missed_events += head - slots - self._next_seq
+            self._next_seq = head - slots
+        while self._next_seq < head:
+            seq = self._next_seq
+            offset = ring_offset + (seq % slots) * slot_size
+            slot_seq, length = SLOT_HEADER.unpack_from(self.buf, offset)
+            start = offset + SLOT_HEADER.size
+            data = bytes(self.buf[start:start + length])
+            # Re-check the slot was not overwritten while we copied it
+            if slot_seq == seq and SLOT_HEADER.unpack_from(self.buf, offset)[0] == seq:
+                try:
+                    events.append(json.loads(data))
+                except ValueError:
+                    self.missed_events += 1
+            else:
+                self.missed_events += 1
+            self._next_seq += 1
+
+        return self._read_state(), events
+
+    def _read_state(self):
+        for _ in range(3):
+            _, _, seq1, _, _, _, _, length, _ = HEADER.unpack_from(self.buf, 0)
+            if seq1 % 2 or seq1 == self._state_seq or length == 0:
+                return None
+            data = bytes(self.buf[HEADER_SIZE:HEADER_SIZE + length])
+            seq2 = HEADER.unpack_from(self.buf, 0)[2]
+            if seq1 == seq2:
+                self._state_seq = seq1
+                try:
+                    return json.loads(data)
+                except ValueError:
+                    return None
+        return None
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+
+def _untrack(shm):
+    """Stop the POSIX resource tracker from unlinking a segment we only attached to"""
+    if shm._name in _published:
+        # Published from this process too; the tracker entry is the publisher's
+        return
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
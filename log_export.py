@@ -0,0 +1,236 @@
+"""
+Log Export for Assistive HAR System
+Streams alert/activity log records and activity segment history as CSV,
+NDJSON or gzip-compressed columnar row groups with constant memory
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import zlib
+import argparse
+from datetime import datetime, timedelta
+from segment_store import RECORD, SPILL_ROOT, read_code_table
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'columnar': ('application/gzip', 'columns.jsonl.gz')
+}
+
+ALERT_FIELDS = ['timestamp', 'type', 'priority', 'message', 'source', 'camera_id', 'room',
+                'resident_id', 'node_id', 'confidence', 'duplicates', 'clip']
+SEGMENT_FIELDS = ['series', 'start', 'end', 'activity', 'duration']
+
+CHUNK_SIZE = 64 * 1024      # bytes handed to the writer/response at a time
+ROW_GROUP = 4096            # rows per columnar row group
+
+
+def parse_time(value):
+    """ISO date/datetime (or None) as a datetime"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _seek_to(f, start):
+    """
+    Position `f` at the first line whose timestamp is >= `start`.
+    The log is appended in time order, so this is a binary search over
+    byte offsets instead of a scan.
+    """
+    f.seek(0, os.SEEK_END)
+    lo, hi = 0, f.tell()
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if mid:
+            f.seek(mid - 1)
+            f.readline()    # move to the first line starting at or after mid
+        line = f.readline()
+        timestamp = _timestamp(line)
+        if line and (timestamp is None or timestamp < start):
+            lo = mid + 1
+        else:
+            hi = mid
+    f.seek(0)
+    if lo:
+        f.seek(lo - 1)
+        f.readline()
+
+
+def _timestamp(line):
+    try:
+        return json.loads(line).get('timestamp')
+    except (ValueError, AttributeError):
+        return None
+
+
+def iter_log_records(path='activity_log.json', start=None, end=None, types=None):
+    """Alert/activity log records in [start, end), optionally only the given types"""
+    start, end = parse_time(start), parse_time(end)
+    start_key = start.isoformat() if start else None
+    end_key = end.isoformat() if end else None
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        if start_key:
+            _seek_to(f, start_key)
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            timestamp = record.get('timestamp', '')
+            if start_key and timestamp < start_key:
+                continue
+            if end_key and timestamp >= end_key:
+                break
+            if types and record.get('type') not in types:
+                continue
+            yield record
+
+
+def iter_segments(spill_dir=None, start=None, end=None, types=None):
+    """
+    Spilled activity segments starting in [start, end), one day file at a time.
+    Every camera or resident has its own directory under `spill_dir`; its
+    name is the record's `series`. Defaults to SPILL_ROOT.
+    """
+    spill_dir = spill_dir or SPILL_ROOT
+    start, end = parse_time(start), parse_time(end)
+    series_dirs = sorted(name for name in os.listdir(spill_dir)
+                         if os.path.isdir(os.path.join(spill_dir, name))) if os.path.isdir(spill_dir) else []
+    t1 = start.timestamp() if start else float('-inf')
+    t2 = end.timestamp() if end else float('inf')
+    for series in series_dirs:
+        directory = os.path.join(spill_dir, series)
+        names = read_code_table(directory)
+        days = sorted(name[len('segments_'):-len('.bin')] for name in os.listdir(directory)
+                      if name.startswith('segments_') and name.endswith('.bin'))
+        for day in days:
+            day_start = datetime.fromisoformat(day)
+            if (end and day_start >= end) or (start and day_start + timedelta(days=1) <= start):
+                continue
+            with open(os.path.join(directory, f"segments_{day}.bin"), 'rb') as f:
+                while True:
+                    data = f.read(RECORD.size * 4096)
+                    if not data:
+                        break
+                    for seg_start, seg_end, code in RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size]):
+                        if code >= len(names):
+                            continue
+                        activity = names[code]
+                        if not t1 <= seg_start < t2 or (types and activity not in types):
+                            continue
+                        yield {
+                            'series': series,
+                            'start': datetime.fromtimestamp(seg_start).isoformat(),
+                            'end': datetime.fromtimestamp(seg_end).isoformat(),
+                            'activity': activity,
+                            'duration': round(seg_end - seg_start, 3)
+                        }
+
+
+def _chunked(pieces):
+    """Join small byte strings into CHUNK_SIZE chunks"""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _csv_rows(records, fields):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+        yield out.getvalue().encode('utf-8')
+        out.seek(0)
+        out.truncate()
+    yield out.getvalue().encode('utf-8')
+
+
+def _ndjson_rows(records):
+    for record in records:
+        yield json.dumps(record, default=str).encode('utf-8') + b'\n'
+
+
+def _columnar(records, fields):
+    """
+    gzip stream of row groups: each line is {"rows": n, "columns": {field: [...]}}.
+    Columns of similar values compress far better than rows, and a reader can
+    load just the columns it needs one group at a time.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    columns = {field: [] for field in fields}
+    rows = 0
+    for record in records:
+        for field in fields:
+            columns[field].append(record.get(field))
+        rows += 1
+        if rows == ROW_GROUP:
+            yield compressor.compress(json.dumps({'rows': rows, 'columns': columns}, default=str).encode('utf-8') + b'\n')
+            columns = {field: [] for field in fields}
+            rows = 0
+    if rows:
+        yield compressor.compress(json.dumps({'rows': rows, 'columns': columns}, default=str).encode('utf-8') + b'\n')
+    yield compressor.flush()
+
+
+def export(dataset, fmt='ndjson', start=None, end=None, types=None,
+           log_path='activity_log.json', spill_dir=None):
+    """Generator of byte chunks for `dataset` ('alerts' or 'activity') in `fmt`"""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    # Bad dates fail here rather than halfway through a response
+    start, end = parse_time(start), parse_time(end)
+    if dataset == 'alerts':
+        records, fields = iter_log_records(log_path, start, end, types), ALERT_FIELDS
+    elif dataset == 'activity':
+        records, fields = iter_segments(spill_dir, start, end, types), SEGMENT_FIELDS
+    else:
+        raise ValueError("dataset must be 'alerts' or 'activity'")
+    if fmt == 'csv':
+        pieces = _csv_rows(records, fields)
+    elif fmt == 'ndjson':
+        pieces = _ndjson_rows(records)
+    else:
+        pieces = _columnar(records, fields)
+    return _chunked(piece for piece in pieces if piece)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export HAR alert logs or activity history")
+    parser.add_argument('dataset', choices=['alerts', 'activity'])
+    parser.add_argument('--format', choices=list(FORMATS), default='csv')
+    parser.add_argument('--start', help="ISO date or datetime (inclusive)")
+    parser.add_argument('--end', help="ISO date or datetime (exclusive)")
+    parser.add_argument('--type', action='append', dest='types',
+                        help="Alert type or activity to include (repeatable)")
+    parser.add_argument('--log', default='activity_log.json')
+    parser.add_argument('--segments', default=SPILL_ROOT)
+    parser.add_argument('-o', '--output', help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    chunks = export(args.dataset, args.format, args.start, args.end, args.types,
+                    log_path=args.log, spill_dir=args.segments)
+    if args.output:
+        with open(args.output, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+    else:
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+
+
+if __name__ == "__main__":
+    main()
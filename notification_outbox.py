@@ -0,0 +1,255 @@
+"""
+Notification Outbox for Assistive HAR System
+Durable SQLite outbox: every notification is recorded before it is sent and
+retried with jittered exponential backoff until delivered or dead-lettered
+"""
+
+import json
+import logging
+import time
+import random
+import sqlite3
+import threading
+from alert_queue import priority_rank
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationOutbox:
+    """
+    Persistent queue of outgoing notifications.
+
+    Each row has an idempotency key (alert id + recipient), so enqueueing the
+    same notification twice - e.g. when an alert is replayed after a restart -
+    never messages a contact twice. Rows left pending are retried when the
+    outbox is opened again.
+
+    A row in flight when the process died may or may not have reached the
+    provider. The deliverer records the provider's receipt with
+    `record_receipt` as soon as it has one; on restart rows with a receipt
+    are marked sent, and the rest are retried with `in_doubt` set so the
+    deliverer can look the message up before sending it again. Retries after
+    a failed attempt are in doubt too (the request may have timed out after
+    the provider accepted it).
+
+    `deliver` is called on the sender thread with a list of due items
+    (dicts with key, contact, message, alert_type, priority, attempts,
+    created, in_doubt) and must return {key: True/False}.
+    """
+
+    def __init__(self, deliver, db_path='notification_outbox.db', max_attempts=8,
+                 base_delay=2.0, max_delay=300.0, batch_size=20):
+        self.deliver = deliver
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._running = True
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS notifications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                idem_key TEXT UNIQUE NOT NULL,
+                contact TEXT NOT NULL,
+                message TEXT NOT NULL,
+                alert_type TEXT,
+                priority TEXT,
+                rank INTEGER,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                created REAL NOT NULL,
+                updated REAL NOT NULL,
+                last_error TEXT,
+                provider_ref TEXT,
+                provider_status TEXT,
+                in_doubt INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(notifications)')}
+        for column, ddl in (('provider_ref', 'TEXT'), ('provider_status', 'TEXT'),
+                            ('in_doubt', 'INTEGER NOT NULL DEFAULT 0')):
+            if column not in columns:
+                self._db.execute(f'ALTER TABLE notifications ADD COLUMN {column} {ddl}')
+        self._db.execute(
+            'CREATE INDEX IF NOT EXISTS idx_notifications_due ON notifications (status, next_attempt)'
+        )
+
+        # Reconcile whatever was in flight when the process died: the provider
+        # already accepted rows with a receipt, the rest go back to pending
+        now = time.time()
+        with self._lock:
+            accepted = self._db.execute(
+                """UPDATE notifications SET status = 'sent', updated = ?
+                   WHERE status = 'sending' AND provider_status IS NOT NULL""", (now,)
+            ).rowcount
+            in_doubt = self._db.execute(
+                """UPDATE notifications SET status = 'pending', in_doubt = 1, updated = ?
+                   WHERE status = 'sending'""", (now,)
+            ).rowcount
+            replayed = self._count('pending')
+        if replayed or accepted:
+            logger.info("Notification outbox: replaying %d undelivered notification(s) "
+                        "(%d in flight without a receipt, %d already accepted)",
+                        replayed, in_doubt, accepted)
+
+        self._thread = threading.Thread(target=self._run, name='outbox-sender', daemon=True)
+        self._thread.start()
+
+    def enqueue(self, key, contact, message, alert_type='general', priority='normal'):
+        """
+        Durably record a notification; returns False if `key` was already queued.
+        Never blocks on delivery.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                """INSERT OR IGNORE INTO notifications
+                   (idem_key, contact, message, alert_type, priority, rank, status,
+                    attempts, next_attempt, created, updated)
+                   VALUES (?, ?, ?, ?, ?, ?, 'pending', 0, ?, ?, ?)""",
+                (key, json.dumps(contact), message, alert_type, priority,
+                 priority_rank(priority), now, now, now)
+            )
+            inserted = cursor.rowcount == 1
+        if inserted:
+            with self._wake:
+                self._wake.notify()
+        return inserted
+
+    def record_receipt(self, key, provider_ref=None, provider_status='accepted'):
+        """
+        Record that the provider accepted the notification (message SID and
+        status, if it returns them) so a crash before the batch completes
+        doesn't send it again
+        """
+        with self._lock:
+            self._db.execute(
+                """UPDATE notifications SET provider_ref = ?, provider_status = ?, updated = ?
+                   WHERE idem_key = ?""", (provider_ref, provider_status, time.time(), key)
+            )
+
+    def stop(self):
+        with self._wake:
+            self._running = False
+            self._wake.notify()
+        self._thread.join(timeout=5)
+        with self._lock:
+            self._db.close()
+
+    def get_stats(self):
+        """Counts of pending, sent and dead-lettered notifications"""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT status, COUNT(*) FROM notifications GROUP BY status'
+            ).fetchall()
+        return dict(rows)
+
+    def dead_letters(self, limit=50):
+        with self._lock:
+            rows = self._db.execute(
+                """SELECT idem_key, contact, message, attempts, last_error, updated
+                   FROM notifications WHERE status = 'dead'
+                   ORDER BY updated DESC LIMIT ?""", (limit,)
+            ).fetchall()
+        return [
+            {'key': r[0], 'contact': json.loads(r[1]), 'message': r[2],
+             'attempts': r[3], 'last_error': r[4], 'updated': r[5]}
+            for r in rows
+        ]
+
+    def _count(self, status):
+        return self._db.execute(
+            'SELECT COUNT(*) FROM notifications WHERE status = ?', (status,)
+        ).fetchone()[0]
+
+    def _run(self):
+        while True:
+            with self._wake:
+                if not self._running:
+                    return
+            try:
+                due = self._claim_due()
+                if due:
+                    self._attempt(due)
+                    continue
+                # Sleep until the next retry is due or something new is enqueued
+                timeout = self._seconds_until_next()
+                timeout = 60.0 if timeout is None else min(timeout, 60.0)
+            except Exception as e:
+                logger.error("Notification outbox error: %s", e)
+                timeout = 1.0
+
+            with self._wake:
+                if self._running:
+                    self._wake.wait(timeout)
+
+    def _claim_due(self):
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                """SELECT id, idem_key, contact, message, alert_type, priority, attempts,
+                          created, in_doubt
+                   FROM notifications
+                   WHERE status = 'pending' AND next_attempt <= ?
+                   ORDER BY rank, created LIMIT ?""", (now, self.batch_size)
+            ).fetchall()
+            if rows:
+                self._db.executemany(
+                    "UPDATE notifications SET status = 'sending', updated = ? WHERE id = ?",
+                    [(now, row[0]) for row in rows]
+                )
+        return [
+            {'id': r[0], 'key': r[1], 'contact': json.loads(r[2]), 'message': r[3],
+             'alert_type': r[4], 'priority': r[5], 'attempts': r[6],
+             'created': r[7], 'in_doubt': bool(r[8]) or r[6] > 0}
+            for r in rows
+        ]
+
+    def _attempt(self, items):
+        try:
+            results = self.deliver(items) or {}
+            error = None
+        except Exception as e:
+            results = {}
+            error = str(e)
+
+        now = time.time()
+        updates = []
+        for item in items:
+            attempts = item['attempts'] + 1
+            if results.get(item['key']):
+                updates.append(('sent', attempts, now, None, now, item['id']))
+            elif attempts >= self.max_attempts:
+                logger.error("Notification dead-lettered after %d attempts: %s", attempts, item['key'])
+                updates.append(('dead', attempts, now, error or 'delivery failed', now, item['id']))
+            else:
+                updates.append(('pending', attempts, now + self._backoff(attempts),
+                                error or 'delivery failed', now, item['id']))
+
+        with self._lock:
+            self._db.executemany(
+                """UPDATE notifications
+                   SET status = ?, attempts = ?, next_attempt = ?, last_error = ?, updated = ?
+                   WHERE id = ?""", updates
+            )
+
+    def _backoff(self, attempts):
+        """Exponential backoff with jitter so retries don't synchronize"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return random.uniform(delay / 2, delay)
+
+    def _seconds_until_next(self):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt) FROM notifications WHERE status = 'pending'"
+            ).fetchone()
+        if not row or row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
@@ -0,0 +1,274 @@
+"""
+Multi-Person Tracking for Assistive HAR System
+Associates the poses detected in each frame with stable track ids so every
+person in view keeps their own activity state, and runs hand/holistic
+analysis only on the tracked resident's crop
+"""
+
+import json
+import time
+
+DEFAULT_MULTI_PERSON_CONFIG = {
+    'enabled': False,
+    'model_path': 'models/pose_landmarker_lite.task',
+    'max_people': 4,
+    'iou_threshold': 0.3,
+    'max_distance': 0.15,
+    'max_misses': 15,
+    'min_hits': 5,
+    'crop_margin': 0.15
+}
+
+
+def load_multi_person_config(config_file='config.json'):
+    """Load the multi_person section of config.json merged over defaults"""
+    config = dict(DEFAULT_MULTI_PERSON_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('multi_person', {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+def landmarks_bbox(landmarks, min_visibility=0.5):
+    """Normalized (x0, y0, x1, y1) box around the visible landmarks, or None"""
+    points = [(lm.x, lm.y) for lm in landmarks if _visibility(lm) >= min_visibility]
+    if len(points) < 4:
+        return None
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return (max(0.0, min(xs)), max(0.0, min(ys)), min(1.0, max(xs)), min(1.0, max(ys)))
+
+
+def _visibility(landmark):
+    visibility = getattr(landmark, 'visibility', None)
+    return 1.0 if visibility is None else visibility
+
+
+def iou(a, b):
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def centroid(box):
+    return ((box[0] + box[2]) / 2, (box[1] + box[3]) / 2)
+
+
+class Track:
+    """One person followed across frames"""
+
+    def __init__(self, track_id, bbox, landmarks, state, now):
+        self.id = track_id
+        self.bbox = bbox
+        self.landmarks = landmarks
+        self.state = state
+        self.hits = 1
+        self.misses = 0
+        self.first_seen = now
+
+    @property
+    def visible(self):
+        return self.misses == 0
+
+
+class PersonTracker:
+    """
+    Lightweight identity tracker.
+
+    Detections are matched to tracks greedily by box IoU, then leftovers by
+    centroid distance (for fast motion where boxes stop overlapping). Tracks
+    survive `max_misses` frames without a match. `state_factory` builds the
+    per-track state (activity tracker, shoulder and ankle histories).
+
+    The resident is the longest-tracked visible person; once chosen they stay
+    the resident while their track is alive.
+    """
+
+    def __init__(self, state_factory=dict, iou_threshold=0.3, max_distance=0.15,
+                 max_misses=15, min_hits=5):
+        self.state_factory = state_factory
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.tracks = {}
+        self.resident_id = None
+        self._next_id = 1
+
+    def update(self, detections, now=None):
+        """
+        `detections` is a list of (bbox, landmarks). Returns the live tracks.
+        """
+        now = now if now is not None else time.time()
+        unmatched_tracks = set(self.tracks)
+        unmatched_dets = set(range(len(detections)))
+
+        pairs = sorted(
+            ((iou(self.tracks[t].bbox, detections[d][0]), t, d)
+             for t in unmatched_tracks for d in unmatched_dets),
+            reverse=True
+        )
+        for score, t, d in pairs:
+            if score < self.iou_threshold:
+                break
+            if t in unmatched_tracks and d in unmatched_dets:
+                self._assign(t, detections[d])
+                unmatched_tracks.discard(t)
+                unmatched_dets.discard(d)
+
+        pairs = sorted(
+            (_distance(self.tracks[t].bbox, detections[d][0]), t, d)
+            for t in unmatched_tracks for d in unmatched_dets
+        )
+        for dist, t, d in pairs:
+            if dist > self.max_distance:
+                break
+            if t in unmatched_tracks and d in unmatched_dets:
+                self._assign(t, detections[d])
+                unmatched_tracks.discard(t)
+                unmatched_dets.discard(d)
+
+        for t in unmatched_tracks:
+            track = self.tracks[t]
+            track.misses += 1
+            track.landmarks = None
+            if track.misses > self.max_misses:
+                del self.tracks[t]
+                if t == self.resident_id:
+                    self.resident_id = None
+
+        for d in sorted(unmatched_dets):
+            bbox, landmarks = detections[d]
+            track = Track(self._next_id, bbox, landmarks, self.state_factory(), now)
+            self.tracks[track.id] = track
+            self._next_id += 1
+
+        return list(self.tracks.values())
+
+    def _assign(self, track_id, detection):
+        track = self.tracks[track_id]
+        track.bbox, track.landmarks = detection
+        track.hits += 1
+        track.misses = 0
+
+    def resident(self):
+        """The tracked resident, or None while nobody has been seen long enough"""
+        track = self.tracks.get(self.resident_id)
+        if track is not None:
+            return track if track.visible else None
+        candidates = [t for t in self.tracks.values() if t.visible and t.hits >= self.min_hits]
+        if not candidates:
+            return None
+        track = max(candidates, key=lambda t: (t.hits, -t.first_seen))
+        self.resident_id = track.id
+        return track
+
+
+def _distance(a, b):
+    ca, cb = centroid(a), centroid(b)
+    return ((ca[0] - cb[0]) ** 2 + (ca[1] - cb[1]) ** 2) ** 0.5
+
+
+class ResidentResults:
+    """Holistic-style results for the resident, in full-frame coordinates"""
+
+    def __init__(self, pose_landmarks=None, left_hand_landmarks=None, right_hand_landmarks=None):
+        self.pose_landmarks = pose_landmarks
+        self.left_hand_landmarks = left_hand_landmarks
+        self.right_hand_landmarks = right_hand_landmarks
+
+
+class MultiPersonPipeline:
+    """
+    One multi-pose pass over the full frame, identity tracking, then Holistic
+    on the resident's crop only, so adding people costs a few landmarks rather
+    than another full Holistic run each.
+    """
+
+    def __init__(self, config, state_factory):
+        # MediaPipe Tasks is only needed when multi-person mode is enabled
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+        from mediapipe.framework.formats import landmark_pb2
+        import mediapipe as mp
+
+        self._mp = mp
+        self._landmark_pb2 = landmark_pb2
+        self.config = config
+        options = vision.PoseLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=config['model_path']),
+            running_mode=vision.RunningMode.VIDEO,
+            num_poses=config['max_people'],
+            min_pose_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        self.landmarker = vision.PoseLandmarker.create_from_options(options)
+        self.tracker = PersonTracker(state_factory, config['iou_threshold'], config['max_distance'],
+                                     config['max_misses'], config['min_hits'])
+        self._last_timestamp = 0
+
+    def process(self, image_rgb, holistic):
+        """
+        Returns (resident results or None, live tracks, resident track or None).
+        Visitor tracks carry a full-frame `pose` proto for their own analysis.
+        """
+        # Video mode needs strictly increasing timestamps
+        timestamp = max(int(time.monotonic() * 1000), self._last_timestamp + 1)
+        self._last_timestamp = timestamp
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=image_rgb)
+        detected = self.landmarker.detect_for_video(image, timestamp)
+
+        detections = []
+        for landmarks in detected.pose_landmarks:
+            bbox = landmarks_bbox(landmarks)
+            if bbox is not None:
+                detections.append((bbox, landmarks))
+        tracks = self.tracker.update(detections)
+        for track in tracks:
+            track.pose = self._to_proto(track.landmarks) if track.landmarks else None
+
+        resident = self.tracker.resident()
+        if resident is None:
+            return None, tracks, None
+
+        h, w = image_rgb.shape[:2]
+        x0, y0, x1, y1 = self._crop_box(resident.bbox)
+        px0, py0, px1, py1 = int(x0 * w), int(y0 * h), int(x1 * w), int(y1 * h)
+        if px1 - px0 < 16 or py1 - py0 < 16:
+            return ResidentResults(pose_landmarks=resident.pose), tracks, resident
+        crop = image_rgb[py0:py1, px0:px1]
+        crop_results = holistic.process(crop)
+        box = (x0, y0, x1 - x0, y1 - y0)
+        results = ResidentResults(
+            pose_landmarks=resident.pose,
+            left_hand_landmarks=self._to_proto(crop_results.left_hand_landmarks, box),
+            right_hand_landmarks=self._to_proto(crop_results.right_hand_landmarks, box)
+        )
+        return results, tracks, resident
+
+    def _crop_box(self, bbox):
+        margin = self.config['crop_margin']
+        mx = (bbox[2] - bbox[0]) * margin
+        my = (bbox[3] - bbox[1]) * margin
+        return (max(0.0, bbox[0] - mx), max(0.0, bbox[1] - my),
+                min(1.0, bbox[2] + mx), min(1.0, bbox[3] + my))
+
+    def _to_proto(self, landmarks, box=None):
+        """Landmarks as a NormalizedLandmarkList, mapped from crop to frame coordinates if `box` is given"""
+        if landmarks is None:
+            return None
+        if hasattr(landmarks, 'landmark'):
+            landmarks = landmarks.landmark
+        x0, y0, bw, bh = box or (0.0, 0.0, 1.0, 1.0)
+        proto = self._landmark_pb2.NormalizedLandmarkList()
+        for lm in landmarks:
+            proto.landmark.add(x=x0 + lm.x * bw, y=y0 + lm.y * bh, z=lm.z,
+                               visibility=_visibility(lm))
+        return proto
+
+    def close(self):
+        self.landmarker.close()
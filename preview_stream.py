@@ -0,0 +1,228 @@
+"""
+Live Preview Stream for Assistive HAR System
+Serves the annotated detector view as MJPEG to any number of browsers;
+each frame is encoded once, and not at all while nobody is watching
+"""
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from startup import LazyModule
+
+cv2 = LazyModule('cv2')
+
+DEFAULT_PREVIEW_CONFIG = {
+    'enabled': True,
+    'host': '127.0.0.1',
+    'port': 5001,
+    'fps': 5,
+    'max_width': 480,
+    'quality': 70,
+    'max_viewers': 8
+}
+
+BOUNDARY = 'harframe'
+
+
+def load_preview_config(config_file='config.json'):
+    """Load the preview section of config.json merged over defaults"""
+    config = dict(DEFAULT_PREVIEW_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('preview', {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+class PreviewBroadcaster:
+    """
+    Encode-once fan-out of annotated frames.
+
+    The detector calls `offer` with every annotated frame. With no viewers
+    that is a single comparison. Otherwise at most `fps` frames per second
+    are handed (by reference; the loop makes a new frame each time) to the
+    encoder thread, which resizes and JPEG-encodes the newest one. Viewers
+    wait for the next sequence number and always send the latest JPEG, so a
+    slow client skips frames instead of queueing them.
+    """
+
+    def __init__(self, fps=5, max_width=480, quality=70, max_viewers=8):
+        self.interval = 1.0 / fps
+        self.max_width = max_width
+        self.quality = quality
+        self.max_viewers = max_viewers
+        self.viewers = 0
+        self.jpeg = None
+        self.seq = 0
+        self.encoded = 0
+        self.sent = 0
+        self.skipped = 0
+        self._pending = None
+        self._next_offer = 0.0
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._encode_loop, name='preview-encoder', daemon=True)
+        self._thread.start()
+
+    def offer(self, frame, now=None):
+        if not self.viewers:
+            return
+        now = now if now is not None else time.time()
+        if now < self._next_offer:
+            return
+        self._next_offer = now + self.interval
+        with self._cond:
+            self._pending = frame
+            self._cond.notify_all()
+
+    def _encode_loop(self):
+        while True:
+            with self._cond:
+                while self._running and self._pending is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                frame, self._pending = self._pending, None
+            h, w = frame.shape[:2]
+            if w > self.max_width:
+                frame = cv2.resize(frame, (self.max_width, int(h * self.max_width / w)),
+                                   interpolation=cv2.INTER_AREA)
+            ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if not ok:
+                continue
+            with self._cond:
+                self.jpeg = jpeg.tobytes()
+                self.seq += 1
+                self.encoded += 1
+                self._cond.notify_all()
+
+    def join(self):
+        """Register a viewer; False when the viewer limit is reached"""
+        with self._cond:
+            if self.viewers >= self.max_viewers:
+                return False
+            self.viewers += 1
+            return True
+
+    def leave(self):
+        with self._cond:
+            self.viewers -= 1
+
+    def wait_frame(self, last_seq, timeout=5.0):
+        """
+        The newest JPEG after `last_seq` as (seq, bytes), or (last_seq, None)
+        on timeout or once the broadcaster is stopped
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._running and self.seq <= last_seq:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return last_seq, None
+                self._cond.wait(remaining)
+            if not self._running:
+                return last_seq, None
+            if last_seq and self.seq > last_seq + 1:
+                self.skipped += self.seq - last_seq - 1
+            return self.seq, self.jpeg
+
+    def get_stats(self):
+        with self._cond:
+            return {'viewers': self.viewers, 'encoded': self.encoded,
+                    'sent': self.sent, 'skipped': self.skipped}
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=2)
+
+
+class _PreviewHandler(BaseHTTPRequestHandler):
+    broadcaster = None
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/preview.mjpg':
+            self._stream()
+        elif path == '/preview.jpg':
+            self._snapshot()
+        else:
+            self.send_error(404)
+
+    def _stream(self):
+        broadcaster = self.broadcaster
+        if not broadcaster.join():
+            self.send_error(503, 'Too many preview viewers')
+            return
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            seq = 0
+            while True:
+                seq, jpeg = broadcaster.wait_frame(seq)
+                if jpeg is None:
+                    if not broadcaster._running:
+                        return
+                    continue
+                # A blocking write to a slow client only delays this client;
+                # frames produced meanwhile are skipped, not buffered
+                self.wfile.write(f'--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n'
+                                 f'Content-Length: {len(jpeg)}\r\n\r\n'.encode('ascii'))
+                self.wfile.write(jpeg)
+                self.wfile.write(b'\r\n')
+                broadcaster.sent += 1
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            broadcaster.leave()
+
+    def _snapshot(self):
+        broadcaster = self.broadcaster
+        if not broadcaster.join():
+            self.send_error(503, 'Too many preview viewers')
+            return
+        try:
+            # Encoding only runs while someone watches, so wait for a fresh frame
+            _, jpeg = broadcaster.wait_frame(broadcaster.seq)
+        finally:
+            broadcaster.leave()
+        if jpeg is None:
+            self.send_error(503, 'No frame available')
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(jpeg)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(jpeg)
+
+    def log_message(self, format, *args):
+        pass  # one line per frame request would flood the console
+
+
+class PreviewServer:
+    """MJPEG server on its own threads: /preview.mjpg (stream) and /preview.jpg (snapshot)"""
+
+    def __init__(self, config):
+        self.broadcaster = PreviewBroadcaster(config['fps'], config['max_width'],
+                                              config['quality'], config['max_viewers'])
+        handler = type('PreviewHandler', (_PreviewHandler,), {'broadcaster': self.broadcaster})
+        self.httpd = ThreadingHTTPServer((config['host'], config['port']), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{config['host']}:{config['port']}/preview.mjpg"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='preview-server', daemon=True)
+        self._thread.start()
+
+    def offer(self, frame):
+        self.broadcaster.offer(frame)
+
+    def stop(self):
+        self.broadcaster.stop()
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,240 @@
+"""
+Sampling Profiler for Assistive HAR System
+Low-overhead, opt-in stack sampler that can be toggled at runtime
+"""
+
+import sys
+import os
+import json
+import logging
+import time
+import marshal
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_PROFILING_CONFIG = {
+    'enabled': False,
+    'frames': 300,
+    'seconds': 0,
+    'interval_ms': 5,
+    'format': 'collapsed',  # 'collapsed' or 'pstats'
+    'output_dir': 'profiles',
+    'top_n': 20,
+    'max_seconds': 120
+}
+
+
+def load_profiler_config(config_file='config.json'):
+    """Load the profiling section of config.json merged over defaults"""
+    config = dict(DEFAULT_PROFILING_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('profiling', {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+class SamplingProfiler:
+    """
+    Periodically samples the Python stacks of every thread.
+
+    Nothing runs while the profiler is idle: the sampler thread only exists
+    for the duration of a session, and the per-frame hooks (`on_frame`,
+    `mark`) return after a single attribute check.
+    """
+
+    def __init__(self, config=None):
+        self.config = dict(DEFAULT_PROFILING_CONFIG)
+        if config:
+            self.config.update(config)
+        self.active = False
+        self.last_summary = None
+        self.last_output = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._sampler_thread = None
+        self._frames_left = None
+        self._deadline = None
+        self._phases = {}
+        self._stacks = Counter()
+        self._sample_count = 0
+        self._started_at = None
+
+    def start(self, frames=None, seconds=None):
+        """
+        Start a profiling session limited by frame count and/or seconds.
+        With neither given the configured defaults apply; a session given
+        only seconds runs for those seconds, not the default frame count.
+        """
+        with self._lock:
+            if self.active:
+                return False
+
+            if frames is None:
+                frames = self.config['frames'] if not seconds else 0
+            seconds = seconds if seconds is not None else self.config['seconds']
+            # Never let a session run unbounded in production
+            max_seconds = self.config['max_seconds']
+            if not seconds or seconds > max_seconds:
+                seconds = max_seconds
+
+            self._frames_left = int(frames) if frames else None
+            self._deadline = time.time() + float(seconds)
+            self._stacks = Counter()
+            self._sample_count = 0
+            self._phases = {}
+            self._started_at = datetime.now()
+            self._stop_event.clear()
+            self.active = True
+
+            self._sampler_thread = threading.Thread(
+                target=self._sample_loop, name='profiler-sampler', daemon=True
+            )
+            self._sampler_thread.start()
+
+        logger.info("Profiler started (frames=%s, seconds=%s)", frames or 'unlimited', seconds)
+        return True
+
+    def stop(self):
+        """Stop the current session; results are written by the sampler thread"""
+        self._stop_event.set()
+
+    def on_frame(self):
+        """Count a processed frame; ends the session once the frame budget is used"""
+        if not self.active or self._frames_left is None:
+            return
+        self._frames_left -= 1
+        if self._frames_left <= 0:
+            self._stop_event.set()
+
+    def mark(self, phase):
+        """Label the calling thread's current pipeline phase (capture/inference/detection)"""
+        if self.active:
+            self._phases[threading.get_ident()] = phase
+
+    def _sample_loop(self):
+        interval = max(self.config['interval_ms'], 1) / 1000.0
+        own_ident = threading.get_ident()
+
+        while not self._stop_event.wait(interval):
+            if time.time() >= self._deadline:
+                break
+            try:
+                self._take_sample(own_ident)
+            except Exception as e:
+                logger.error("Profiler sample error: %s", e)
+
+        try:
+            self._finish()
+        except Exception as e:
+            logger.error("Profiler output error: %s", e)
+        self.active = False
+
+    def _take_sample(self, own_ident):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            thread_name = names.get(ident, str(ident))
+            phase = self._phases.get(ident)
+            if phase:
+                thread_name = f"{thread_name}[{phase}]"
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            stack.reverse()
+            self._stacks[(thread_name, tuple(stack))] += 1
+        self._sample_count += 1
+
+    def _finish(self):
+        """Write the profile to disk and build the hot-function summary"""
+        output_dir = self.config['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = self._started_at.strftime('%Y%m%d_%H%M%S')
+
+        if self.config['format'] == 'pstats':
+            path = os.path.join(output_dir, f"profile_{stamp}.pstats")
+            self._write_pstats(path)
+        else:
+            path = os.path.join(output_dir, f"profile_{stamp}.folded")
+            self._write_collapsed(path)
+
+        self.last_output = path
+        self.last_summary = self.summary()
+        logger.info("Profiler finished: %d samples written to %s", self._sample_count, path)
+
+    def _write_collapsed(self, path):
+        with open(path, 'w') as f:
+            for (thread_name, stack), count in self._stacks.items():
+                frames = ';'.join(_format_func(func) for func in stack)
+                f.write(f"{thread_name};{frames} {count}\n")
+
+    def _write_pstats(self, path):
+        """Write samples in the marshal format read by pstats.Stats"""
+        interval = self.config['interval_ms'] / 1000.0
+        self_time = Counter()
+        total_time = Counter()
+        callers = defaultdict(Counter)
+
+        for (_, stack), count in self._stacks.items():
+            if not stack:
+                continue
+            self_time[stack[-1]] += count
+            for func in set(stack):
+                total_time[func] += count
+            for caller, callee in zip(stack, stack[1:]):
+                callers[callee][caller] += count
+
+        stats = {}
+        for func, total in total_time.items():
+            func_callers = {
+                caller: (n, n, 0.0, n * interval) for caller, n in callers[func].items()
+            }
+            stats[func] = (total, total, self_time[func] * interval,
+                           total * interval, func_callers)
+
+        with open(path, 'wb') as f:
+            marshal.dump(stats, f)
+
+    def summary(self, top_n=None):
+        """Top-N hot functions (by self samples) for each thread"""
+        top_n = top_n or self.config['top_n']
+        per_thread = defaultdict(Counter)
+        thread_samples = Counter()
+        for (thread_name, stack), count in self._stacks.items():
+            thread_samples[thread_name] += count
+            if stack:
+                per_thread[thread_name][stack[-1]] += count
+
+        threads = {}
+        for thread_name, funcs in per_thread.items():
+            total = thread_samples[thread_name]
+            threads[thread_name] = [
+                {
+                    'function': _format_func(func),
+                    'samples': n,
+                    'percent': round(100.0 * n / total, 1)
+                }
+                for func, n in funcs.most_common(top_n)
+            ]
+
+        return {
+            'started': self._started_at.isoformat() if self._started_at else None,
+            'samples': self._sample_count,
+            'interval_ms': self.config['interval_ms'],
+            'output': self.last_output,
+            'threads': threads
+        }
+
+
+def _format_func(func):
+    filename, lineno, name = func
+    return f"{name} ({os.path.basename(filename)}:{lineno})"
@@ -0,0 +1,194 @@
+"""
+Per-Resident Dashboard State for Assistive HAR System
+Sharded state for facilities with many rooms: each resident's activity,
+alerts and statistics sit behind their own lock
+"""
+
+import time
+import threading
+import collections
+from datetime import datetime
+
+# Alerts at these priorities stay open on the overview until acknowledged
+OPEN_ALERT_PRIORITIES = ('critical', 'high')
+
+
+def apply_alert_statistics(statistics, alert):
+    """Update the daily counters for a received alert"""
+    if alert['type'] == 'fall':
+        statistics['falls_today'] += 1
+        statistics['last_fall_time'] = alert['received_at']
+    elif alert['type'] == 'help':
+        statistics['help_requests_today'] += 1
+        statistics['last_help_time'] = alert['received_at']
+    elif alert['type'] == 'gesture':
+        statistics['total_gestures_today'] += 1
+
+
+def apply_alert_merge(alert, update):
+    """Copy the cameras and confidence of a cross-camera merge update onto a stored alert"""
+    for key in ('camera_ids', 'confidence', 'duplicates'):
+        if update.get(key) is not None:
+            alert[key] = update[key]
+
+
+def _empty_statistics():
+    return {
+        'falls_today': 0,
+        'help_requests_today': 0,
+        'total_gestures_today': 0,
+        'last_fall_time': None,
+        'last_help_time': None
+    }
+
+
+class ResidentShard:
+    """One resident's dashboard state, guarded by its own lock"""
+
+    def __init__(self, resident_id, max_alerts=50, max_log=100):
+        self.resident_id = resident_id
+        self.lock = threading.Lock()
+        self.node_id = None
+        self.room = None
+        self.last_seen = None
+        self.current_activity = 'Unknown'
+        self.alerts = collections.deque(maxlen=max_alerts)
+        self.activity_log = collections.deque(maxlen=max_log)
+        self.statistics = _empty_statistics()
+        self.activity_duration = {}
+        self._alert_ids = 0
+
+    def _touch(self, tags):
+        # Caller holds the lock
+        self.last_seen = time.time()
+        if tags.get('node_id'):
+            self.node_id = tags['node_id']
+        if tags.get('room'):
+            self.room = tags['room']
+
+    def add_alert(self, alert):
+        with self.lock:
+            self._touch(alert)
+            self._alert_ids += 1
+            alert['alert_id'] = self._alert_ids
+            alert['acknowledged'] = False
+            self.alerts.appendleft(alert)
+            apply_alert_statistics(self.statistics, alert)
+
+    def merge_alert(self, update):
+        """Apply a cross-camera merge update to the alert it refers to"""
+        with self.lock:
+            for alert in self.alerts:
+                if alert.get('event_id') == update['event_id']:
+                    apply_alert_merge(alert, update)
+                    return True
+        return False
+
+    def set_activity(self, activity, tags):
+        entry = {'activity': activity, 'timestamp': datetime.now().isoformat()}
+        if tags.get('camera_id') is not None:
+            entry['camera_id'] = tags['camera_id']
+        with self.lock:
+            self._touch(tags)
+            self.current_activity = activity
+            self.activity_log.appendleft(entry)
+
+    def set_activity_duration(self, data):
+        with self.lock:
+            self._touch(data)
+            self.activity_duration = {
+                'current_activity': data.get('current_activity', 'Unknown'),
+                'current_duration': data.get('current_duration', 0),
+                'last_movement': data.get('last_movement', 0),
+                'daily_stats': dict(data.get('daily_stats') or {})
+            }
+
+    def acknowledge(self, alert_id=None):
+        """Acknowledge one alert, or all open alerts when `alert_id` is None"""
+        count = 0
+        with self.lock:
+            for alert in self.alerts:
+                if not alert['acknowledged'] and (alert_id is None or alert['alert_id'] == alert_id):
+                    alert['acknowledged'] = True
+                    count += 1
+        return count
+
+    def summary(self):
+        """Compact view for the facility overview"""
+        with self.lock:
+            open_alerts = [
+                {'alert_id': a['alert_id'], 'type': a['type'], 'priority': a.get('priority'),
+                 'message': a.get('message'), 'received_at': a['received_at']}
+                for a in self.alerts
+                if not a['acknowledged'] and a.get('priority') in OPEN_ALERT_PRIORITIES
+            ]
+            return {
+                'resident_id': self.resident_id,
+                'node_id': self.node_id,
+                'room': self.room,
+                'current_activity': self.current_activity,
+                'current_duration': self.activity_duration.get('current_duration', 0),
+                'open_alerts': open_alerts,
+                'last_seen': self.last_seen
+            }
+
+    def snapshot(self):
+        """Full state for the per-resident drill-down"""
+        with self.lock:
+            return {
+                'resident_id': self.resident_id,
+                'node_id': self.node_id,
+                'room': self.room,
+                'last_seen': self.last_seen,
+                'current_activity': self.current_activity,
+                'alerts': [dict(a) for a in self.alerts],
+                'activity_log': list(self.activity_log),
+                'statistics': dict(self.statistics),
+                'activity_duration': dict(self.activity_duration)
+            }
+
+    def reset_daily(self):
+        with self.lock:
+            self.statistics.update(falls_today=0, help_requests_today=0, total_gestures_today=0)
+
+
+class ResidentRegistry:
+    """
+    Shards keyed by resident id.
+
+    The registry lock is only taken to create a shard; updates for different
+    residents never contend with each other.
+    """
+
+    def __init__(self):
+        self._shards = {}
+        self._lock = threading.Lock()
+
+    def shard(self, resident_id):
+        shard = self._shards.get(resident_id)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.get(resident_id)
+                if shard is None:
+                    shard = self._shards[resident_id] = ResidentShard(resident_id)
+        return shard
+
+    def get(self, resident_id):
+        return self._shards.get(resident_id)
+
+    def overview(self, room=None):
+        shards = list(self._shards.values())
+        summaries = [shard.summary() for shard in shards]
+        if room is not None:
+            summaries = [s for s in summaries if s['room'] == room]
+        # Residents with open critical alerts first
+        summaries.sort(key=lambda s: (not any(a['priority'] == 'critical' for a in s['open_alerts']),
+                                      str(s['room']), str(s['resident_id'])))
+        return summaries
+
+    def reset_daily(self):
+        for shard in list(self._shards.values()):
+            shard.reset_daily()
+
+    def __len__(self):
+        return len(self._shards)
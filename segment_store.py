@@ -0,0 +1,211 @@
+"""
+Activity Segment Store for Assistive HAR System
+Compact columnar history of activity segments with logarithmic range
+queries; finished days are spilled to disk so memory stays flat
+"""
+
+import os
+import struct
+import bisect
+from array import array
+from datetime import datetime, timedelta
+
+ACTIVITIES = ('Sitting', 'Standing', 'Walking', 'Unknown')
+
+# On-disk record: start, end, activity code
+RECORD = struct.Struct('<ddB')
+
+SPILL_ROOT = 'activity_segments'
+
+# Append-only list of activity names in a spill directory; a code is a line number
+CODE_TABLE = 'activities'
+
+
+def spill_dir_for(owner, root=None):
+    """Spill directory of one camera's or resident's segment history (under SPILL_ROOT by default)"""
+    return os.path.join(root or SPILL_ROOT, str(owner or 'default'))
+
+
+def read_code_table(spill_dir):
+    """Activity names by code for the segments spilled to `spill_dir`"""
+    if not spill_dir:
+        return []
+    try:
+        with open(os.path.join(spill_dir, CODE_TABLE), 'r') as f:
+            return [line for line in f.read().split('\n') if line]
+    except OSError:
+        return []
+
+
+class Segment:
+    """Read-only view of one stored segment"""
+
+    __slots__ = ('start', 'end', 'activity')
+
+    def __init__(self, start, end, activity):
+        self.start = start
+        self.end = end
+        self.activity = activity
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"Segment({self.activity!r}, {self.start:.1f}-{self.end:.1f})"
+
+
+class _Column:
+    """Per-activity columns: starts, ends and running total of durations"""
+
+    __slots__ = ('starts', 'ends', 'cumulative', 'longest')
+
+    def __init__(self):
+        self.starts = array('d')
+        self.ends = array('d')
+        self.cumulative = array('d', [0.0])
+        self.longest = 0.0
+
+    def append(self, start, end):
+        self.starts.append(start)
+        self.ends.append(end)
+        self.cumulative.append(self.cumulative[-1] + (end - start))
+        self.longest = max(self.longest, end - start)
+
+
+class SegmentStore:
+    """
+    Segments are appended in time order into `array` columns (8 + 8 + 1 bytes
+    each instead of a dict per segment). Each activity also keeps its own
+    start/end columns and a prefix sum of durations, so "time in X between t1
+    and t2" is two binary searches.
+
+    Memory holds only the current day: when the first segment of a new day
+    arrives, earlier segments are written to `spill_dir/segments_<date>.bin`
+    and dropped. `load_day` reads a spilled day back as its own store. Each
+    spill directory belongs to one store (one camera or resident) and keeps
+    an append-only code table, so codes written on any day keep their names.
+    `spill_dir=None` uses the 'default' directory under SPILL_ROOT; with
+    `spill_dir=False` finished days are simply dropped.
+    """
+
+    def __init__(self, activities=ACTIVITIES, spill_dir=None):
+        self.spill_dir = spill_dir_for(None) if spill_dir is None else spill_dir
+        # Codes already on disk keep their positions; new names go after them
+        self.activities = read_code_table(spill_dir)
+        self._saved_codes = len(self.activities)
+        self.activities += [activity for activity in activities if activity not in self.activities]
+        self._reset()
+        self.day = None
+
+    def _reset(self):
+        self.starts = array('d')
+        self.ends = array('d')
+        self.codes = array('B')
+        self.columns = {activity: _Column() for activity in self.activities}
+
+    def _code(self, activity):
+        if activity not in self.columns:
+            # New activities (e.g. from site rules) get the next code
+            self.activities.append(activity)
+            self.columns[activity] = _Column()
+        return self.activities.index(activity)
+
+    def append(self, activity, start, end):
+        day = datetime.fromtimestamp(start).date()
+        if self.day is None:
+            self.day = day
+        elif day > self.day:
+            self.spill()
+            self.day = day
+        self.starts.append(start)
+        self.ends.append(end)
+        self.codes.append(self._code(activity))
+        self.columns[activity].append(start, end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        return Segment(self.starts[index], self.ends[index], self.activities[self.codes[index]])
+
+    def __iter__(self):
+        for i in range(len(self.starts)):
+            yield self[i]
+
+    def time_in(self, activity, t1, t2):
+        """Seconds spent in `activity` between t1 and t2 (in-memory segments)"""
+        column = self.columns.get(activity)
+        if column is None or not column.starts or t2 <= t1:
+            return 0.0
+        # Segments ending after t1 and starting before t2 overlap the range
+        first = bisect.bisect_right(column.ends, t1)
+        last = bisect.bisect_left(column.starts, t2)
+        if first >= last:
+            return 0.0
+        total = column.cumulative[last] - column.cumulative[first]
+        # Trim the partial overlap at both ends
+        total -= max(0.0, t1 - column.starts[first])
+        total -= max(0.0, column.ends[last - 1] - t2)
+        return total
+
+    def longest(self, activity):
+        """Longest segment of `activity` in memory (i.e. today)"""
+        column = self.columns.get(activity)
+        return column.longest if column else 0.0
+
+    def spill(self):
+        """Append in-memory segments to their day file and clear memory"""
+        if not self.starts:
+            return
+        if not self.spill_dir:
+            self._reset()
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        if len(self.activities) > self._saved_codes:
+            # Extend the code table before any record uses the new codes
+            with open(os.path.join(self.spill_dir, CODE_TABLE), 'a') as f:
+                f.write(''.join(f"{activity}\n" for activity in self.activities[self._saved_codes:]))
+            self._saved_codes = len(self.activities)
+        path = self._day_path(self.day)
+        records = b''.join(RECORD.pack(s, e, c) for s, e, c in zip(self.starts, self.ends, self.codes))
+        with open(path, 'ab') as f:
+            f.write(records)
+        self._reset()
+
+    def _day_path(self, day):
+        return os.path.join(self.spill_dir, f"segments_{day.isoformat()}.bin")
+
+    def load_day(self, day):
+        """A read-only store with one spilled day's segments (empty if none)"""
+        store = SegmentStore(self.activities, spill_dir=False)
+        if not self.spill_dir:
+            return store
+        path = self._day_path(day)
+        if not os.path.exists(path):
+            return store
+        names = read_code_table(self.spill_dir)
+        with open(path, 'rb') as f:
+            data = f.read()
+        for start, end, code in RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size]):
+            if code >= len(names):
+                continue
+            store.starts.append(start)
+            store.ends.append(end)
+            store.codes.append(store._code(names[code]))
+            store.columns[names[code]].append(start, end)
+        store.day = day
+        return store
+
+    def time_in_range(self, activity, t1, t2):
+        """Like `time_in`, but also reads spilled days that overlap the range"""
+        total = 0.0
+        # Start a day early: a segment is filed under the day it started
+        day = datetime.fromtimestamp(t1).date() - timedelta(days=1)
+        last_day = datetime.fromtimestamp(t2).date()
+        while day <= last_day:
+            total += self.load_day(day).time_in(activity, t1, t2)
+            if day == self.day:
+                total += self.time_in(activity, t1, t2)
+            day += timedelta(days=1)
+        return total
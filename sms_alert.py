@@ -7,9 +7,18 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import json
+import logging
+import threading
 import requests
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import time
+from notification_outbox import NotificationOutbox
+from structured_log import setup_logging
+
+logger = logging.getLogger(__name__)
 
 class SMSAlert:
     def __init__(self, config_file='sms_config.json'):
@@ -17,6 +26,29 @@ class SMSAlert:
         self.config = self.load_config(config_file)
         self.last_sms_time = {}
         self.sms_cooldown = 60  # Minimum 60 seconds between SMS to same number
+        self.last_delivery_report = []
+        self._cooldown_lock = threading.Lock()
+        
+        # Bounded pool shared by all batches, plus a pooled HTTP session for Twilio
+        delivery = self.config['delivery']
+        self._executor = ThreadPoolExecutor(max_workers=delivery['max_workers'],
+                                            thread_name_prefix='sms-delivery')
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=delivery['max_workers'])
+        self._http.mount('https://', adapter)
+        self._http.mount('http://', adapter)
+        
+        # Durable outbox: notifications survive restarts and transient outages
+        self.outbox = None
+        outbox_config = self.config['outbox']
+        if outbox_config['enabled']:
+            self.outbox = NotificationOutbox(
+                self._deliver_outbox_items,
+                db_path=outbox_config['db_path'],
+                max_attempts=outbox_config['max_attempts'],
+                base_delay=outbox_config['base_delay'],
+                max_delay=outbox_config['max_delay']
+            )
         
     def load_config(self, config_file):
         """Load SMS configuration"""
@@ -27,6 +59,7 @@ class SMSAlert:
             'email': {
                 'smtp_server': 'smtp.gmail.com',
                 'smtp_port': 587,
+                'use_tls': True,
                 'sender_email': '',
                 'sender_password': '',
                 'carrier_gateways': {
@@ -40,63 +73,212 @@ class SMSAlert:
                 'account_sid': '',
                 'auth_token': '',
                 'from_number': ''
+            },
+            'delivery': {
+                'max_workers': 4,      # concurrent deliveries per batch
+                'smtp_sessions': 1,    # authenticated SMTP sessions shared by a batch
+                'smtp_timeout': 10,
+                'http_timeout': 10
+            },
+            'outbox': {
+                'enabled': True,
+                'db_path': 'notification_outbox.db',
+                'max_attempts': 8,     # then dead-lettered
+                'base_delay': 2,       # seconds, doubled per attempt (jittered)
+                'max_delay': 300
             }
         }
         
         try:
             with open(config_file, 'r') as f:
                 loaded_config = json.load(f)
+                nested = {}
+                for section in ('delivery', 'outbox'):
+                    nested[section] = dict(default_config[section])
+                    nested[section].update(loaded_config.get(section, {}))
                 default_config.update(loaded_config)
+                default_config.update(nested)
         except FileNotFoundError:
             # Save default config
             with open(config_file, 'w') as f:
                 json.dump(default_config, f, indent=2)
-            print(f"Created default SMS config file: {config_file}")
-            print("Please configure SMS settings in sms_config.json to enable SMS alerts")
+            logger.info("Created default SMS config file: %s", config_file)
+            logger.info("Please configure SMS settings in sms_config.json to enable SMS alerts")
         
         return default_config
     
-    def send_alert(self, message, alert_type='general', priority='normal'):
-        """Send SMS alert to all emergency contacts"""
+    def send_alert(self, message, alert_type='general', priority='normal', alert_id=None):
+        """
+        Send SMS alert to all emergency contacts.
+        
+        With the outbox enabled the notifications are recorded durably and
+        delivered by the outbox sender thread, so this returns immediately.
+        `alert_id` makes repeated calls for the same alert idempotent.
+        """
         if not self.config['enabled']:
-            print("SMS alerts are disabled. Enable in sms_config.json")
+            logger.info("SMS alerts are disabled. Enable in sms_config.json")
+            return False
+        
+        contacts = [
+            contact for contact in self.config['emergency_contacts']
+            if self._check_cooldown(contact['number'])
+        ]
+        if not contacts:
             return False
         
-        success_count = 0
-        for contact in self.config['emergency_contacts']:
-            if self._check_cooldown(contact['number']):
-                if self._send_sms(contact, message, alert_type, priority):
-                    success_count += 1
+        if self.outbox:
+            alert_id = alert_id or f"{alert_type}:{int(time.time())}"
+            queued = 0
+            with self._cooldown_lock:
+                for contact in contacts:
+                    key = f"{alert_id}:{contact['number']}"
+                    if self.outbox.enqueue(key, contact, message, alert_type, priority):
+                        queued += 1
+                    # Cooldown starts once the notification is committed to the outbox
                     self.last_sms_time[contact['number']] = time.time()
+            return queued > 0
+        
+        report = self._deliver_batch(contacts, message, alert_type)
+        with self._cooldown_lock:
+            for entry in report:
+                if entry['success']:
+                    self.last_sms_time[entry['number']] = time.time()
+        
+        self.last_delivery_report = report
+        delivered = [entry for entry in report if entry['success']]
+        if report:
+            slowest = max(entry['latency_ms'] for entry in report)
+            logger.info("SMS batch: %d/%d delivered, slowest %.0f ms", len(delivered), len(report), slowest)
+        return len(delivered) > 0
+    
+    def _deliver_outbox_items(self, items):
+        """Outbox sender callback: deliver due items, grouped into batches per message"""
+        groups = {}
+        for item in items:
+            groups.setdefault((item['message'], item['alert_type']), []).append(item)
+        
+        results = {}
+        for (message, alert_type), group in groups.items():
+            contacts = [dict(item['contact'], idempotency_key=item['key'],
+                             in_doubt=item['in_doubt'], queued_at=item['created'])
+                        for item in group]
+            report = self._deliver_batch(contacts, message, alert_type)
+            delivered = {entry['number'] for entry in report if entry['success']}
+            for item in group:
+                results[item['key']] = item['contact']['number'] in delivered
+        return results
+    
+    def _deliver_batch(self, contacts, message, alert_type):
+        """
+        Deliver one message to all contacts concurrently.
+        Returns a per-recipient report with latency from the start of the batch.
+        """
+        provider = self.config['provider']
+        started = time.time()
+        
+        if provider == 'email':
+            # Split contacts over a few authenticated sessions instead of
+            # paying a TLS handshake and login per recipient
+            sessions = max(1, min(self.config['delivery']['smtp_sessions'], len(contacts)))
+            chunks = [contacts[i::sessions] for i in range(sessions)]
+            futures = [
+                self._executor.submit(self._send_email_batch, chunk, message, alert_type, started)
+                for chunk in chunks
+            ]
+        elif provider == 'twilio':
+            futures = [
+                self._executor.submit(self._send_twilio_timed, contact, message, started)
+                for contact in contacts
+            ]
+        else:
+            logger.error("Unknown SMS provider: %s", provider)
+            return []
+        
+        report = []
+        for future in futures:
+            try:
+                result = future.result()
+                report.extend(result if isinstance(result, list) else [result])
+            except Exception as e:
+                logger.error("SMS send error: %s", e)
+        return report
+    
+    def _send_email_batch(self, contacts, message, alert_type, started):
+        """Send to several contacts over one authenticated SMTP session"""
+        email_config = self.config['email']
+        if not email_config['sender_email'] or not email_config['sender_password']:
+            logger.warning("Email credentials not configured for SMS alerts")
+            return [_report_entry(contact, False, 0, 'not configured') for contact in contacts]
+        
+        report = []
+        try:
+            server = self._open_smtp()
+        except Exception as e:
+            logger.error("Email-to-SMS error: %s", e)
+            latency = (time.time() - started) * 1000
+            return [_report_entry(contact, False, latency, e) for contact in contacts]
         
-        return success_count > 0
+        try:
+            for contact in contacts:
+                success = self._send_via_email(contact, message, alert_type, server=server)
+                if success:
+                    self._record_receipt(contact)
+                report.append(_report_entry(contact, success, (time.time() - started) * 1000))
+        finally:
+            try:
+                server.quit()
+            except Exception:
+                pass
+        return report
+    
+    def _send_twilio_timed(self, contact, message, started):
+        # The Messages API doesn't deduplicate, so before resending an outbox
+        # entry whose last attempt may have reached Twilio, look for it there
+        if contact.get('in_doubt'):
+            sent = self._find_twilio_message(contact, message, contact.get('queued_at', 0))
+            if sent:
+                logger.info("SMS to %s already accepted by Twilio (%s), not resending",
+                            contact['name'], sent[0])
+                self._record_receipt(contact, *sent)
+                return _report_entry(contact, True, (time.time() - started) * 1000)
+        success = self._send_via_twilio(contact, message)
+        return _report_entry(contact, success, (time.time() - started) * 1000)
+    
+    def _record_receipt(self, contact, provider_ref=None, provider_status='accepted'):
+        """Note provider acceptance of an outbox entry before the batch completes"""
+        if self.outbox and contact.get('idempotency_key'):
+            try:
+                self.outbox.record_receipt(contact['idempotency_key'], provider_ref, provider_status)
+            except Exception as e:
+                logger.error("Outbox receipt error: %s", e)
     
     def _check_cooldown(self, number):
         """Check if enough time has passed since last SMS to this number"""
-        if number not in self.last_sms_time:
-            return True
-        return (time.time() - self.last_sms_time[number]) > self.sms_cooldown
+        with self._cooldown_lock:
+            if number not in self.last_sms_time:
+                return True
+            return (time.time() - self.last_sms_time[number]) > self.sms_cooldown
     
-    def _send_sms(self, contact, message, alert_type, priority):
-        """Send SMS using configured provider"""
+    def _open_smtp(self):
+        """Open an authenticated SMTP session"""
+        email_config = self.config['email']
+        server = smtplib.SMTP(email_config['smtp_server'], email_config['smtp_port'],
+                              timeout=self.config['delivery']['smtp_timeout'])
         try:
-            if self.config['provider'] == 'email':
-                return self._send_via_email(contact, message, alert_type)
-            elif self.config['provider'] == 'twilio':
-                return self._send_via_twilio(contact, message)
-            else:
-                print(f"Unknown SMS provider: {self.config['provider']}")
-                return False
-        except Exception as e:
-            print(f"SMS send error: {e}")
-            return False
+            if email_config.get('use_tls', True):
+                server.starttls()
+            server.login(email_config['sender_email'], email_config['sender_password'])
+        except Exception:
+            server.close()
+            raise
+        return server
     
-    def _send_via_email(self, contact, message, alert_type):
-        """Send SMS via email-to-SMS gateway"""
+    def _send_via_email(self, contact, message, alert_type, server=None):
+        """Send SMS via email-to-SMS gateway, reusing `server` if given"""
         email_config = self.config['email']
         
         if not email_config['sender_email'] or not email_config['sender_password']:
-            print("Email credentials not configured for SMS alerts")
+            logger.warning("Email credentials not configured for SMS alerts")
             return False
         
         # Construct recipient email based on carrier
@@ -120,18 +302,55 @@ class SMSAlert:
         
         try:
             # Send email
-            with smtplib.SMTP(email_config['smtp_server'], email_config['smtp_port']) as server:
-                server.starttls()
-                server.login(email_config['sender_email'], email_config['sender_password'])
+            if server is not None:
                 server.send_message(msg)
+            else:
+                server = self._open_smtp()
+                try:
+                    server.send_message(msg)
+                finally:
+                    server.quit()
             
-            print(f"SMS sent to {contact['name']} ({contact['number']})")
+            logger.info("SMS sent to %s (%s)", contact['name'], contact['number'])
             return True
             
         except Exception as e:
-            print(f"Email-to-SMS error: {e}")
+            logger.error("Email-to-SMS error: %s", e)
             return False
     
+    def _twilio_body(self, message):
+        return f"HAR Alert: {message[:160]}"  # SMS limit
+    
+    def _find_twilio_message(self, contact, message, since):
+        """
+        Look up a message with this body sent to the contact since `since`
+        (unix time). Returns (sid, status), or None if there is none or the
+        lookup fails - in which case sending again is the safer mistake.
+        """
+        twilio_config = self.config['twilio']
+        url = f"https://api.twilio.com/2010-04-01/Accounts/{twilio_config['account_sid']}/Messages.json"
+        params = {
+            'To': contact['number'],
+            'From': twilio_config['from_number'],
+            'DateSent>': datetime.fromtimestamp(since - 86400, timezone.utc).strftime('%Y-%m-%d'),
+            'PageSize': 50
+        }
+        try:
+            response = self._http.get(url, auth=(twilio_config['account_sid'], twilio_config['auth_token']),
+                                      params=params, timeout=self.config['delivery']['http_timeout'])
+            if response.status_code != 200:
+                logger.warning("Twilio lookup error: %s", response.text)
+                return None
+            for sent in response.json().get('messages', []):
+                created = sent.get('date_created')
+                if (sent.get('body') == self._twilio_body(message)
+                        and sent.get('status') not in ('failed', 'undelivered', 'canceled')
+                        and created and parsedate_to_datetime(created).timestamp() >= since - 1):
+                    return sent.get('sid'), sent.get('status')
+        except Exception as e:
+            logger.warning("Twilio lookup error: %s", e)
+        return None
+    
     def _send_via_twilio(self, contact, message):
         """Send SMS via Twilio API"""
         twilio_config = self.config['twilio']
@@ -139,7 +358,7 @@ class SMSAlert:
         if not all([twilio_config['account_sid'], 
                    twilio_config['auth_token'], 
                    twilio_config['from_number']]):
-            print("Twilio credentials not configured")
+            logger.warning("Twilio credentials not configured")
             return False
         
         try:
@@ -151,21 +370,27 @@ class SMSAlert:
             data = {
                 'From': twilio_config['from_number'],
                 'To': contact['number'],
-                'Body': f"HAR Alert: {message[:160]}"  # SMS limit
+                'Body': self._twilio_body(message)
             }
             
-            # Send request
-            response = requests.post(url, auth=auth, data=data)
+            # Send request over the pooled session
+            response = self._http.post(url, auth=auth, data=data,
+                                       timeout=self.config['delivery']['http_timeout'])
             
             if response.status_code == 201:
-                print(f"SMS sent via Twilio to {contact['name']}")
+                logger.info("SMS sent via Twilio to %s", contact['name'])
+                try:
+                    sent = response.json()
+                    self._record_receipt(contact, sent.get('sid'), sent.get('status') or 'accepted')
+                except ValueError:
+                    self._record_receipt(contact)
                 return True
             else:
-                print(f"Twilio error: {response.text}")
+                logger.error("Twilio error: %s", response.text)
                 return False
                 
         except Exception as e:
-            print(f"Twilio SMS error: {e}")
+            logger.error("Twilio SMS error: %s", e)
             return False
     
     def add_contact(self, name, number, carrier='att'):
@@ -178,7 +403,7 @@ class SMSAlert:
         }
         self.config['emergency_contacts'].append(contact)
         self.save_config()
-        print(f"Added emergency contact: {name}")
+        logger.info("Added emergency contact: %s", name)
     
     def remove_contact(self, number):
         """Remove emergency contact"""
@@ -187,7 +412,7 @@ class SMSAlert:
             if c['number'] != number
         ]
         self.save_config()
-        print(f"Removed contact with number: {number}")
+        logger.info("Removed contact with number: %s", number)
     
     def save_config(self):
         """Save configuration to file"""
@@ -203,28 +428,37 @@ class SMSAlert:
         )
 
 
+def _report_entry(contact, success, latency_ms, error=None):
+    return {
+        'name': contact.get('name'),
+        'number': contact['number'],
+        'success': success,
+        'latency_ms': round(latency_ms, 1),
+        'error': str(error) if error else None
+    }
+
+
 # Integration with main alert system
 def integrate_sms_with_alerts(alert_manager, sms_alert):
-    """Add SMS capability to existing alert manager"""
-    original_handle = alert_manager._handle_alert
-    
-    def enhanced_handle(alert):
-        # Call original handler
-        original_handle(alert)
-        
-        # Send SMS for critical alerts
-        if alert.get('priority') == 'critical':
-            sms_alert.send_alert(
-                alert['message'],
-                alert_type=alert['type'],
-                priority=alert['priority']
-            )
+    """Register SMS as a delivery channel for critical alerts"""
+    def send_sms(alert):
+        sms_alert.send_alert(
+            alert['message'],
+            alert_type=alert['type'],
+            priority=alert['priority'],
+            alert_id=f"{alert['type']}:{alert.get('timestamp')}"
+        )
     
-    alert_manager._handle_alert = enhanced_handle
-    print("SMS alerts integrated with main system")
+    # SMS runs on its own worker pool so SMTP/Twilio latency never delays other channels
+    alert_manager.register_channel(
+        'sms', send_sms, workers=2, timeout=30.0,
+        accepts=lambda alert: alert.get('priority') == 'critical'
+    )
+    logger.info("SMS alerts integrated with main system")
 
 
 if __name__ == "__main__":
+    setup_logging('sms_alert')
     # Test SMS system
     sms = SMSAlert()
     
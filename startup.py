@@ -0,0 +1,107 @@
+"""
+Startup Orchestration for Assistive HAR System
+Lazy imports for heavy dependencies and a concurrent initializer that
+reports readiness and timings per component
+"""
+
+import time
+import logging
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    `cv2 = LazyModule('cv2')` at the top of a file keeps `import gesture_holistic`
+    cheap for tools that only need the tracker, and lets startup import
+    mediapipe, cv2 and friends on worker threads in parallel.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+class StartupOrchestrator:
+    """
+    Runs independent initialization steps concurrently.
+
+    `add(name, fn)` starts `fn` right away on a worker thread; `wait(names)`
+    blocks until those components are ready and returns their results, so
+    the caller can start work as soon as what it needs is there while slower
+    components finish in the background. Every component's state and time
+    to ready is in `status()`.
+    """
+
+    def __init__(self, workers=6, log=logger.info):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='startup')
+        self._futures = {}
+        self._status = {}
+        self._lock = threading.Lock()
+        self._log = log
+        self.started = time.perf_counter()
+
+    def add(self, name, fn, *args, **kwargs):
+        with self._lock:
+            self._status[name] = {'state': 'starting', 'seconds': None, 'error': None}
+        self._futures[name] = self._executor.submit(self._run, name, fn, args, kwargs)
+
+    def _run(self, name, fn, args, kwargs):
+        begin = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._finish(name, 'failed', begin, str(e))
+            raise
+        self._finish(name, 'ready', begin)
+        return result
+
+    def _finish(self, name, state, begin, error=None):
+        seconds = round(time.perf_counter() - begin, 3)
+        with self._lock:
+            self._status[name] = {'state': state, 'seconds': seconds, 'error': error}
+        if self._log:
+            detail = f": {error}" if error else ""
+            self._log(f"[startup] {name} {state} in {seconds:.2f}s{detail}")
+
+    def wait(self, *names, timeout=None):
+        """Results of the named components (re-raises a component's exception)"""
+        return [self._futures[name].result(timeout=timeout) for name in names]
+
+    def result(self, name, default=None):
+        """Result of a finished component, or `default` if it failed or isn't done"""
+        future = self._futures.get(name)
+        if future is None or not future.done() or future.exception() is not None:
+            return default
+        return future.result()
+
+    def ready(self, name):
+        with self._lock:
+            return self._status.get(name, {}).get('state') == 'ready'
+
+    def status(self):
+        with self._lock:
+            return {name: dict(info) for name, info in self._status.items()}
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -19,6 +19,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeCharts();
     startRealtimeUpdates();
     initializeAnimations();
+    initializePreview();
 });
 
 // Initialize Charts
@@ -117,7 +118,9 @@ function initializeCharts() {
 // Start real-time updates
 function startRealtimeUpdates() {
     updateDashboard();
+    loadActivityTimeseries();
     setInterval(updateDashboard, 2000); // Update every 2 seconds
+    setInterval(loadActivityTimeseries, 60000); // Chart buckets change once a minute at most
     setInterval(updateClock, 1000); // Update clock every second
 }
 
@@ -155,8 +158,8 @@ async function updateDashboard() {
         // Check for emergencies
         checkEmergency(data);
         
-        // Update chart
-        updateActivityChart(data);
+        // Update IoT device health
+        updateIoTDevices(data);
         
     } catch (error) {
         console.error('Error updating dashboard:', error);
@@ -239,6 +242,7 @@ function updateAlerts(data) {
                     <span class="alert-time">${time}</span>
                 </div>
                 <div class="alert-message">${alert.message}</div>
+                ${alert.clip_url ? `<a class="alert-clip" href="${alert.clip_url}" target="_blank"><i class="fas fa-film"></i> View clip</a>` : ''}
             `;
             
             alertList.appendChild(alertItem);
@@ -384,22 +388,122 @@ function checkEmergency(data) {
     }
 }
 
-// Update activity chart
-function updateActivityChart(data) {
-    if (!activityChart || !data.activity_duration) return;
+// Load the last 24 hours of activity from the server-side hourly rollups
+async function loadActivityTimeseries() {
+    if (!activityChart) return;
     
-    const stats = data.activity_duration.daily_stats;
-    if (!stats) return;
+    try {
+        const response = await fetch('/api/timeseries?resolution=hour');
+        const series = await response.json();
+        if (!series.buckets) return;
+        
+        activityChart.data.labels = series.buckets.map(t => new Date(t * 1000).getHours() + ':00');
+        activityChart.data.datasets[0].data = series.Sitting.map(s => Math.floor(s / 60));
+        activityChart.data.datasets[1].data = series.Standing.map(s => Math.floor(s / 60));
+        activityChart.data.datasets[2].data = series.Walking.map(s => Math.floor(s / 60));
+        
+        activityChart.update('none'); // Update without animation for smooth real-time updates
+    } catch (error) {
+        console.error('Error loading activity time series:', error);
+    }
+}
+
+// Live view: the stream is only opened while shown, so the detector
+// doesn't encode frames nobody is looking at. With several cameras one
+// stream is open at a time, picked in the camera selector
+function initializePreview() {
+    const toggle = document.getElementById('previewToggle');
+    const image = document.getElementById('previewImage');
+    const placeholder = document.getElementById('previewPlaceholder');
+    const picker = document.getElementById('previewCamera');
+    if (!toggle) return;
+    
+    toggle.addEventListener('click', async () => {
+        if (!image.hidden) {
+            image.removeAttribute('src');
+            image.hidden = true;
+            placeholder.hidden = false;
+            toggle.textContent = 'Show';
+            return;
+        }
+        try {
+            const response = await fetch('/api/preview');
+            const preview = await response.json();
+            const streams = preview.cameras || [];
+            if (streams.length === 0) {
+                placeholder.textContent = 'Live view is disabled';
+                return;
+            }
+            if (picker) {
+                const selected = picker.value;
+                picker.replaceChildren(...streams.map(stream => {
+                    const option = document.createElement('option');
+                    option.value = stream.url;
+                    option.textContent = stream.camera_id
+                        ? `${stream.camera_id}${stream.room ? ` (${stream.room})` : ''}`
+                        : 'Detector';
+                    return option;
+                }));
+                if (streams.some(stream => stream.url === selected)) picker.value = selected;
+                picker.hidden = streams.length < 2;
+            }
+            image.src = picker ? picker.value : streams[0].url;
+            image.hidden = false;
+            placeholder.hidden = true;
+            toggle.textContent = 'Hide';
+        } catch (error) {
+            console.error('Error opening live view:', error);
+        }
+    });
     
-    // Add new data point
-    const currentHour = new Date().getHours();
+    if (picker) {
+        picker.addEventListener('change', () => {
+            if (!image.hidden) image.src = picker.value;
+        });
+    }
     
-    // Update current hour data
-    activityChart.data.datasets[0].data[currentHour] = Math.floor((stats.total_sitting || 0) / 60);
-    activityChart.data.datasets[1].data[currentHour] = Math.floor((stats.total_standing || 0) / 60);
-    activityChart.data.datasets[2].data[currentHour] = Math.floor((stats.total_walking || 0) / 60);
+    image.addEventListener('error', () => {
+        image.hidden = true;
+        placeholder.hidden = false;
+        placeholder.textContent = 'Detector preview not reachable';
+        toggle.textContent = 'Show';
+    });
+}
+
+// Update IoT device health
+function updateIoTDevices(data) {
+    const deviceList = document.getElementById('iotDeviceList');
+    if (!deviceList) return;
+    
+    const devices = Object.entries(data.iot_devices || {});
+    if (devices.length === 0) {
+        deviceList.innerHTML = '<div class="alert-item normal"><div class="alert-message">No IoT devices registered</div></div>';
+        return;
+    }
     
-    activityChart.update('none'); // Update without animation for smooth real-time updates
+    deviceList.innerHTML = '';
+    devices.forEach(([deviceId, device]) => {
+        const item = document.createElement('div');
+        const level = device.status === 'online' ? 'normal' : (device.status === 'offline' ? 'critical' : 'high');
+        item.className = `alert-item ${level}`;
+        
+        const latency = device.latency_ms !== null && device.latency_ms !== undefined ? `${device.latency_ms} ms` : '--';
+        // Device ids and types come from config.json; never parse them as HTML
+        const header = document.createElement('div');
+        header.className = 'alert-header';
+        const name = document.createElement('span');
+        name.className = 'alert-type';
+        name.textContent = `${deviceId} (${device.type})`;
+        const status = document.createElement('span');
+        status.className = 'alert-time';
+        status.textContent = String(device.status).toUpperCase();
+        header.append(name, status);
+        const detail = document.createElement('div');
+        detail.className = 'alert-message';
+        detail.textContent = `Latency: ${latency} | Circuit: ${device.circuit}`;
+        item.append(header, detail);
+        deviceList.appendChild(item);
+    });
 }
 
 // Show toast notification
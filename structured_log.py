@@ -0,0 +1,202 @@
+"""
+Structured Logging for Assistive HAR System
+Leveled, lazily formatted log records with per-call-site rate limiting,
+written to the console and rotating JSON-lines files by a background thread
+so logging never blocks the camera loop
+"""
+
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+DEFAULT_LOG_CONFIG = {
+    'level': 'INFO',
+    'console': True,
+    'console_level': 'INFO',
+    'directory': 'logs',
+    'max_bytes': 5 * 1024 * 1024,
+    'backup_count': 5,
+    'rate_limit_burst': 5,
+    'rate_limit_interval': 10.0,
+    'queue_size': 10000
+}
+
+# Attributes every LogRecord has; anything else was passed with `extra=`
+# and goes into the JSON record as a field
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'suppressed'}
+
+_listener = None
+_lock = threading.Lock()
+
+
+def load_log_config(config_file='config.json'):
+    """Load the structured_log section of config.json merged over defaults"""
+    config = dict(DEFAULT_LOG_CONFIG)
+    try:
+        with open(config_file, 'r') as f:
+            config.update(json.load(f).get('structured_log', {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per call site (file and line): `burst` records at once,
+    refilled at `burst` per `interval` seconds. Records over the limit are
+    dropped before they are formatted or queued; the next record from that
+    call site to get through carries the count ("suppressed 87 similar").
+    Pass `extra={'rate_limit': False}` to always log a record.
+    """
+
+    def __init__(self, burst=5, interval=10.0):
+        super().__init__()
+        self.burst = burst
+        self.rate = burst / interval
+        self.suppressed = 0
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not getattr(record, 'rate_limit', True):
+            return True
+        key = (record.pathname, record.lineno)
+        now = record.created
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                # [tokens, last refill, suppressed since last record]
+                site = self._sites[key] = [self.burst, now, 0]
+            tokens = min(self.burst, site[0] + (now - site[1]) * self.rate)
+            site[1] = now
+            if tokens < 1:
+                site[0] = tokens
+                site[2] += 1
+                self.suppressed += 1
+                return False
+            site[0] = tokens - 1
+            suppressed, site[2] = site[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class ConsoleFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s: %(message)s', '%H:%M:%S')
+
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f"{text} (suppressed {suppressed} similar)" if suppressed else text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, thread, message and any extra fields"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != 'rate_limit' and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the writer falls behind instead of blocking"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Format the message here (only records that passed the level and rate
+        # limit get this far) but keep the traceback apart for the JSON file
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(name='har', config=None):
+    """
+    Route this process's logging through a queue to `<directory>/<name>.log`
+    (rotating, JSON lines) and the console. Safe to call more than once;
+    the first call wins. Each process should use its own `name`.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+        config = config or load_log_config()
+        level = logging.getLevelName(config['level'])
+        console_level = logging.getLevelName(config['console_level'])
+
+        handlers = []
+        if config['directory']:
+            os.makedirs(config['directory'], exist_ok=True)
+            file_handler = RotatingFileHandler(os.path.join(config['directory'], f"{name}.log"),
+                                               maxBytes=config['max_bytes'],
+                                               backupCount=config['backup_count'],
+                                               encoding='utf-8', delay=True)
+            file_handler.setLevel(level)
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        if config['console']:
+            console = logging.StreamHandler(sys.stdout)
+            console.setLevel(console_level)
+            console.setFormatter(ConsoleFormatter())
+            handlers.append(console)
+
+        handler = NonBlockingQueueHandler(queue.Queue(config['queue_size']))
+        handler.addFilter(RateLimitFilter(config['rate_limit_burst'], config['rate_limit_interval']))
+        root = logging.getLogger()
+        root.setLevel(min(level, console_level))
+        root.addHandler(handler)
+
+        _listener = QueueListener(handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, NonBlockingQueueHandler):
+                root.removeHandler(handler)
@@ -0,0 +1,52 @@
+"""
+Test script for the activity state machine
+Checks that flickering per-frame labels don't produce transitions
+"""
+
+from activity_classifier import ActivityStateMachine
+
+def feed(machine, labels, start=0.0, fps=30):
+    """Feed labels at `fps`; returns the list of (time, state) transitions"""
+    changes = []
+    for i, label in enumerate(labels):
+        now = start + i / fps
+        state, changed = machine.update(label, now)
+        if changed:
+            changes.append((round(now, 2), state))
+    return changes
+
+def test_activity_classifier():
+    """Test flicker suppression, real transitions and minimum dwell"""
+    
+    print("Test 1: First frame sets the state")
+    machine = ActivityStateMachine()
+    assert machine.update('Sitting', 0.0) == ('Sitting', True)
+    assert machine.update('Sitting', 0.1) == ('Sitting', False)
+    
+    print("Test 2: Flicker at the leg-band boundary stays Sitting")
+    machine = ActivityStateMachine()
+    changes = feed(machine, ['Sitting', 'Standing'] * 300)
+    print(f"Transitions: {changes}")
+    assert changes == [(0.0, 'Sitting')]
+    
+    print("Test 3: A sustained change is confirmed within a fraction of a second")
+    machine = ActivityStateMachine()
+    changes = feed(machine, ['Sitting'] * 90 + ['Standing'] * 60)
+    print(f"Transitions: {changes}")
+    assert [state for _, state in changes] == ['Sitting', 'Standing']
+    assert 3.0 < changes[1][0] < 3.5
+    
+    print("Test 4: Minimum dwell holds a fresh state")
+    machine = ActivityStateMachine(min_dwell=5.0)
+    changes = feed(machine, ['Sitting'] * 30 + ['Walking'] * 300)
+    assert [state for _, state in changes] == ['Sitting', 'Walking']
+    assert changes[1][0] >= 5.0
+    
+    print("Test 5: Reset starts over")
+    machine.reset()
+    assert machine.update('Standing', 20.0) == ('Standing', True)
+    
+    print("\nActivity classifier tests complete!")
+
+if __name__ == "__main__":
+    test_activity_classifier()
@@ -0,0 +1,94 @@
+"""
+Test script for the activity time-series rollups
+Checks bucket splitting, range queries and persistence on a simulated clock
+"""
+
+import os
+import tempfile
+from activity_rollups import ActivityRollups
+
+def test_activity_rollups():
+    """Test minute/hour accounting, gaps, banners and reloading from disk"""
+    
+    print("Test 1: Intervals are split across minute and hour buckets")
+    rollups = ActivityRollups()
+    rollups.record('Sitting', 3570)
+    rollups.record('Sitting', 3590)
+    rollups.record('Standing', 3610)   # 3570-3610 was sitting
+    rollups.record('Walking', 3630)    # 3610-3630 standing
+    minutes = rollups.query(3540, 3660, 'minute')
+    print(f"Minute sitting: {minutes['Sitting']}, standing: {minutes['Standing']}")
+    assert minutes['buckets'] == [3540, 3600]
+    assert minutes['Sitting'] == [30.0, 10.0]
+    assert minutes['Standing'] == [0.0, 20.0]
+    hours = rollups.query(0, 7200, 'hour')
+    assert hours['Sitting'] == [30.0, 10.0]
+    
+    print("Test 2: Long silences are capped at max_gap")
+    rollups.record('Walking', 4630)    # detector was gone for 1000 s
+    assert rollups.query(3600, 7200)['Walking'] == [30.0]
+    
+    print("Test 3: Banners keep the running activity; Unknown ends it")
+    rollups = ActivityRollups()
+    rollups.record('Sitting', 0)
+    rollups.record('Wave Gesture (Left)', 10)
+    rollups.record('Sitting', 20)
+    rollups.record('Unknown', 25)
+    rollups.record('Sitting', 40)
+    assert rollups.query(0, 60, 'minute')['Sitting'] == [25.0]
+    
+    print("Test 4: Residents get their own series")
+    rollups.record('Walking', 0, series='resident_1')
+    rollups.record('Walking', 10, series='resident_1')
+    assert rollups.query(0, 60, 'minute', series='resident_1')['Walking'] == [10.0]
+    assert rollups.query(0, 60, 'minute')['Walking'] == [0.0]
+    
+    print("Test 5: Another camera losing sight of the person doesn't end the running activity")
+    rollups = ActivityRollups()
+    rollups.record('Sitting', 0, camera_id='cam1')
+    for t in range(2, 60, 2):
+        rollups.record('Unknown', t, camera_id='cam2')
+        rollups.record('Sitting', t + 1, camera_id='cam1')
+    rollups.record('Unknown', 60, camera_id='cam1')
+    assert rollups.query(0, 60, 'minute')['Sitting'] == [60.0]
+    rollups.record('Walking', 70, camera_id='cam2')
+    rollups.record('Unknown', 75, camera_id='cam1')
+    rollups.record('Unknown', 80, camera_id='cam2')
+    assert rollups.query(60, 120, 'minute')['Walking'] == [10.0]
+    
+    print("Test 6: A camera outage ends the running activity without crediting the silence")
+    rollups = ActivityRollups()
+    rollups.record('Sitting', 0, camera_id='cam1')
+    rollups.record('Sitting', 10, camera_id='cam1')
+    rollups.record('MONITORING DOWN', 25, camera_id='cam1')
+    rollups.record('Monitoring...', 50, camera_id='cam1')
+    rollups.record('Standing', 55, camera_id='cam1')
+    rollups.record('Unknown', 60, camera_id='cam1')
+    minute = rollups.query(0, 60, 'minute')
+    assert minute['Sitting'] == [10.0] and minute['Standing'] == [5.0]
+    
+    print("Test 7: Rollups survive a restart and drop expired buckets")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'rollups.db')
+        import time
+        now = time.time()
+        rollups = ActivityRollups({'flush_interval': 3600})
+        rollups.attach(path)
+        rollups.record('Sitting', now - 8 * 86400)
+        rollups.record('Unknown', now - 8 * 86400 + 20)
+        rollups.record('Standing', now - 100)
+        rollups.record('Standing', now - 80)
+        rollups.stop()
+        
+        reloaded = ActivityRollups()
+        reloaded.attach(path)
+        assert sum(reloaded.query(now - 3600, now, 'minute')['Standing']) == 20.0
+        # Minute data is gone after a week, hourly data is kept
+        assert sum(reloaded.query(now - 9 * 86400, now - 7 * 86400, 'minute')['Sitting']) == 0.0
+        assert sum(reloaded.query(now - 9 * 86400, now - 7 * 86400, 'hour')['Sitting']) == 20.0
+        reloaded.stop()
+    
+    print("\nActivity rollup tests complete!")
+
+if __name__ == "__main__":
+    test_activity_rollups()
@@ -0,0 +1,85 @@
+"""
+Test script for the alert channel dispatcher
+Checks channel isolation, max_pending drops and abandonment of hung handlers
+"""
+
+import time
+import threading
+from alert_channels import AlertDispatcher
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_alert_channels():
+    """Test that channels don't block each other and hung handlers are abandoned"""
+    dispatcher = AlertDispatcher()
+    release = threading.Event()
+    fast = []
+
+    dispatcher.register('slow', lambda alert: release.wait(), timeout=30.0, max_pending=2)
+    dispatcher.register('fast', lambda alert: fast.append(alert['type']), timeout=1.0)
+    try:
+        print("Test 1: A blocked channel doesn't delay the others")
+        for i in range(3):
+            dispatcher.dispatch({'type': f'fall{i}'})
+        assert wait_for(lambda: len(fast) == 3)
+        assert fast == ['fall0', 'fall1', 'fall2']
+
+        print("Test 2: Deliveries beyond max_pending are dropped and counted")
+        # One running plus two queued fill the slow channel; the fourth is dropped
+        dispatcher.dispatch({'type': 'fall3'})
+        assert wait_for(lambda: dispatcher.get_stats()['fast']['delivered'] == 4)
+        stats = dispatcher.get_stats()
+        print(f"Stats: {stats}")
+        assert stats['slow']['dropped'] == 1
+        assert stats['fast']['dropped'] == 0 and stats['fast']['delivered'] == 4
+        release.set()
+        assert wait_for(lambda: dispatcher.get_stats()['slow']['delivered'] == 3)
+
+        print("Test 3: Only the named channels get a restricted dispatch")
+        dispatcher.dispatch({'type': 'update'}, only=('slow',))
+        assert wait_for(lambda: dispatcher.get_stats()['slow']['delivered'] == 4)
+        assert fast == ['fall0', 'fall1', 'fall2', 'fall3']
+    finally:
+        release.set()
+        dispatcher.shutdown()
+
+    print("Test 4: A hung handler is abandoned at its deadline and the channel keeps delivering")
+    dispatcher = AlertDispatcher()
+    hang = threading.Event()
+    delivered = []
+
+    def handler(alert):
+        if alert['type'] == 'hang':
+            hang.wait()
+        delivered.append(alert['type'])
+
+    dispatcher.register('iot', handler, timeout=0.2, max_pending=2)
+    try:
+        dispatcher.dispatch({'type': 'hang'})
+        dispatcher.dispatch({'type': 'fall'})
+        assert wait_for(lambda: delivered == ['fall'])
+        stats = dispatcher.get_stats()['iot']
+        print(f"Stats: {stats}")
+        assert stats['timed_out'] == 1 and stats['delivered'] == 1
+        # The abandoned slot was freed: the channel accepts a full load again
+        for i in range(3):
+            dispatcher.dispatch({'type': f'help{i}'})
+        assert wait_for(lambda: len(delivered) == 4)
+        assert dispatcher.get_stats()['iot']['dropped'] == 0
+
+        # The abandoned call finishing late is not counted twice
+        hang.set()
+        time.sleep(0.1)
+        assert dispatcher.get_stats()['iot']['delivered'] == 4
+    finally:
+        hang.set()
+        dispatcher.shutdown()
+
+    print("\nAlert channel tests complete!")
+
+if __name__ == "__main__":
+    test_alert_channels()
@@ -0,0 +1,54 @@
+"""
+Test script for the priority alert queue
+Checks priority ordering, stale expiry and blocking wake-up latency
+"""
+
+import time
+import threading
+from alert_queue import PriorityAlertQueue
+
+def test_alert_queue():
+    """Test ordering, expiry and wake-up of the alert queue"""
+    
+    print("Test 1: Priority ordering")
+    q = PriorityAlertQueue()
+    q.put({'type': 'gesture', 'message': 'Thumbs up detected', 'priority': 'normal'})
+    q.put({'type': 'gesture', 'message': 'Stop gesture detected', 'priority': 'high'})
+    q.put({'type': 'fall', 'message': 'Fall detected!', 'priority': 'critical'})
+    q.put({'type': 'gesture', 'message': 'Wave gesture detected', 'priority': 'normal'})
+    order = [q.get(timeout=0)['message'] for _ in range(4)]
+    print(f"Dispatch order: {order}")
+    assert order == ['Fall detected!', 'Stop gesture detected',
+                     'Thumbs up detected', 'Wave gesture detected']
+    
+    print("Test 2: Stale low-priority alerts expire")
+    q = PriorityAlertQueue(max_age={'normal': 0.05})
+    q.put({'type': 'gesture', 'message': 'Wave gesture detected', 'priority': 'normal'})
+    q.put({'type': 'fall', 'message': 'Fall detected!', 'priority': 'critical'})
+    time.sleep(0.1)
+    assert q.get(timeout=0)['type'] == 'fall'
+    assert q.get(timeout=0) is None
+    assert q.expired_count == 1
+    
+    print("Test 3: Blocking get wakes immediately on put")
+    q = PriorityAlertQueue()
+    received = []
+    def consumer():
+        alert = q.get(timeout=2)
+        received.append(time.time() - alert['sent'])
+    thread = threading.Thread(target=consumer)
+    thread.start()
+    time.sleep(0.1)
+    q.put({'type': 'help', 'priority': 'critical', 'sent': time.time()})
+    thread.join()
+    print(f"Wake-up latency: {received[0] * 1000:.2f} ms")
+    assert received[0] < 0.05
+    
+    print("Test 4: Close releases waiting consumers")
+    q.close()
+    assert q.get() is None
+    
+    print("\nAlert queue tests complete!")
+
+if __name__ == "__main__":
+    test_alert_queue()
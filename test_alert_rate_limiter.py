@@ -0,0 +1,47 @@
+"""
+Test script for the alert rate limiter
+Checks per-key token buckets and suppressed-burst summaries
+"""
+
+from alert_rate_limiter import AlertRateLimiter
+
+def test_alert_rate_limiter():
+    """Test keying, suppression counters and burst aggregation"""
+    
+    limiter = AlertRateLimiter(aggregation_window=30)
+    stop_left = {'type': 'gesture', 'source': 'left_hand', 'priority': 'high',
+                 'message': 'Stop gesture detected'}
+    stop_right = dict(stop_left, source='right_hand')
+    health = {'type': 'gesture', 'source': None, 'priority': 'normal',
+              'message': 'Thumbs up detected'}
+    
+    print("Test 1: Independent buckets per (type, source, priority)")
+    assert limiter.allow(stop_left, cooldown=5, now=100.0)
+    assert limiter.allow(stop_right, cooldown=5, now=100.0)
+    assert limiter.allow(health, cooldown=5, now=100.0)
+    
+    print("Test 2: Flapping detector is suppressed at enqueue time")
+    for i in range(1, 30):
+        assert not limiter.allow(stop_left, cooldown=5, now=100.0 + i * 0.1)
+    assert limiter.allow(stop_left, cooldown=5, now=105.1)
+    stats = limiter.get_stats()
+    print(f"Stats: {stats}")
+    assert stats['suppressed'] == 29
+    assert stats['suppressed_by_type']['gesture'] == 29
+    
+    print("Test 3: Burst is summarized once the window closes")
+    assert limiter.collect_summaries(now=110.0) == []
+    summaries = limiter.collect_summaries(now=130.2)
+    print(f"Summary: {summaries[0]['message']}")
+    assert len(summaries) == 1
+    assert summaries[0]['suppressed_count'] == 29
+    assert summaries[0]['type'] == 'alert_summary'
+    assert limiter.next_deadline() is None
+    
+    print("Test 4: No cooldown admits everything")
+    assert all(limiter.allow(health, cooldown=0, now=200.0) for _ in range(5))
+    
+    print("\nRate limiter tests complete!")
+
+if __name__ == "__main__":
+    test_alert_rate_limiter()
@@ -0,0 +1,134 @@
+"""
+Test script for the multi-camera supervisor
+Checks that incident clips are only requested for admitted alerts and are named per camera
+"""
+
+import time
+import queue
+import threading
+from camera_supervisor import CameraAlertSink, CameraSupervisor, DEFAULT_SUPERVISOR_CONFIG
+from incident_clips import DEFAULT_CLIP_CONFIG
+
+class FakeAlertManager:
+    """Admits the first alert per (type, camera) like a rate limiter would"""
+
+    def __init__(self):
+        self.alerts = []
+        self.seen = set()
+
+    def trigger_alert(self, alert_type, message, camera_id=None, clip=None, **kwargs):
+        if (alert_type, camera_id) in self.seen:
+            return False
+        self.seen.add((alert_type, camera_id))
+        self.alerts.append({'type': alert_type, 'camera_id': camera_id, 'clip': clip})
+        return True
+
+    def send_activity_summary(self, summary):
+        # The dashboard hands a pending profiling request to the first summary
+        return {'frames': None, 'seconds': 5.0} if summary['camera_id'] == 'cam2' else None
+
+    def send_profile_summary(self, summary):
+        self.profile_summary = summary
+        return True
+
+class FakeRecorder:
+    def __init__(self):
+        self.captured = []
+
+    def capture(self, alert_type, now=None, name=None):
+        self.captured.append((alert_type, name))
+        return name
+
+def fall(camera_id):
+    return {'alert_type': 'fall', 'message': 'Fall detected!', 'priority': 'critical', 'camera_id': camera_id}
+
+def drain(q):
+    items = []
+    while True:
+        try:
+            items.append(q.get(timeout=0.2))
+        except queue.Empty:
+            return items
+
+def test_camera_supervisor():
+    """Test clip requests from CameraSupervisor.admit_alert"""
+    cameras = [{'id': 'cam1', 'room': 'living_room'}, {'id': 'cam2', 'room': 'living_room'}]
+    manager = FakeAlertManager()
+    supervisor = CameraSupervisor(cameras, dict(DEFAULT_SUPERVISOR_CONFIG), manager, dict(DEFAULT_CLIP_CONFIG))
+    supervisor.clip_cameras.update(['cam1', 'cam2'])
+    now = time.time()
+
+    print("Test 1: Two cameras recording the same second get different clip files")
+    assert supervisor.admit_alert(fall('cam1'), now)
+    assert supervisor.admit_alert(fall('cam2'), now)
+    clips = [alert['clip'] for alert in manager.alerts]
+    print(f"Clips: {clips}")
+    assert clips[0] != clips[1] and 'cam1' in clips[0] and 'cam2' in clips[1]
+    request = drain(supervisor.commands['cam1'])
+    assert request == [('clip', ('fall', clips[0], now))]
+
+    print("Test 2: A suppressed alert records no clip")
+    assert not supervisor.admit_alert(fall('cam1'), now + 10)
+    assert drain(supervisor.commands['cam1']) == []
+
+    print("Test 3: Alerts in a clip's post window share it; other types and cameras without clips don't record")
+    help_alert = dict(fall('cam2'), alert_type='help', message='Help!')
+    assert supervisor.admit_alert(help_alert, now + 1)
+    assert manager.alerts[-1]['clip'] == clips[1]
+    assert drain(supervisor.commands['cam2']) == [('clip', ('fall', clips[1], now))]
+    supervisor.clip_cameras.discard('cam1')
+    assert supervisor.admit_alert(dict(fall('cam1'), alert_type='help'), now + 20)
+    assert manager.alerts[-1]['clip'] is None
+    assert supervisor.admit_alert(dict(fall('cam2'), alert_type='gesture'), now + 20)
+    assert manager.alerts[-1]['clip'] is None
+
+    print("Test 4: The worker records requested clips and ignores stale ones")
+    events = queue.Queue()
+    sink = CameraAlertSink(events, 'cam1')
+    recorder = FakeRecorder()
+    sink.clip_recorder = recorder
+    assert events.get_nowait() == ('clips', {'camera_id': 'cam1'})
+    commands = queue.Queue()
+    stop = threading.Event()
+    worker = threading.Thread(target=sink.handle_commands, args=(commands, stop))
+    worker.start()
+    commands.put(('clip', ('fall', 'old.mp4', time.time() - 60)))
+    commands.put(('clip', ('fall', 'fall_cam1.mp4', time.time())))
+    deadline = time.time() + 2
+    while not recorder.captured and time.time() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    worker.join()
+    assert recorder.captured == [('fall', 'fall_cam1.mp4')]
+    sink.trigger_alert('fall', 'Fall detected!', priority='critical')
+    assert events.get_nowait()[1]['clip'] is None, "the worker no longer starts clips on its own"
+
+    print("Test 5: A profiling request claimed with a camera's summary goes back to that camera")
+    supervisor.running = True
+    pump = threading.Thread(target=supervisor._pump_events)
+    pump.start()
+    supervisor.events.put(('summary', {'camera_id': 'cam1', 'current_activity': 'Sitting'}))
+    supervisor.events.put(('summary', {'camera_id': 'cam2', 'current_activity': 'Sitting'}))
+    supervisor.events.put(('profile_summary', {'samples': 10}))
+    assert drain(supervisor.commands['cam2']) == [('profile', {'frames': None, 'seconds': 5.0})]
+    assert drain(supervisor.commands['cam1']) == []
+    supervisor.running = False
+    pump.join()
+    assert manager.profile_summary == {'samples': 10}
+    
+    commands.put(('profile', {'frames': 50, 'seconds': None}))
+    stop.clear()
+    worker = threading.Thread(target=sink.handle_commands, args=(commands, stop))
+    worker.start()
+    deadline = time.time() + 2
+    while sink._profile_request is None and time.time() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    worker.join()
+    assert sink.send_activity_summary({'current_activity': 'Sitting'}) == {'frames': 50, 'seconds': None}
+    assert sink.send_activity_summary({'current_activity': 'Sitting'}) is None, "handed over once"
+
+    print("\nCamera supervisor tests complete!")
+
+if __name__ == "__main__":
+    test_camera_supervisor()
@@ -0,0 +1,103 @@
+"""
+Test script for the capture watchdog
+Checks camera reopening, hung read recovery and the monitoring_down alert
+"""
+
+import time
+from capture_watchdog import CameraReader, CaptureWatchdog, DEFAULT_WATCHDOG_CONFIG
+
+class FakeCapture:
+    """Stands in for cv2.VideoCapture: delivers frames, fails, or hangs in read()"""
+
+    def __init__(self, mode='ok', frames=None):
+        self.mode = mode
+        self.frames = frames
+        self.count = 0
+        self.released = False
+
+    def read(self):
+        if self.mode == 'hang':
+            time.sleep(3600)
+        time.sleep(0.005)
+        if self.mode == 'fail' or (self.frames is not None and self.count >= self.frames):
+            return False, None
+        self.count += 1
+        return True, self.count
+
+    def release(self):
+        self.released = True
+
+def test_capture_watchdog():
+    """Test CameraReader and CaptureWatchdog with fake captures"""
+
+    print("Test 1: A failed read releases the capture and reopens it")
+    opened = []
+    def open_fn(source):
+        opened.append(source)
+        return FakeCapture() if len(opened) > 2 else None
+    broken = FakeCapture('fail')
+    reader = CameraReader(broken, open_fn, source=0, backoff_initial=0.05)
+    frame = None
+    deadline = time.time() + 3
+    while frame is None and time.time() < deadline:
+        frame = reader.read(0.1)
+    stats = reader.get_stats()
+    print(stats)
+    assert frame is not None and broken.released
+    assert stats['read_failures'] == 1 and stats['reopen_attempts'] == 3 and stats['reconnects'] == 1
+    reader.stop()
+
+    print("Test 2: Video files hand over every frame and end")
+    reader = CameraReader(FakeCapture(frames=20), open_fn, finite=True)
+    frames = []
+    while not reader.ended or reader._frame is not None:
+        frame = reader.read(0.5)
+        if frame is not None:
+            frames.append(frame)
+    assert frames == list(range(1, 21))
+    reader.stop()
+
+    print("Test 3: A hung read is abandoned and monitoring_down is raised once")
+    events = []
+    config = dict(DEFAULT_WATCHDOG_CONFIG, stall_timeout=0.2, down_alert_after=0.4, check_interval=60)
+    reader = CameraReader(FakeCapture('hang'), lambda source: None, backoff_initial=0.05)
+    watchdog = CaptureWatchdog(reader, config, lambda kind, seconds: events.append(('down', kind)),
+                               lambda seconds: events.append(('restored',)))
+    start = watchdog.started
+    watchdog.check(start + 0.1)
+    assert watchdog.get_stats(start + 0.1)['state'] == 'ok'
+    watchdog.check(start + 0.3)
+    assert reader.get_stats()['hung_reads'] == 1
+    assert watchdog.get_stats(start + 0.3)['state'] == 'stalled'
+    watchdog.check(start + 0.5)
+    watchdog.check(start + 0.6)
+    assert events == [('down', 'capture')]
+    stats = watchdog.get_stats(start + 0.6)
+    print(stats)
+    assert stats['state'] == 'down' and stats['stalls'] == 1
+
+    print("Test 4: Recovery closes the stall and is reported")
+    reader.open_fn = lambda source: FakeCapture()
+    deadline = time.time() + 3
+    while reader.get_stats()['reconnects'] == 0 and time.time() < deadline:
+        time.sleep(0.05)
+    reader.read(1.0)
+    watchdog.heartbeat()
+    watchdog.check()
+    assert events[-1] == ('restored',)
+    stats = watchdog.get_stats()
+    assert stats['state'] == 'ok' and stats['stalls'] == 1 and stats['availability'] < 100
+
+    print("Test 5: A detector loop that stops coming round is an inference stall")
+    watchdog.last_heartbeat = time.time() - config['inference_timeout'] - 1
+    reader.read(1.0)
+    watchdog.check()
+    assert watchdog.get_stats()['stall_kind'] == 'inference'
+    assert watchdog.inference_stalls == 1
+    watchdog.stop()
+    reader.stop()
+
+    print("\nCapture watchdog tests complete!")
+
+if __name__ == "__main__":
+    test_capture_watchdog()
@@ -0,0 +1,49 @@
+"""
+Test script for detector checkpointing
+Checks atomic coalesced writes and restoring alert cooldowns
+"""
+
+import os
+import time
+import tempfile
+from checkpoint import CheckpointWriter, load_checkpoint
+from alert_rate_limiter import AlertRateLimiter
+
+def test_checkpoint():
+    """Test the background writer and rate limiter state round trip"""
+    
+    path = os.path.join(tempfile.mkdtemp(), 'state', 'detector_state.json')
+    
+    print("Test 1: Snapshots are coalesced and written atomically")
+    writer = CheckpointWriter(path, interval=0.2)
+    for i in range(50):
+        writer.submit({'tracker': {'frames': i}})
+    time.sleep(0.5)
+    saved = load_checkpoint(path)
+    assert saved['tracker']['frames'] == 49
+    assert writer.writes <= 2, f"expected coalesced writes, got {writer.writes}"
+    assert not os.path.exists(path + '.tmp')
+    
+    print("Test 2: Stopping writes the final snapshot")
+    writer.stop({'tracker': {'frames': 'final'}})
+    assert load_checkpoint(path)['tracker']['frames'] == 'final'
+    
+    print("Test 3: Alert cooldowns survive a restart")
+    alert = {'type': 'fall', 'source': None, 'priority': 'critical'}
+    limiter = AlertRateLimiter()
+    assert limiter.allow(alert, cooldown=30, now=1000.0)
+    restored = AlertRateLimiter()
+    restored.load_state(limiter.get_state(), now=1005.0)
+    assert not restored.allow(alert, cooldown=30, now=1005.0), "cooldown should carry over"
+    assert restored.allow(alert, cooldown=30, now=1031.0)
+    
+    print("Test 4: A missing or torn checkpoint is ignored")
+    assert load_checkpoint(path + '.missing') is None
+    with open(path, 'w') as f:
+        f.write('{"tracker": ')
+    assert load_checkpoint(path) is None
+    
+    print("\nCheckpoint tests complete!")
+
+if __name__ == "__main__":
+    test_checkpoint()
@@ -0,0 +1,90 @@
+"""
+Test script for what the dashboard page shows
+Checks that resident-tagged events from supervised cameras reach the main view,
+per-node health and the live view URLs
+"""
+
+import os
+import json
+import time
+import tempfile
+import dashboard
+
+def test_tagged_events_reach_main_view():
+    """Test alerts, activity and durations tagged with a resident"""
+    tags = {'node_id': 'node-a', 'room': 'living_room', 'resident_id': 'resident_1'}
+
+    print("Test 1: A tagged alert is shown on the page and kept for the resident")
+    dashboard._ingest_alert(dict(tags, type='fall', priority='critical', message='Fall detected!',
+                                 event_id='ev1', camera_ids=['cam1']))
+    status = dashboard.app.test_client().get('/api/status').get_json()
+    assert status['alerts'][0]['event_id'] == 'ev1'
+    assert 'alert_id' not in status['alerts'][0], "resident bookkeeping stays in the shard"
+    assert dashboard.residents.get('resident_1').snapshot()['alerts'][0]['event_id'] == 'ev1'
+    dashboard._merge_alert({'event_id': 'ev1', 'resident_id': 'resident_1',
+                            'camera_ids': ['cam1', 'cam2'], 'merge': True})
+    assert dashboard.dashboard_data['alerts'][0]['camera_ids'] == ['cam1', 'cam2']
+
+    print("Test 2: Tagged activity drives the current activity and the default chart")
+    start = time.time()
+    dashboard._ingest_activity('Sitting', camera_id='cam1', tags=tags)
+    time.sleep(0.05)
+    dashboard._ingest_activity('Walking', camera_id='cam1', tags=tags)
+    assert dashboard.dashboard_data['current_activity'] == 'Walking'
+    for series in ('default', 'resident_1'):
+        sitting = dashboard.rollups.query(start - 60, start + 60, 'minute', series)['Sitting']
+        assert sum(sitting) > 0, series
+
+    print("Test 3: Tagged duration updates reach the page")
+    dashboard._ingest_activity_duration(dict(tags, camera_id='cam1', current_activity='Walking',
+                                             current_duration=42))
+    assert dashboard.dashboard_data['activity_duration']['current_duration'] == 42
+
+    print("\nDashboard view tests complete!")
+
+def test_health_per_node():
+    """Test that standalone detectors on different nodes don't overwrite each other"""
+    print("Test 4: Health is reported per node and camera")
+    capture = {'state': 'ok', 'uptime': 100, 'stalls': 0}
+    dashboard._ingest_activity_duration({'node_id': 'node-a', 'capture': capture})
+    dashboard._ingest_activity_duration({'node_id': 'node-b', 'capture': dict(capture, state='stalled')})
+    dashboard._ingest_activity_duration({'node_id': 'node-b', 'camera_id': 'cam1', 'capture': capture})
+    health = dashboard.app.test_client().get('/api/health').get_json()
+    cameras = health['cameras']
+    assert {'node-a/default', 'node-b/default', 'node-b/cam1'} <= set(cameras)
+    assert cameras['node-b/default']['state'] == 'stalled' and cameras['node-a/default']['state'] == 'ok'
+    assert cameras['node-b/cam1']['node_id'] == 'node-b' and cameras['node-b/cam1']['camera_id'] == 'cam1'
+    assert health['status'] == 'degraded'
+
+    print("\nHealth tests complete!")
+
+def test_preview_urls():
+    """Test the live view URLs handed to the browser"""
+    config_file = os.path.join(tempfile.mkdtemp(), 'config.json')
+    with open(config_file, 'w') as f:
+        json.dump({'preview': {'host': '0.0.0.0', 'port': 5011},
+                   'cameras': [{'id': 'cam1', 'room': 'kitchen', 'preview_port': 5012}]}, f)
+
+    print("Test 5: A wildcard preview host is replaced by the host the page was loaded from")
+    streams = dashboard._preview_urls(config_file, request_host='carehub.local:5000')
+    assert streams == [{'camera_id': 'cam1', 'room': 'kitchen',
+                        'url': 'http://carehub.local:5012/preview.mjpg'}]
+    streams = dashboard._preview_urls(config_file, request_host='[fe80::1]:5000')
+    assert streams[0]['url'] == 'http://[fe80::1]:5012/preview.mjpg'
+
+    print("Test 6: The standalone preview gets the same treatment; a set host is kept")
+    with open(config_file, 'w') as f:
+        json.dump({'preview': {'host': '::', 'port': 5011}}, f)
+    assert dashboard._preview_urls(config_file, request_host='192.168.1.20')[0]['url'] == \
+        'http://192.168.1.20:5011/preview.mjpg'
+    with open(config_file, 'w') as f:
+        json.dump({'preview': {'host': '10.0.0.7', 'port': 5011}}, f)
+    assert dashboard._preview_urls(config_file, request_host='192.168.1.20')[0]['url'] == \
+        'http://10.0.0.7:5011/preview.mjpg'
+
+    print("\nPreview URL tests complete!")
+
+if __name__ == "__main__":
+    test_tagged_events_reach_main_view()
+    test_health_per_node()
+    test_preview_urls()
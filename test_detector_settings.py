@@ -0,0 +1,108 @@
+"""
+Test script for detector settings
+Checks config compilation, validation and live reload
+"""
+
+import os
+import json
+import tempfile
+from types import SimpleNamespace
+from detector_settings import (DEFAULT_SETTINGS, FallSettings, SettingsError, SettingsWatcher, compile_settings,
+                               load_detector_settings, update_detector_settings)
+from gesture_holistic import ActivityTracker, apply_person_settings, detect_walking, new_ankle_history
+
+def walking_pose(frame):
+    """Pose landmarks with the ankles, knees and legs swinging like a walk"""
+    swing = 0.05 if frame % 2 else -0.05
+    landmarks = [SimpleNamespace(x=0.5, y=0.5) for _ in range(33)]
+    landmarks[23], landmarks[24] = SimpleNamespace(x=0.45, y=0.5), SimpleNamespace(x=0.55, y=0.5)
+    landmarks[25], landmarks[26] = SimpleNamespace(x=0.45 + swing, y=0.7 + swing), SimpleNamespace(x=0.55 - swing, y=0.7 - swing)
+    landmarks[27], landmarks[28] = SimpleNamespace(x=0.45 + swing, y=0.9), SimpleNamespace(x=0.55 - swing, y=0.9)
+    return SimpleNamespace(landmark=landmarks)
+
+def test_detector_settings():
+    """Test compile_settings, update_detector_settings and SettingsWatcher"""
+
+    print("Test 1: Missing section gives the defaults")
+    assert compile_settings({}) == DEFAULT_SETTINGS
+    assert DEFAULT_SETTINGS.fall.torso_angle == 70
+
+    print("Test 2: Partial overrides keep the other defaults")
+    settings = compile_settings({'fall': {'torso_angle': 60}, 'wave': {'window': 10.0}})
+    assert settings.fall.torso_angle == 60
+    assert settings.fall.shoulder_drop == DEFAULT_SETTINGS.fall.shoulder_drop
+    assert settings.wave.window == 10 and isinstance(settings.wave.window, int)
+
+    print("Test 3: Invalid sections list every problem")
+    try:
+        compile_settings({
+            'fall': {'torso': 60, 'shoulder_drop': 'high'},
+            'wave': {'window': 2.5, 'min_interval': True},
+            'help': {'wrist_above_head': -0.1},
+            'activity': {'sitting_warning': 4000},
+            'gaze': {}
+        })
+        assert False
+    except SettingsError as e:
+        print(e.problems)
+        assert len(e.problems) == 7
+        assert 'gaze is not a settings group' in e.problems
+        assert 'activity.sitting_warning must be below sitting_critical' in e.problems
+
+    print("Test 4: Older config keys still apply unless overridden")
+    with tempfile.TemporaryDirectory() as tmp:
+        config_file = os.path.join(tmp, 'config.json')
+        with open(config_file, 'w') as f:
+            json.dump({'gestures': {'wave_threshold': 0.2, 'fall_angle_threshold': 65},
+                       'alerts': {'fall_alert_cooldown': 45},
+                       'detector': {'fall': {'torso_angle': 60}}}, f)
+        settings = load_detector_settings(config_file)
+        assert settings.wave.amplitude == 0.2
+        assert settings.fall.torso_angle == 60
+        assert settings.cooldowns.fall == 45
+
+        print("Test 5: Updates are validated before config.json is written")
+        try:
+            update_detector_settings({'posture': {'sitting_leg_min': 0.5}}, config_file)
+            assert False
+        except SettingsError:
+            pass
+        settings = update_detector_settings({'fall': {'shoulder_drop': 0.08}}, config_file)
+        assert settings.fall == FallSettings(shoulder_drop=0.08, torso_angle=60)
+        with open(config_file) as f:
+            config = json.load(f)
+        assert config['detector']['fall'] == {'torso_angle': 60, 'shoulder_drop': 0.08}
+        assert config['alerts'] == {'fall_alert_cooldown': 45}
+
+        print("Test 6: The watcher swaps in valid edits and keeps settings on invalid ones")
+        watcher = SettingsWatcher(config_file, interval=60)
+        before = watcher.current()
+        assert not watcher.check()
+        update_detector_settings({'cooldowns': {'wave': 8}}, config_file)
+        assert watcher.check()
+        assert watcher.current() is not before
+        assert watcher.current().cooldowns.wave == 8
+        assert watcher.get_status()['version'] == 2
+
+        applied = watcher.current()
+        with open(config_file, 'w') as f:
+            json.dump({'detector': {'cooldowns': {'wave': 'soon'}}}, f)
+        assert not watcher.check()
+        assert watcher.current() is applied
+        assert 'cooldowns.wave must be a number' in watcher.get_status()['last_error']
+        watcher.stop()
+
+    print("Test 7: The ankle history holds walking.window frames, also after a reload")
+    history = new_ankle_history(DEFAULT_SETTINGS)
+    results = [detect_walking(walking_pose(frame), history, DEFAULT_SETTINGS.walking) for frame in range(20)]
+    assert results.index(True) == DEFAULT_SETTINGS.walking.window - 1
+    longer = compile_settings({'walking': {'window': 25}})
+    state = {'activity_tracker': ActivityTracker(settings=DEFAULT_SETTINGS, segment_dir=False), 'ankle_history': history}
+    apply_person_settings(state, longer)
+    assert state['ankle_history'].maxlen == 25 and len(state['ankle_history']) == 15
+    assert detect_walking(walking_pose(20), state['ankle_history'], longer.walking) is False
+    
+    print("\nDetector settings tests complete!")
+
+if __name__ == "__main__":
+    test_detector_settings()
@@ -0,0 +1,51 @@
+"""
+Test script for cross-camera event fusion
+Checks that simultaneous detections from several cameras become one alert
+"""
+
+from event_fusion import EventFusion
+
+def test_event_fusion():
+    """Test joining by room/type, confidence merge and window expiry"""
+    
+    merges = []
+    fusion = EventFusion(window=2.0, on_merge=merges.append)
+    fall_cam1 = {'type': 'fall', 'room': 'living_room', 'camera_id': 'cam1', 'confidence': 0.7}
+    fall_cam2 = {'type': 'fall', 'room': 'living_room', 'camera_id': 'cam2', 'confidence': 0.9}
+    fall_bedroom = {'type': 'fall', 'room': 'bedroom', 'camera_id': 'cam3', 'confidence': 0.8}
+    
+    print("Test 1: First camera is admitted immediately")
+    assert fusion.admit(fall_cam1, now=100.0)
+    assert fall_cam1['camera_ids'] == ['cam1'] and fall_cam1['event_id']
+    dispatched = dict(fall_cam1)
+    
+    print("Test 2: Second camera in the same room is a merge update, not a new alert")
+    assert not fusion.admit(fall_cam2, now=100.5)
+    assert fall_cam1 == dispatched, "an admitted alert must not change while it is being delivered"
+    assert len(merges) == 1
+    update = merges[0]
+    print(f"Merge update: {update}")
+    assert update['event_id'] == fall_cam1['event_id'] and update['alert_type'] == 'fall'
+    assert update['camera_ids'] == ['cam1', 'cam2']
+    assert update['confidence'] == 0.9 and update['duplicates'] == 1
+    
+    print("Test 3: Other rooms and single-camera alerts are independent")
+    assert fusion.admit(fall_bedroom, now=100.6)
+    assert fusion.admit({'type': 'fall', 'camera_id': None}, now=100.6)
+    
+    print("Test 4: Same camera repeating is left to the rate limiter")
+    assert fusion.admit(dict(fall_cam1), now=101.0)
+    
+    print("Test 5: A new event opens after the window closes")
+    assert fusion.admit(dict(fall_cam2), now=103.0)
+    
+    stats = fusion.get_stats()
+    print(f"Stats: {stats}")
+    assert stats['fused'] == 1
+    assert stats['duplicates_suppressed'] == 1
+    assert stats['suppressed_by_type'] == {'fall': 1}
+    
+    print("\nEvent fusion tests complete!")
+
+if __name__ == "__main__":
+    test_event_fusion()
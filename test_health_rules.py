@@ -0,0 +1,73 @@
+"""
+Test script for the health rule engine
+Checks rule groups, cooldowns and site-specific rules on a simulated clock
+"""
+
+from health_rules import HealthRuleEngine, TimerWheel
+
+class Tracker:
+    """Just the ActivityTracker fields the engine reads"""
+    def __init__(self):
+        self.current_activity = None
+        self.activity_start_time = None
+        self.last_movement_time = 0
+        self.last_warning_times = {}
+        self.daily_stats = {'warnings_issued': 0}
+        self.thresholds = {'sitting_warning': 1800, 'sitting_critical': 3600,
+                           'standing_warning': 1200, 'standing_critical': 2400,
+                           'movement_reminder': 900}
+
+class Alerts:
+    def __init__(self):
+        self.sent = []
+    def trigger_alert(self, alert_type, message, priority='normal', cooldown=5, source=None):
+        self.sent.append((source, priority, message))
+
+def run(engine, tracker, alerts, start, end):
+    for now in range(start, end):
+        engine.tick(tracker, alerts, now)
+
+def test_health_rules():
+    """Test the default sitting rules and a custom lying-in-bed rule"""
+    
+    print("Test 1: Sitting warning, then critical repeating on its cooldown")
+    tracker, alerts = Tracker(), Alerts()
+    engine = HealthRuleEngine()
+    tracker.current_activity, tracker.activity_start_time, tracker.last_movement_time = 'Sitting', 0, 0
+    engine.on_transition(tracker, 0)
+    run(engine, tracker, alerts, 0, 4300)
+    sitting = [(p, m) for s, p, m in alerts.sent if s == 'sitting_too_long']
+    print(f"Sitting alerts: {[p for p, _ in sitting]}")
+    assert [p for p, _ in sitting] == ['high', 'high', 'critical', 'critical']
+    assert '60 minutes' in sitting[2][1]
+    
+    print("Test 2: Standing up cancels the pending sitting deadline")
+    alerts.sent.clear()
+    tracker.current_activity, tracker.activity_start_time = 'Standing', 4300
+    engine.on_transition(tracker, 4300)
+    run(engine, tracker, alerts, 4300, 5400)
+    assert not [s for s, _, _ in alerts.sent if s == 'sitting_too_long']
+    
+    print("Test 3: Sites can add rules without code changes")
+    tracker, alerts = Tracker(), Alerts()
+    engine = HealthRuleEngine([{'name': 'lying_too_long', 'activity': 'Lying', 'threshold': 7200,
+                                'priority': 'high', 'cooldown': 1800,
+                                'message': 'You have been lying down for {minutes} minutes.'}])
+    tracker.current_activity, tracker.activity_start_time = 'Lying', 0
+    engine.on_transition(tracker, 0)
+    run(engine, tracker, alerts, 0, 7300)
+    assert alerts.sent == [('lying_too_long', 'high', 'You have been lying down for 120 minutes.')]
+    
+    print("Test 4: Timer wheel handles deadlines beyond one revolution")
+    wheel = TimerWheel(slots=8)
+    wheel.advance(0)
+    wheel.schedule(20, 'late')
+    wheel.schedule(3, 'soon')
+    assert wheel.advance(5) == ['soon']
+    assert wheel.advance(19) == []
+    assert wheel.advance(40) == ['late']
+    
+    print("\nHealth rule tests complete!")
+
+if __name__ == "__main__":
+    test_health_rules()
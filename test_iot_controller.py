@@ -0,0 +1,121 @@
+"""
+Test script for the IoT controller
+Checks circuit breaker transitions, probe isolation from the emergency
+fan-out, and creation from config by AlertSystem
+"""
+
+import time
+import threading
+from alert_system import AlertSystem, IoTController
+
+class FakeResponse:
+    status_code = 200
+
+class FakeSession:
+    """Stands in for the pooled HTTP session; fails or hangs on request"""
+
+    def __init__(self):
+        self.fail = False
+        self.hang_probes = threading.Event()
+        self.hang_probes.set()
+        self.posts = []
+
+    def post(self, url, json=None, timeout=None):
+        self.posts.append(url)
+        if self.fail:
+            raise ConnectionError('unreachable')
+        return FakeResponse()
+
+    def get(self, url, timeout=None):
+        self.hang_probes.wait()
+        if self.fail:
+            raise ConnectionError('unreachable')
+        return FakeResponse()
+
+def iot_config(**iot):
+    return {'iot': dict({'timeout': 0.5, 'failure_threshold': 3, 'circuit_reset': 0.2,
+                         'max_workers': 2, 'probe_interval': 60}, **iot)}
+
+def test_circuit_breaker():
+    """Test closed -> open -> half-open -> open/closed transitions"""
+    controller = IoTController(iot_config())
+    session = controller._session = FakeSession()
+    controller.register_device('alarm1', 'alarm', 'http://alarm1/api')
+    circuit = lambda: controller.get_device_status()['alarm1']['circuit']
+
+    print("Test 1: The circuit opens after failure_threshold consecutive failures")
+    session.fail = True
+    for _ in range(2):
+        assert not controller.trigger_device('alarm1', 'activate')
+    assert circuit() == 'closed'
+    assert not controller.trigger_device('alarm1', 'activate')
+    assert circuit() == 'open'
+    assert controller.get_device_status()['alarm1']['status'] == 'offline'
+
+    print("Test 2: An open circuit skips the device without a request")
+    sent = len(session.posts)
+    assert not controller.trigger_device('alarm1', 'activate')
+    assert len(session.posts) == sent
+
+    print("Test 3: After circuit_reset one trial goes through; a failure re-opens at once")
+    time.sleep(0.25)
+    assert not controller.trigger_device('alarm1', 'activate')
+    assert len(session.posts) == sent + 1
+    assert circuit() == 'open'
+    assert not controller.trigger_device('alarm1', 'activate')
+    assert len(session.posts) == sent + 1
+
+    print("Test 4: A successful trial closes the circuit")
+    time.sleep(0.25)
+    session.fail = False
+    assert controller.trigger_device('alarm1', 'activate')
+    assert circuit() == 'closed'
+    assert controller.get_device_status()['alarm1']['status'] == 'online'
+    controller.stop()
+
+    print("\nCircuit breaker tests complete!")
+
+def test_emergency_fanout():
+    """Test that hung health probes don't hold up the emergency fan-out"""
+    controller = IoTController(iot_config())
+    session = controller._session = FakeSession()
+    for i in range(4):
+        controller.register_device(f'light{i}', 'light', f'http://light{i}/api')
+
+    print("Test 5: Emergency mode runs while every probe worker is stuck")
+    session.hang_probes.clear()
+    controller.start_health_probe()
+    time.sleep(0.1)
+    started = time.time()
+    results = controller.emergency_mode()
+    assert results == {f'light{i}': True for i in range(4)}
+    assert time.time() - started < 0.4
+    session.hang_probes.set()
+    controller.stop()
+
+    print("Test 6: AlertSystem creates the controller from config when IoT is enabled")
+    config = {
+        'alerts': {'tts_enabled': False, 'sms_enabled': False, 'dashboard_enabled': False,
+                   'iot_enabled': True},
+        'logging': {'enabled': False},
+        'dashboard': {'host': '127.0.0.1', 'port': 5000},
+        'iot': iot_config(devices=[{'id': 'siren1', 'type': 'siren',
+                                    'endpoint': 'http://siren1/api'}])['iot']
+    }
+    system = AlertSystem(config)
+    try:
+        assert isinstance(system.iot, IoTController)
+        assert list(system.iot.get_device_status()) == ['siren1']
+        assert 'iot' in system.get_channel_stats()
+    finally:
+        system.stop()
+    config['alerts']['iot_enabled'] = False
+    system = AlertSystem(config)
+    assert system.iot is None
+    system.stop()
+
+    print("\nIoT fan-out tests complete!")
+
+if __name__ == "__main__":
+    test_circuit_breaker()
+    test_emergency_fanout()
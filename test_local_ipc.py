@@ -0,0 +1,77 @@
+"""
+Test script for the shared-memory detector/dashboard transport
+Checks latest-state snapshots, the event ring and detector restarts
+"""
+
+import time
+from local_ipc import LocalPublisher, LocalSubscriber, StaleSegmentError
+
+def test_local_ipc():
+    """Test state, events, ring overrun and resync after a detector restart"""
+
+    publisher = LocalPublisher('har_ipc_test', slots=4, slot_size=256, state_size=1024)
+    subscriber = LocalSubscriber('har_ipc_test')
+    try:
+        print("Test 1: Nothing to read before the detector publishes")
+        assert subscriber.poll() == (None, [])
+
+        print("Test 2: State and events arrive in order")
+        publisher.publish_state({'current_activity': 'Sitting', 'current_duration': 12})
+        publisher.publish_event('activity', 'Sitting')
+        publisher.publish_event('alert', {'type': 'fall', 'priority': 'critical'})
+        state, events = subscriber.poll()
+        assert state['current_activity'] == 'Sitting'
+        assert [e['kind'] for e in events] == ['activity', 'alert']
+        assert subscriber.poll() == (None, []), "state and events are delivered once"
+
+        print("Test 3: A lapped reader skips overwritten events and counts them")
+        for i in range(10):
+            publisher.publish_event('activity', str(i))
+        _, events = subscriber.poll()
+        assert [e['payload'] for e in events] == ['6', '7', '8', '9']
+        assert subscriber.missed_events == 6
+
+        print("Test 4: Oversized events are rejected, not truncated")
+        assert not publisher.publish_event('alert', {'message': 'x' * 1000})
+
+        print("Test 5: Reader resyncs when the detector restarts")
+        restarted = LocalPublisher('har_ipc_test', slots=4, slot_size=256, state_size=1024)
+        subscriber.poll()
+        restarted.publish_event('activity', 'Walking')
+        _, events = subscriber.poll()
+        assert [e['payload'] for e in events] == ['Walking']
+        restarted._closed.set()
+        restarted.shm.close()
+    finally:
+        subscriber.close()
+        publisher.close()
+
+    print("Test 6: A detector that unlinks and recreates the segment is noticed and re-opened")
+    publisher = LocalPublisher('har_ipc_test', slots=4, slot_size=256, state_size=1024, heartbeat_interval=0.05)
+    subscriber = LocalSubscriber('har_ipc_test', stale_after=0.3)
+    publisher.close()
+    restarted = LocalPublisher('har_ipc_test', slots=4, slot_size=256, state_size=1024, heartbeat_interval=0.05)
+    try:
+        restarted.publish_event('alert', {'type': 'fall'})
+        assert subscriber.poll() == (None, []), "the old mapping can't see the new segment"
+        time.sleep(0.5)
+        try:
+            subscriber.poll()
+            assert False, "stale heartbeat not detected"
+        except StaleSegmentError:
+            pass
+        subscriber.close()
+        subscriber = LocalSubscriber('har_ipc_test', stale_after=0.3)
+        time.sleep(0.5)
+        subscriber.poll()
+        restarted.publish_event('alert', {'type': 'help'})
+        _, events = subscriber.poll()
+        assert [e['payload']['type'] for e in events] == ['help']
+    finally:
+        subscriber.close()
+        restarted.close()
+
+    print("\nShared-memory transport tests complete!")
+
+if __name__ == "__main__":
+    test_local_ipc()
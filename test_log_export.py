@@ -0,0 +1,80 @@
+"""
+Test script for streaming log export
+Checks date seeking, type filters and the CSV/NDJSON/columnar writers
+"""
+
+import os
+import csv
+import gzip
+import json
+import tempfile
+from datetime import datetime, timedelta
+from log_export import export, iter_log_records, iter_segments
+from segment_store import SegmentStore, spill_dir_for
+
+def test_log_export():
+    """Test exports from a generated log and spilled segment files"""
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'activity_log.json')
+        base = datetime(2025, 10, 1)
+        with open(log_path, 'w') as f:
+            for i in range(5000):
+                record = {'type': 'fall' if i % 100 == 0 else 'gesture', 'message': f'event {i}',
+                          'priority': 'normal', 'timestamp': (base + timedelta(minutes=i)).isoformat()}
+                f.write(json.dumps(record) + '\n')
+        
+        print("Test 1: Date range seeks to the start and stops at the end")
+        start, end = base + timedelta(minutes=1234), base + timedelta(minutes=1300)
+        records = list(iter_log_records(log_path, start.isoformat(), end.isoformat()))
+        assert len(records) == 66
+        assert records[0]['message'] == 'event 1234' and records[-1]['message'] == 'event 1299'
+        
+        print("Test 2: Type filter")
+        falls = list(iter_log_records(log_path, types=['fall']))
+        assert len(falls) == 50
+        
+        print("Test 3: CSV and NDJSON")
+        text = b''.join(export('alerts', 'csv', types=['fall'], log_path=log_path)).decode()
+        rows = list(csv.DictReader(text.splitlines()))
+        assert len(rows) == 50 and rows[1]['message'] == 'event 100'
+        lines = b''.join(export('alerts', 'ndjson', '2025-10-02', log_path=log_path)).splitlines()
+        assert len(lines) == 5000 - 1440
+        
+        print("Test 4: Columnar row groups")
+        data = b''.join(export('alerts', 'columnar', log_path=log_path))
+        groups = [json.loads(line) for line in gzip.decompress(data).splitlines()]
+        assert sum(group['rows'] for group in groups) == 5000
+        assert groups[0]['columns']['message'][1] == 'event 1'
+        print(f"Columnar: {len(data)} bytes vs {os.path.getsize(log_path)} bytes of log")
+        
+        print("Test 5: Activity segments from spilled days")
+        spill_dir = os.path.join(tmp, 'segments')
+        store = SegmentStore(spill_dir=spill_dir_for('cam1', spill_dir))
+        t0 = base.timestamp()
+        store.append('Sitting', t0, t0 + 600)
+        store.append('Walking', t0 + 600, t0 + 660)
+        store.append('Standing', t0 + 86400, t0 + 86500)
+        store.spill()
+        other = SegmentStore(activities=('Lying', 'Sitting'), spill_dir=spill_dir_for('cam2', spill_dir))
+        other.append('Lying', t0, t0 + 30)
+        other.spill()
+        segments = list(iter_segments(spill_dir))
+        assert [(s['series'], s['activity']) for s in segments] == [
+            ('cam1', 'Sitting'), ('cam1', 'Walking'), ('cam1', 'Standing'), ('cam2', 'Lying')]
+        assert list(iter_segments(spill_dir, start='2025-10-02'))[0]['duration'] == 100
+        walking = b''.join(export('activity', 'csv', types=['Walking'], spill_dir=spill_dir)).decode()
+        assert walking.splitlines()[1].endswith('Walking,60.0')
+        
+        print("Test 6: Bad arguments fail before streaming")
+        for args in (('alerts', 'xml'), ('alerts', 'csv', 'yesterday'), ('video', 'csv')):
+            try:
+                export(*args, log_path=log_path)
+                assert False, args
+            except ValueError:
+                pass
+    
+    print("\nLog export tests complete!")
+
+if __name__ == "__main__":
+    test_log_export()
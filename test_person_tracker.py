@@ -0,0 +1,53 @@
+"""
+Test script for the multi-person identity tracker
+Checks IoU/centroid association, track expiry and resident selection
+"""
+
+from person_tracker import PersonTracker, landmarks_bbox
+
+class Landmark:
+    def __init__(self, x, y, visibility=0.9):
+        self.x, self.y, self.visibility = x, y, visibility
+
+def person(x, y, size=0.2):
+    """Four visible corner landmarks of a person-sized box"""
+    return [Landmark(x, y), Landmark(x + size, y), Landmark(x, y + 2 * size), Landmark(x + size, y + 2 * size)]
+
+def detection(x, y):
+    landmarks = person(x, y)
+    return (landmarks_bbox(landmarks), landmarks)
+
+def test_person_tracker():
+    """Test stable ids for two people, fast motion and the resident choice"""
+    
+    tracker = PersonTracker(state_factory=lambda: {'frames': 0}, max_misses=2, min_hits=3)
+    
+    print("Test 1: Resident is chosen once someone has been seen long enough")
+    for i in range(3):
+        tracker.update([detection(0.1 + i * 0.01, 0.2)], now=i)
+    resident = tracker.resident()
+    assert resident is not None and resident.id == 1
+    
+    print("Test 2: A visitor gets a new track and does not take over")
+    for i in range(3, 10):
+        tracks = tracker.update([detection(0.6, 0.2), detection(0.1 + i * 0.01, 0.2)], now=i)
+    assert sorted(t.id for t in tracks) == [1, 2]
+    assert tracker.resident().id == 1
+    assert tracker.tracks[1].state is not tracker.tracks[2].state
+    
+    print("Test 3: Fast motion without box overlap is matched by centroid")
+    tracker.update([detection(0.6, 0.2), detection(0.28, 0.3)], now=10)
+    assert tracker.tracks[1].bbox[0] == 0.28
+    
+    print("Test 4: Tracks expire after too many missed frames")
+    for i in range(11, 14):
+        tracker.update([detection(0.28, 0.3)], now=i)
+    assert list(tracker.tracks) == [1]
+    
+    print("Test 5: Invisible landmarks don't form a box")
+    assert landmarks_bbox([Landmark(0.5, 0.5, visibility=0.1)] * 5) is None
+    
+    print("\nPerson tracker tests complete!")
+
+if __name__ == "__main__":
+    test_person_tracker()
@@ -0,0 +1,90 @@
+"""
+Test script for the MJPEG live preview
+Checks encode-once fan-out, idle cost and frame skipping for slow viewers
+"""
+
+import time
+import threading
+import urllib.request
+import numpy as np
+from preview_stream import PreviewBroadcaster, PreviewServer, DEFAULT_PREVIEW_CONFIG
+
+def test_preview_stream():
+    """Test the broadcaster directly and the HTTP server end to end"""
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    
+    print("Test 1: Nothing is encoded without viewers")
+    broadcaster = PreviewBroadcaster(fps=100)
+    for _ in range(50):
+        broadcaster.offer(frame)
+    time.sleep(0.1)
+    assert broadcaster.encoded == 0
+    
+    print("Test 2: Frames are encoded once for all viewers")
+    results = []
+    def viewer():
+        seq, jpeg = broadcaster.wait_frame(0)
+        results.append((seq, jpeg))
+    assert broadcaster.join() and broadcaster.join()
+    threads = [threading.Thread(target=viewer) for _ in range(2)]
+    for t in threads:
+        t.start()
+    broadcaster.offer(frame)
+    for t in threads:
+        t.join(timeout=2)
+    assert len(results) == 2 and results[0][1] is results[1][1]
+    assert results[0][1][:2] == b'\xff\xd8'  # JPEG
+    assert broadcaster.encoded == 1
+    
+    print("Test 3: Offers faster than the FPS cap are dropped before encoding")
+    broadcaster.interval = 0.1
+    seq = broadcaster.seq
+    start = time.time() + 1
+    for i in range(10):
+        broadcaster.offer(frame, now=start + i * 0.03)
+        if i in (0, 4, 8):
+            # 0.0s, 0.12s and 0.24s pass the 10 fps cap; the rest are ignored
+            seq, _ = broadcaster.wait_frame(seq, timeout=2)
+    time.sleep(0.1)
+    assert broadcaster.encoded == 4, broadcaster.encoded
+    
+    print("Test 4: A slow viewer skips frames instead of queueing them")
+    last_seen = broadcaster.seq
+    for i in range(3):
+        broadcaster.offer(frame, now=start + 10 + i)
+        seq, _ = broadcaster.wait_frame(seq, timeout=2)
+    seq, jpeg = broadcaster.wait_frame(last_seen)
+    assert seq == last_seen + 3 and jpeg is not None
+    assert broadcaster.skipped == 2
+    
+    print("Test 5: Waiting viewers are released with no frame once stopped")
+    waiting = []
+    waiter = threading.Thread(target=lambda: waiting.append(broadcaster.wait_frame(seq, timeout=5)))
+    waiter.start()
+    time.sleep(0.05)
+    broadcaster.leave()
+    broadcaster.leave()
+    broadcaster.stop()
+    waiter.join(timeout=2)
+    assert waiting == [(seq, None)]
+    assert broadcaster.wait_frame(0) == (0, None)
+    
+    print("Test 6: Snapshot over HTTP")
+    server = PreviewServer(dict(DEFAULT_PREVIEW_CONFIG, port=0))
+    port = server.httpd.server_address[1]
+    def feed():
+        for _ in range(40):
+            server.offer(np.zeros((480, 640, 3), dtype=np.uint8))
+            time.sleep(0.05)
+    feeder = threading.Thread(target=feed)
+    feeder.start()
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/preview.jpg', timeout=5) as response:
+        assert response.headers['Content-Type'] == 'image/jpeg'
+        assert response.read()[:2] == b'\xff\xd8'
+    feeder.join()
+    server.stop()
+    
+    print("\nPreview stream tests complete!")
+
+if __name__ == "__main__":
+    test_preview_stream()
@@ -0,0 +1,95 @@
+"""
+Test script for on-demand profiling
+Checks session limits and the dashboard's request, claim, expiry and summary endpoints
+"""
+
+import time
+import tempfile
+from datetime import datetime, timedelta
+from profiler import SamplingProfiler
+import dashboard
+
+def test_profiler_limits():
+    """Test which frame and time limits a session gets"""
+    print("Test 1: A seconds-only session has no frame budget")
+    profiler = SamplingProfiler({'output_dir': tempfile.mkdtemp(), 'interval_ms': 1})
+    assert profiler.start(seconds=0.2)
+    assert profiler._frames_left is None
+    for _ in range(500):
+        profiler.on_frame()
+    assert profiler.active, "300 default frames must not end a seconds-only session"
+    profiler.stop()
+    deadline = time.time() + 2
+    while profiler.active and time.time() < deadline:
+        time.sleep(0.01)
+
+    print("Test 2: With no limits given the configured frame budget applies")
+    assert profiler.start()
+    assert profiler._frames_left == 300
+    profiler.stop()
+    deadline = time.time() + 2
+    while profiler.active and time.time() < deadline:
+        time.sleep(0.01)
+
+    print("\nProfiler limit tests complete!")
+
+def test_profile_requests():
+    """Test the admin profiling endpoints"""
+    client = dashboard.app.test_client()
+    remote = {'REMOTE_ADDR': '10.0.0.5'}
+    dashboard.profiling_state.update(status='idle', pending=None, message=None)
+
+    print("Test 3: A request is handed to the detector once")
+    response = client.post('/api/admin/profile', json={'seconds': 5})
+    assert response.status_code == 200
+    assert response.get_json()['request'] == {'frames': None, 'seconds': 5.0}
+    assert client.post('/api/admin/profile', json={'frames': 10}).status_code == 409
+    assert dashboard._claim_profile_request() == {'frames': None, 'seconds': 5.0}
+    assert dashboard._claim_profile_request() is None
+
+    print("Test 4: Summaries are only accepted from local detectors")
+    summary = {'threads': {}, 'samples': 3}
+    assert client.post('/api/admin/profile/summary', json=summary, environ_base=remote).status_code == 403
+    assert dashboard.profiling_state['status'] == 'running'
+    assert client.post('/api/admin/profile/summary', json=summary).status_code == 200
+    assert dashboard.profiling_state['status'] == 'idle'
+    assert client.get('/api/admin/profile').get_json()['summary'] == summary
+
+    print("Test 5: Remote detector nodes need the node token to claim and report")
+    assert client.post('/api/admin/profile', json={'frames': 10}).status_code == 200
+    dashboard.NODE_TOKEN = 'secret'
+    try:
+        wrong = dict(remote, HTTP_X_NODE_TOKEN='guess')
+        response = client.post('/api/activity_duration', json={}, environ_base=wrong)
+        assert 'profile_request' not in response.get_json()
+        assert client.post('/api/admin/profile/claim', environ_base=remote).status_code == 403
+        node = dict(remote, HTTP_X_NODE_TOKEN='secret')
+        response = client.post('/api/activity_duration', json={}, environ_base=node)
+        assert response.get_json()['profile_request'] == {'frames': 10, 'seconds': None}
+        assert client.post('/api/admin/profile/summary', json=summary, environ_base=node).status_code == 200
+        assert dashboard.profiling_state['status'] == 'idle'
+    finally:
+        dashboard.NODE_TOKEN = ''
+
+    print("Test 6: An unclaimed request expires instead of blocking new ones")
+    assert client.post('/api/admin/profile', json={'frames': 100}).status_code == 200
+    stale = datetime.now() - timedelta(seconds=dashboard.PROFILE_CLAIM_TIMEOUT + 1)
+    dashboard.profiling_state['requested_at'] = stale.isoformat()
+    state = client.get('/api/admin/profile').get_json()
+    assert state['status'] == 'idle' and state['pending'] is None and state['message']
+    assert dashboard._claim_profile_request() is None
+
+    print("Test 7: A request can be cancelled, but not remotely")
+    assert client.post('/api/admin/profile', json={'frames': 100}).status_code == 200
+    assert client.delete('/api/admin/profile', environ_base=remote).status_code == 403
+    response = client.delete('/api/admin/profile')
+    assert response.get_json()['cancelled'] is True
+    assert dashboard._claim_profile_request() is None
+    assert client.post('/api/admin/profile', json={'frames': 100}).status_code == 200
+    dashboard.profiling_state.update(status='idle', pending=None, message=None)
+
+    print("\nProfile request tests complete!")
+
+if __name__ == "__main__":
+    test_profiler_limits()
+    test_profile_requests()
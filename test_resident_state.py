@@ -0,0 +1,52 @@
+"""
+Test script for per-resident dashboard shards
+Checks routing by resident, the overview and alert acknowledgement
+"""
+
+from resident_state import ResidentRegistry
+
+def test_resident_state():
+    """Test shard creation, overview ordering and acknowledgement"""
+    
+    registry = ResidentRegistry()
+    
+    print("Test 1: Events for different residents land in separate shards")
+    registry.shard('r1').set_activity('Sitting', {'node_id': 'node-a', 'room': '101'})
+    registry.shard('r2').set_activity('Walking', {'node_id': 'node-b', 'room': '102'})
+    registry.shard('r2').add_alert({'type': 'fall', 'priority': 'critical', 'message': 'Fall',
+                                    'received_at': '2026-01-01T10:00:00', 'room': '102',
+                                    'event_id': 'e1', 'camera_ids': ['cam1'], 'confidence': 0.7})
+    registry.shard('r1').add_alert({'type': 'gesture', 'priority': 'normal', 'message': 'Wave',
+                                    'received_at': '2026-01-01T10:00:01'})
+    assert len(registry) == 2
+    assert registry.shard('r1') is registry.shard('r1')
+    assert registry.get('r2').statistics['falls_today'] == 1
+    assert registry.get('r1').statistics['falls_today'] == 0
+    
+    print("Test 2: Overview lists open alerts, critical residents first")
+    overview = registry.overview()
+    print(f"Overview: {overview}")
+    assert [r['resident_id'] for r in overview] == ['r2', 'r1']
+    assert len(overview[0]['open_alerts']) == 1
+    assert overview[1]['open_alerts'] == [], "normal alerts don't stay open"
+    assert [r['resident_id'] for r in registry.overview(room='101')] == ['r1']
+    
+    print("Test 3: Acknowledged alerts leave the overview but stay in the drill-down")
+    assert registry.get('r2').acknowledge() == 1
+    assert registry.overview(room='102')[0]['open_alerts'] == []
+    detail = registry.get('r2').snapshot()
+    assert detail['alerts'][0]['acknowledged'] is True
+    assert detail['node_id'] == 'node-b'
+    
+    print("Test 4: A cross-camera merge update adds cameras to the stored alert")
+    assert registry.get('r2').merge_alert({'event_id': 'e1', 'camera_ids': ['cam1', 'cam2'],
+                                           'confidence': 0.9, 'duplicates': 1})
+    assert not registry.get('r2').merge_alert({'event_id': 'unknown', 'camera_ids': ['cam3']})
+    alert = registry.get('r2').snapshot()['alerts'][0]
+    assert alert['camera_ids'] == ['cam1', 'cam2'] and alert['confidence'] == 0.9
+    assert registry.get('r2').statistics['falls_today'] == 1
+    
+    print("\nResident state tests complete!")
+
+if __name__ == "__main__":
+    test_resident_state()
@@ -0,0 +1,69 @@
+"""
+Test script for the columnar activity segment store
+Checks range queries, longest segment and spilling finished days to disk
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+import segment_store
+from segment_store import SegmentStore
+
+def test_segment_store():
+    """Test time-in-range queries and the day spill"""
+    
+    spill_dir = tempfile.mkdtemp()
+    store = SegmentStore(spill_dir=spill_dir)
+    day1 = datetime(2026, 3, 2, 9, 0).timestamp()
+    
+    print("Test 1: Time in an activity over a range, including partial segments")
+    store.append('Sitting', day1, day1 + 600)
+    store.append('Walking', day1 + 600, day1 + 660)
+    store.append('Sitting', day1 + 660, day1 + 2460)
+    assert store.time_in('Sitting', day1, day1 + 3000) == 2400
+    assert store.time_in('Sitting', day1 + 300, day1 + 960) == 600
+    assert store.time_in('Walking', day1 + 630, day1 + 5000) == 30
+    assert store.time_in('Standing', day1, day1 + 5000) == 0
+    
+    print("Test 2: Longest segment and segment views")
+    assert store.longest('Sitting') == 1800
+    assert [s.activity for s in store] == ['Sitting', 'Walking', 'Sitting']
+    assert store[1].duration == 60
+    
+    print("Test 3: A new day spills the previous one to disk")
+    day2 = (datetime(2026, 3, 2) + timedelta(days=1, hours=8)).timestamp()
+    store.append('Standing', day2, day2 + 120)
+    assert len(store) == 1
+    assert store.longest('Sitting') == 0
+    spilled = store.load_day(datetime(2026, 3, 2).date())
+    assert len(spilled) == 3
+    assert spilled.time_in('Sitting', day1, day1 + 3000) == 2400
+    
+    print("Test 4: Range queries combine spilled days and memory")
+    assert store.time_in_range('Sitting', day1, day2 + 600) == 2400
+    assert store.time_in_range('Standing', day1, day2 + 600) == 120
+    
+    print("Test 5: Codes keep their names when a later store knows other activities")
+    store.append('Lying', day2 + 200, day2 + 300)
+    store.spill()
+    reopened = SegmentStore(activities=('Lying', 'Sitting', 'Kneeling'), spill_dir=spill_dir)
+    assert reopened.activities[:5] == ['Sitting', 'Standing', 'Walking', 'Unknown', 'Lying']
+    day3 = day2 + 86400
+    reopened.append('Kneeling', day3, day3 + 50)
+    reopened.spill()
+    day2_segments = reopened.load_day(datetime(2026, 3, 3).date())
+    assert [s.activity for s in day2_segments] == ['Standing', 'Lying']
+    assert [s.activity for s in reopened.load_day(datetime(2026, 3, 4).date())] == ['Kneeling']
+    
+    print("Test 6: The default spill directory follows SPILL_ROOT at construction time")
+    root, segment_store.SPILL_ROOT = segment_store.SPILL_ROOT, spill_dir
+    try:
+        assert SegmentStore().spill_dir == os.path.join(spill_dir, 'default')
+    finally:
+        segment_store.SPILL_ROOT = root
+    assert not SegmentStore(spill_dir=False).spill_dir
+    
+    print("\nSegment store tests complete!")
+
+if __name__ == "__main__":
+    test_segment_store()
@@ -0,0 +1,236 @@
+"""
+Test script for SMS fan-out
+Delivers to several contacts through a local SMTP stand-in (no real SMTP server needed)
+"""
+
+import os
+import json
+import tempfile
+import threading
+import socketserver
+import time
+import sqlite3
+from sms_alert import SMSAlert
+from notification_outbox import NotificationOutbox
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: EHLO, AUTH PLAIN, MAIL, RCPT, DATA, QUIT"""
+    
+    def handle(self):
+        self.server.connections += 1
+        self._reply('220 localhost fake SMTP')
+        in_data = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            text = line.decode('utf-8', 'replace').rstrip('\r\n')
+            if in_data:
+                if text == '.':
+                    in_data = False
+                    self.server.messages += 1
+                    self._reply('250 OK')
+                continue
+            command = text.split(' ')[0].upper()
+            if command == 'EHLO':
+                self._reply('250-localhost\r\n250 AUTH PLAIN')
+            elif command == 'AUTH':
+                self.server.logins += 1
+                self._reply('235 Authentication successful')
+            elif command in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self._reply('250 OK')
+            elif command == 'DATA':
+                in_data = True
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Not implemented')
+    
+    def _reply(self, text):
+        self.wfile.write((text + '\r\n').encode('utf-8'))
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeSMTPHandler)
+        self.connections = 0
+        self.logins = 0
+        self.messages = 0
+
+def test_sms_fanout():
+    """Send one alert to five contacts and check session reuse and the report"""
+    server = FakeSMTPServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    config = {
+        'enabled': True,
+        'provider': 'email',
+        'emergency_contacts': [
+            {'name': f'Contact {i}', 'number': f'555000000{i}', 'carrier': 'att'}
+            for i in range(5)
+        ],
+        'email': {
+            'smtp_server': '127.0.0.1',
+            'smtp_port': server.server_address[1],
+            'use_tls': False,
+            'sender_email': 'har@example.com',
+            'sender_password': 'secret',
+            'carrier_gateways': {'att': '@txt.att.net'}
+        },
+        'delivery': {'max_workers': 4, 'smtp_sessions': 1},
+        'outbox': {'enabled': False}
+    }
+    config_file = os.path.join(tempfile.mkdtemp(), 'sms_config.json')
+    with open(config_file, 'w') as f:
+        json.dump(config, f)
+    
+    try:
+        sms = SMSAlert(config_file)
+        assert sms.send_alert('Fall detected! Immediate assistance required!', alert_type='fall',
+                              priority='critical')
+        
+        report = sms.last_delivery_report
+        for entry in report:
+            print(f"{entry['name']}: success={entry['success']} latency={entry['latency_ms']} ms")
+        assert len(report) == 5
+        assert all(entry['success'] for entry in report)
+        assert server.messages == 5
+        # One handshake and login for the whole batch
+        assert server.connections == 1
+        assert server.logins == 1
+        
+        # Cooldown blocks an immediate repeat to the same contacts
+        assert not sms.send_alert('Fall detected again', alert_type='fall', priority='critical')
+    finally:
+        server.shutdown()
+        server.server_close()
+    
+    print("\nSMS fan-out test complete!")
+
+def test_outbox_retry_and_replay():
+    """A failed notification is retried with backoff and survives a restart"""
+    db_path = os.path.join(tempfile.mkdtemp(), 'outbox.db')
+    contact = {'name': 'Contact 0', 'number': '5550000000'}
+    attempts = []
+    
+    def flaky_deliver(items):
+        attempts.append(time.time())
+        # Fail the first two attempts (simulated SMTP outage)
+        return {item['key']: len(attempts) > 2 for item in items}
+    
+    outbox = NotificationOutbox(flaky_deliver, db_path=db_path, base_delay=0.05, max_delay=0.2)
+    assert outbox.enqueue('fall:1:5550000000', contact, 'Fall detected!', 'fall', 'critical')
+    # Same idempotency key is never queued twice
+    assert not outbox.enqueue('fall:1:5550000000', contact, 'Fall detected!', 'fall', 'critical')
+    
+    deadline = time.time() + 3
+    while outbox.get_stats().get('sent', 0) < 1 and time.time() < deadline:
+        time.sleep(0.05)
+    print(f"Delivered after {len(attempts)} attempts: {outbox.get_stats()}")
+    assert len(attempts) == 3
+    outbox.stop()
+    
+    # Pending notifications are replayed by a new outbox on the same file
+    blocked = NotificationOutbox(lambda items: {}, db_path=db_path, max_attempts=1)
+    blocked.enqueue('help:2:5550000000', contact, 'Help requested!', 'help', 'critical')
+    time.sleep(0.2)
+    assert blocked.get_stats().get('dead', 0) == 1
+    blocked.stop()
+    
+    # Simulate a crash: one row pending, two in flight, one of them already accepted by the provider
+    stalled = NotificationOutbox(lambda items: {}, db_path=db_path, base_delay=60)
+    for key in ('fall:3:5550000000', 'fall:3:5550000001', 'fall:3:5550000002'):
+        stalled.enqueue(key, contact, 'Fall detected!', 'fall', 'critical')
+    stalled.stop()
+    db = sqlite3.connect(db_path)
+    db.execute("UPDATE notifications SET status = 'pending', attempts = 0, next_attempt = 0 WHERE idem_key LIKE 'fall:3:%'")
+    db.execute("UPDATE notifications SET status = 'sending' WHERE idem_key IN ('fall:3:5550000001', 'fall:3:5550000002')")
+    db.execute("UPDATE notifications SET provider_ref = 'SM1', provider_status = 'queued' WHERE idem_key = 'fall:3:5550000002'")
+    db.commit()
+    db.close()
+    
+    delivered = {}
+    def record_deliver(items):
+        for item in items:
+            delivered[item['key']] = item['in_doubt']
+        return {item['key']: True for item in items}
+    
+    replay = NotificationOutbox(record_deliver, db_path=db_path)
+    assert not replay.enqueue('fall:1:5550000000', contact, 'Fall detected!', 'fall', 'critical')
+    deadline = time.time() + 3
+    while replay.get_stats().get('sent', 0) < 4 and time.time() < deadline:
+        time.sleep(0.05)
+    print(f"Replayed after restart: {delivered}")
+    assert delivered == {'fall:3:5550000000': False, 'fall:3:5550000001': True}, \
+        "pending and receipt-less in-flight rows are delivered; the in-flight one is flagged in doubt"
+    assert replay.get_stats()['sent'] == 4
+    replay.stop()
+    
+    print("\nOutbox test complete!")
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+        self.text = json.dumps(payload)
+    
+    def json(self):
+        return self.payload
+
+class FakeTwilio:
+    """Stands in for the pooled HTTP session: remembers sent messages and lists them"""
+    
+    def __init__(self):
+        self.sent = []
+        self.lookups = 0
+    
+    def post(self, url, auth=None, data=None, timeout=None):
+        self.sent.append(data)
+        return FakeResponse(201, {'sid': f'SM{len(self.sent)}', 'status': 'queued'})
+    
+    def get(self, url, auth=None, params=None, timeout=None):
+        self.lookups += 1
+        messages = [{'sid': f'SM{i + 1}', 'status': 'delivered', 'body': data['Body'],
+                     'date_created': 'Mon, 19 Oct 2026 10:00:00 +0000'}
+                    for i, data in enumerate(self.sent) if data['To'] == params['To']]
+        return FakeResponse(200, {'messages': messages})
+
+def test_twilio_in_doubt_lookup():
+    """An in-doubt retry is not resent when Twilio already has the message"""
+    config = {
+        'enabled': True,
+        'provider': 'twilio',
+        'twilio': {'account_sid': 'AC1', 'auth_token': 'token', 'from_number': '+15550009999'},
+        'outbox': {'enabled': False}
+    }
+    config_file = os.path.join(tempfile.mkdtemp(), 'sms_config.json')
+    with open(config_file, 'w') as f:
+        json.dump(config, f)
+    sms = SMSAlert(config_file)
+    sms._http = FakeTwilio()
+    contact = {'name': 'Contact 0', 'number': '5550000000'}
+    queued_at = 1792404000.0  # 2026-10-19 10:00:00 UTC
+    
+    items = [{'key': 'fall:1:5550000000', 'contact': contact, 'message': 'Fall detected!',
+              'alert_type': 'fall', 'in_doubt': False, 'created': queued_at}]
+    assert sms._deliver_outbox_items(items) == {'fall:1:5550000000': True}
+    assert len(sms._http.sent) == 1 and sms._http.lookups == 0
+    
+    items[0]['in_doubt'] = True
+    assert sms._deliver_outbox_items(items) == {'fall:1:5550000000': True}
+    assert len(sms._http.sent) == 1, "already accepted by Twilio, not sent again"
+    
+    items[0]['message'] = 'Help requested!'
+    assert sms._deliver_outbox_items(items) == {'fall:1:5550000000': True}
+    assert len(sms._http.sent) == 2, "not found at Twilio, so it is sent"
+    
+    print("\nTwilio lookup test complete!")
+
+if __name__ == "__main__":
+    test_sms_fanout()
+    test_outbox_retry_and_replay()
+    test_twilio_in_doubt_lookup()
@@ -0,0 +1,54 @@
+"""
+Test script for startup orchestration
+Checks lazy imports and concurrent component initialization
+"""
+
+import sys
+import time
+from startup import LazyModule, StartupOrchestrator
+
+def test_startup():
+    """Test LazyModule and StartupOrchestrator"""
+    
+    print("Test 1: Lazy modules import on first use")
+    sys.modules.pop('colorsys', None)
+    colorsys = LazyModule('colorsys')
+    assert 'colorsys' not in sys.modules
+    assert colorsys.rgb_to_hsv(1, 0, 0)[0] == 0
+    assert 'colorsys' in sys.modules
+    
+    print("Test 2: Importing the detector module doesn't load heavy dependencies")
+    import gesture_holistic
+    assert repr(gesture_holistic.cv2).startswith("<lazy module 'cv2'")
+    
+    print("Test 3: Components initialize concurrently")
+    lines = []
+    startup = StartupOrchestrator(log=lines.append)
+    begin = time.perf_counter()
+    for name in ('camera', 'model', 'alerts'):
+        startup.add(name, time.sleep, 0.3)
+    startup.wait('camera', 'model', 'alerts')
+    elapsed = time.perf_counter() - begin
+    print(f"Three 0.3 s components ready in {elapsed:.2f}s")
+    assert elapsed < 0.6
+    assert all(info['state'] == 'ready' for info in startup.status().values())
+    assert len(lines) == 3
+    
+    print("Test 4: Failures are reported and re-raised to whoever waits")
+    def broken():
+        raise RuntimeError("no TTS engine")
+    startup.add('tts', broken)
+    try:
+        startup.wait('tts')
+        assert False
+    except RuntimeError:
+        pass
+    assert startup.status()['tts'] == {'state': 'failed', 'seconds': startup.status()['tts']['seconds'],
+                                       'error': 'no TTS engine'}
+    assert startup.result('tts', 'fallback') == 'fallback'
+    startup.shutdown()
+    
+    print("\nStartup tests complete!")
+
+if __name__ == "__main__":
+    test_startup()
@@ -0,0 +1,79 @@
+"""
+Test script for structured logging
+Checks per-call-site rate limiting, JSON records and the queued file writer
+"""
+
+import os
+import json
+import queue
+import logging
+import tempfile
+from structured_log import (DEFAULT_LOG_CONFIG, JsonFormatter, NonBlockingQueueHandler, RateLimitFilter,
+                            setup_logging, shutdown_logging)
+
+def make_record(lineno, created, msg='frame %d', args=(1,)):
+    record = logging.LogRecord('test', logging.INFO, 'detector.py', lineno, msg, args, None)
+    record.created = created
+    return record
+
+def test_structured_log():
+    """Test RateLimitFilter, JsonFormatter and setup_logging"""
+
+    print("Test 1: Each call site gets its own burst")
+    limiter = RateLimitFilter(burst=3, interval=3.0)
+    passed = [limiter.filter(make_record(10, 100.0)) for _ in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    assert limiter.filter(make_record(20, 100.0))
+    assert limiter.suppressed == 7
+
+    print("Test 2: The next record through reports how many were suppressed")
+    record = make_record(10, 101.5)
+    assert limiter.filter(record)
+    assert record.suppressed == 7
+    record = make_record(10, 102.5)
+    assert limiter.filter(record)
+    assert not hasattr(record, 'suppressed')
+
+    print("Test 3: rate_limit=False always passes")
+    for _ in range(5):
+        record = make_record(30, 200.0)
+        record.rate_limit = False
+        assert limiter.filter(record)
+
+    print("Test 4: JSON records carry extra fields")
+    record = make_record(40, 300.0)
+    record.camera_id = 'kitchen'
+    record.suppressed = 4
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['message'] == 'frame 1'
+    assert entry['camera_id'] == 'kitchen' and entry['suppressed'] == 4 and entry['level'] == 'INFO'
+
+    print("Test 5: A full queue drops records instead of blocking")
+    handler = NonBlockingQueueHandler(queue.Queue(2))
+    for _ in range(5):
+        handler.emit(make_record(50, 400.0))
+    assert handler.dropped == 3
+
+    print("Test 6: Logged lines reach the rotating file through the writer thread")
+    with tempfile.TemporaryDirectory() as tmp:
+        config = dict(DEFAULT_LOG_CONFIG, directory=tmp, console=False, rate_limit_burst=2)
+        setup_logging('detector', config)
+        logger = logging.getLogger('test_structured_log')
+        for frame in range(100):
+            logger.info("Help pose on frame %d", frame)
+        logger.debug("not written at INFO")
+        try:
+            raise ValueError("camera unplugged")
+        except ValueError:
+            logger.exception("Capture failed")
+        shutdown_logging()
+        with open(os.path.join(tmp, 'detector.log')) as f:
+            entries = [json.loads(line) for line in f]
+        print(f"{len(entries)} of 102 records written")
+        assert [entry['message'] for entry in entries] == ['Help pose on frame 0', 'Help pose on frame 1', 'Capture failed']
+        assert 'ValueError: camera unplugged' in entries[-1]['exception']
+
+    print("\nStructured logging tests complete!")
+
+if __name__ == "__main__":
+    test_structured_log()
@@ -0,0 +1,153 @@
+"""
+Test script for the TTS worker
+Checks coalescing of pending speech, critical preemption and the phrase cache
+with a fake engine
+"""
+
+import os
+import time
+import wave
+import tempfile
+import threading
+import tts_worker
+from tts_worker import TTSWorker
+
+class FakeEngine:
+    """Stands in for a pyttsx3 engine: 'speaks' one word per 20 ms and records what was said"""
+
+    def __init__(self):
+        self.spoken = []
+        self.stopped = []
+        self.threads = set()
+        self.callbacks = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self._text = None
+        self._path = None
+        self._stop = False
+
+    def setProperty(self, name, value):
+        pass
+
+    def getProperty(self, name):
+        return []
+
+    def connect(self, topic, callback):
+        self.callbacks.append(callback)
+
+    def say(self, text):
+        self._text = text
+
+    def save_to_file(self, text, path):
+        self._text, self._path = text, path
+
+    def _write(self, path, words):
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(8000)
+            wav.writeframes(b'\0\0' * 800 * words)
+
+    def runAndWait(self):
+        self.threads.add(threading.current_thread().name)
+        text, self._text, self._stop = self._text, None, False
+        path, self._path = self._path, None
+        self.started.set()
+        if text == 'hello':
+            # Hold the first utterance so later requests pile up behind it
+            self.release.wait(2)
+        words = text.split() * (20 if text.startswith('Long') else 1)
+        for location, word in enumerate(words):
+            for callback in self.callbacks:
+                callback(None, location, len(word))
+            if self._stop:
+                self.stopped.append(text)
+                if path:
+                    self._write(path, location)
+                return
+            time.sleep(0.02)
+        if path:
+            self._write(path, len(words))
+        self.spoken.append(text)
+
+    def stop(self):
+        self.threads.add(threading.current_thread().name)
+        self._stop = True
+
+def wait_idle(worker, timeout=3):
+    deadline = time.time() + timeout
+    while (worker._pending or worker._current_text) and time.time() < deadline:
+        time.sleep(0.01)
+
+def test_tts_worker():
+    """Test TTSWorker coalescing, preemption and cache rendering"""
+    engine = FakeEngine()
+    original = tts_worker.pyttsx3
+    tts_worker.pyttsx3 = type('FakePyttsx3', (), {'init': staticmethod(lambda: engine)})
+    try:
+        print("Test 1: A less urgent message never replaces a more urgent pending one")
+        worker = TTSWorker(cache_dir=tempfile.mkdtemp())
+        worker.speak('hello')
+        engine.started.wait(2)
+        worker.speak('Stop gesture detected', priority='high', key=('gesture', 'left_hand'))
+        worker.speak('Thumbs up detected', key=('gesture', 'left_hand'))
+        worker.speak('Wave gesture detected', key=('gesture', 'right_hand'))
+        worker.speak('Hand raised', key=('gesture', 'right_hand'))
+        engine.release.set()
+        wait_idle(worker)
+        print(f"Spoken: {engine.spoken}")
+        assert engine.spoken == ['hello', 'Stop gesture detected', 'Thumbs up detected', 'Hand raised']
+        assert worker.stats['coalesced'] == 1
+
+        print("Test 2: Identical pending text is spoken once")
+        engine.spoken.clear()
+        engine.release.clear()
+        engine.started.clear()
+        worker.speak('hello')
+        engine.started.wait(2)
+        for _ in range(3):
+            worker.speak('Wave gesture detected', key=('gesture', 'left_hand'))
+        engine.release.set()
+        wait_idle(worker)
+        assert engine.spoken == ['hello', 'Wave gesture detected']
+
+        print("Test 3: A critical alert interrupts on the worker thread")
+        engine.spoken.clear()
+        worker.speak('Long reminder to drink some water')
+        time.sleep(0.1)
+        worker.speak('Fall detected!', priority='critical', key=('fall', None))
+        wait_idle(worker)
+        print(f"Stopped: {engine.stopped}, spoken: {engine.spoken}, threads: {engine.threads}")
+        assert engine.stopped == ['Long reminder to drink some water']
+        assert engine.spoken == ['Fall detected!']
+        assert worker.stats['interrupted'] == 1
+        assert engine.threads == {'tts-worker'}
+        worker.stop()
+
+        print("Test 4: A stale interrupt doesn't truncate the phrase cache")
+        engine.spoken.clear()
+        engine.stopped.clear()
+        cache_dir = tempfile.mkdtemp()
+        worker = TTSWorker(cache_dir=cache_dir, prerender=['Fall detected!'],
+                           startup_message='Long welcome message')
+        deadline = time.time() + 2
+        while worker._current_text is None and time.time() < deadline:
+            time.sleep(0.01)
+        worker.preempt()
+        deadline = time.time() + 3
+        while 'Fall detected!' not in worker._cache and time.time() < deadline:
+            time.sleep(0.01)
+        print(f"Stopped: {engine.stopped}, spoken: {engine.spoken}")
+        assert engine.stopped == ['Long welcome message']
+        path, seconds = worker._cache['Fall detected!']
+        with wave.open(path, 'rb') as wav:
+            assert wav.getnframes() == 1600, "the cached phrase must be complete"
+        assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp.wav')]
+        worker.stop()
+    finally:
+        tts_worker.pyttsx3 = original
+
+    print("\nTTS worker tests complete!")
+
+if __name__ == "__main__":
+    test_tts_worker()
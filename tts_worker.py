@@ -0,0 +1,247 @@
+"""
+TTS Worker for Assistive HAR System
+Single thread that owns the pyttsx3 engine, coalesces queued utterances and
+plays fixed alert phrases from a pre-rendered audio cache
+"""
+
+import os
+import wave
+import hashlib
+import logging
+import threading
+from alert_queue import priority_rank
+from startup import LazyModule
+
+logger = logging.getLogger(__name__)
+
+# Only the worker thread touches these; importing them there keeps startup fast
+pyttsx3 = LazyModule('pyttsx3')
+winsound = LazyModule('winsound')
+
+
+class TTSWorker:
+    """
+    Speech queue served by one worker thread.
+
+    pyttsx3 engines are not thread-safe, so the engine is created, used and
+    destroyed only on the worker thread. Other threads call `speak`, which
+    never blocks on synthesis.
+    """
+
+    def __init__(self, rate=130, volume=1.0, voice_index=0, cache_dir='tts_cache',
+                 prerender=(), startup_message=None, max_pending=20):
+        self.rate = rate
+        self.volume = volume
+        self.voice_index = voice_index
+        self.cache_dir = cache_dir
+        self.max_pending = max_pending
+        self.available = True
+        self.stats = {
+            'spoken': 0,
+            'from_cache': 0,
+            'coalesced': 0,
+            'interrupted': 0
+        }
+
+        self._engine = None
+        self._voice_id = None
+        self._pending = []  # [priority_rank, seq, text, key, priority], kept sorted
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._running = True
+        self._current_priority = None
+        self._current_text = None
+        self._interrupt = False
+        self._cache = {}  # text -> (wav path, seconds)
+        self._prerender = list(prerender)
+
+        if startup_message:
+            self.speak(startup_message, priority='high')
+
+        self._thread = threading.Thread(target=self._run, name='tts-worker', daemon=True)
+        self._thread.start()
+
+    def speak(self, text, priority='normal', key=None):
+        """
+        Queue text for speech.
+
+        Identical pending text is dropped, and pending text with the same `key`
+        (e.g. alert type and source) is replaced by the newer message unless
+        the pending one is more urgent. A critical message interrupts a
+        lower-priority utterance that is already playing.
+        """
+        if not self.available:
+            return
+        rank = priority_rank(priority)
+        with self._cond:
+            if text == self._current_text and priority != 'critical':
+                # Already being spoken right now
+                self.stats['coalesced'] += 1
+                return
+            for item in self._pending:
+                # A less urgent message never replaces a more urgent pending one
+                if item[2] == text or (key is not None and item[3] == key and rank <= item[0]):
+                    item[2] = text
+                    if rank < item[0]:
+                        item[0] = rank
+                        item[4] = priority
+                        self._pending.sort()
+                    self.stats['coalesced'] += 1
+                    break
+            else:
+                self._seq += 1
+                self._pending.append([rank, self._seq, text, key, priority])
+                self._pending.sort()
+                if len(self._pending) > self.max_pending:
+                    # Drop the least urgent, newest message
+                    self._pending.pop()
+
+            if priority == 'critical' and self._current_priority not in (None, 'critical'):
+                self._interrupt_current()
+            self._cond.notify()
+
+    def preempt(self, priority='critical'):
+        """Interrupt the current utterance if it is less urgent than `priority`"""
+        with self._cond:
+            if self._current_priority is not None and \
+                    priority_rank(self._current_priority) > priority_rank(priority):
+                self._interrupt_current()
+
+    def stop(self):
+        """Stop the worker thread after the current utterance"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def _interrupt_current(self):
+        # Called with the condition held. Only flags the interrupt; the worker
+        # thread stops the engine or the sound itself
+        if self._interrupt:
+            return
+        self._interrupt = True
+        self.stats['interrupted'] += 1
+        self._cond.notify_all()
+
+    def _on_word(self, name, location, length):
+        # Engine callback, runs on the worker thread inside runAndWait()
+        if self._interrupt:
+            try:
+                self._engine.stop()
+            except Exception as e:
+                logger.warning("TTS interrupt error: %s", e)
+
+    def _run(self):
+        try:
+            self._engine = pyttsx3.init()
+            self._engine.setProperty('rate', self.rate)
+            self._engine.setProperty('volume', self.volume)
+            voices = self._engine.getProperty('voices')
+            if voices:
+                self._voice_id = voices[min(self.voice_index, len(voices) - 1)].id
+                self._engine.setProperty('voice', self._voice_id)
+            self._engine.connect('started-word', self._on_word)
+            logger.info("TTS initialized successfully")
+        except Exception as e:
+            logger.error("TTS init failed: %s", e)
+            self.available = False
+            self._engine = None
+            return
+
+        prerendered = False
+        while True:
+            with self._cond:
+                # Render the phrase cache while idle, after any startup message
+                while self._running and not self._pending and prerendered:
+                    self._cond.wait()
+                if not self._running:
+                    break
+                if self._pending:
+                    _, _, text, _, priority = self._pending.pop(0)
+                    self._current_priority = priority
+                    self._current_text = text
+                    self._interrupt = False
+                else:
+                    text = None
+
+            if text is None:
+                with self._cond:
+                    # A preemption aimed at an earlier utterance must not cut a render short
+                    self._interrupt = False
+                prerendered = self._render_cache()
+                continue
+
+            try:
+                self._say(text)
+            except Exception as e:
+                logger.error("TTS error: %s", e)
+            finally:
+                with self._cond:
+                    self._current_priority = None
+                    self._current_text = None
+
+        try:
+            self._engine.stop()
+        except Exception:
+            pass
+
+    def _say(self, text):
+        cached = self._cache.get(text)
+        if cached:
+            path, seconds = cached
+            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+            # Wait for playback while staying interruptible by critical alerts
+            with self._cond:
+                interrupted = self._cond.wait_for(lambda: self._interrupt or not self._running, timeout=seconds)
+            if interrupted:
+                winsound.PlaySound(None, 0)
+            self.stats['from_cache'] += 1
+        else:
+            logger.info("Speaking: %s", text)
+            self._engine.say(text)
+            self._engine.runAndWait()
+        self.stats['spoken'] += 1
+
+    def _render_cache(self):
+        """
+        Synthesize fixed phrases to WAV files once; reuse files from earlier runs.
+        Returns False if rendering was paused for pending speech.
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            logger.warning("TTS cache unavailable: %s", e)
+            return True
+
+        for text in self._prerender:
+            if text in self._cache:
+                continue
+            with self._cond:
+                if self._pending or not self._running:
+                    # Speech requests take precedence; resume rendering when idle
+                    return False
+            path = self._cache_path(text)
+            try:
+                if not os.path.exists(path):
+                    tmp_path = path + '.tmp.wav'
+                    self._engine.save_to_file(text, tmp_path)
+                    self._engine.runAndWait()
+                    with self._cond:
+                        interrupted = self._interrupt
+                    if interrupted:
+                        # Never cache a truncated file; render it again when idle
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+                        return False
+                    os.replace(tmp_path, path)
+                with wave.open(path, 'rb') as wav:
+                    seconds = wav.getnframes() / float(wav.getframerate())
+                self._cache[text] = (path, seconds + 0.1)
+            except Exception as e:
+                logger.warning("TTS cache render error for '%s': %s", text, e)
+        return True
+
+    def _cache_path(self, text):
+        digest = hashlib.sha1(
+            f"{self.rate}|{self.volume}|{self._voice_id}|{text}".encode('utf-8')
+        ).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.wav")